@@ -24,6 +24,19 @@ class Settings(BaseSettings):
         default="embedding-001",
         alias="GEMINI_EMBEDDING_MODEL"
     )
+    use_mock_gemini: bool = Field(default=False, alias="USE_MOCK_GEMINI")
+    # Base URL of a Gemini-compatible server (e.g. the local stand-in)
+    gemini_api_endpoint: str = Field(default="", alias="GEMINI_API_ENDPOINT")
+    
+    # Gemini Replay (offline load testing)
+    gemini_replay_cassette: str = Field(default="", alias="GEMINI_REPLAY_CASSETTE")
+    gemini_replay_latency: str = Field(
+        default="lognormal:800:0.5",
+        alias="GEMINI_REPLAY_LATENCY"
+    )
+    gemini_replay_error_rate: float = Field(default=0.0, alias="GEMINI_REPLAY_ERROR_RATE")
+    gemini_replay_burst_every: int = Field(default=0, alias="GEMINI_REPLAY_BURST_EVERY")
+    gemini_replay_burst_length: int = Field(default=0, alias="GEMINI_REPLAY_BURST_LENGTH")
     
     # Database
     database_url: str = Field(
@@ -32,6 +45,100 @@ class Settings(BaseSettings):
     )
     data_dir: str = Field(default="~/.gre-mentor", alias="DATA_DIR")
     
+    # Vector Store
+    vector_compaction_ratio: float = Field(
+        default=0.2,
+        alias="VECTOR_COMPACTION_RATIO"
+    )
+    vector_index_factory: str = Field(
+        default="IVF1024,Flat",
+        alias="VECTOR_INDEX_FACTORY"
+    )
+    vector_index_promote_threshold: int = Field(
+        default=50000,
+        alias="VECTOR_INDEX_PROMOTE_THRESHOLD"
+    )
+    vector_snapshot_interval: int = Field(
+        default=1000,
+        alias="VECTOR_SNAPSHOT_INTERVAL"
+    )
+    vector_search_nprobe: int = Field(default=16, alias="VECTOR_SEARCH_NPROBE")
+    vector_search_ef: int = Field(default=64, alias="VECTOR_SEARCH_EF")
+    
+    # Embedding Queue
+    embedding_workers: int = Field(default=2, alias="EMBEDDING_WORKERS")
+    embedding_batch_size: int = Field(default=32, alias="EMBEDDING_BATCH_SIZE")
+    embedding_poll_interval: float = Field(
+        default=1.0,
+        alias="EMBEDDING_POLL_INTERVAL"
+    )
+    embedding_max_attempts: int = Field(
+        default=5,
+        alias="EMBEDDING_MAX_ATTEMPTS"
+    )
+    embedding_cache_size: int = Field(
+        default=100000,
+        alias="EMBEDDING_CACHE_SIZE"
+    )
+    
+    # Gemini Scheduler (0 disables a rate limit)
+    llm_requests_per_minute: int = Field(
+        default=60,
+        alias="LLM_REQUESTS_PER_MINUTE"
+    )
+    llm_tokens_per_minute: int = Field(
+        default=120000,
+        alias="LLM_TOKENS_PER_MINUTE"
+    )
+    llm_max_concurrency: int = Field(default=4, alias="LLM_MAX_CONCURRENCY")
+    llm_max_retries: int = Field(default=5, alias="LLM_MAX_RETRIES")
+    llm_retry_base_delay: float = Field(
+        default=1.0,
+        alias="LLM_RETRY_BASE_DELAY"
+    )
+    llm_retry_max_delay: float = Field(
+        default=30.0,
+        alias="LLM_RETRY_MAX_DELAY"
+    )
+    
+    # Response Cache
+    response_cache_enabled: bool = Field(
+        default=True,
+        alias="RESPONSE_CACHE_ENABLED"
+    )
+    
+    # PDF Import (0 workers extracts pages on threads instead of processes)
+    pdf_extract_workers: int = Field(default=2, alias="PDF_EXTRACT_WORKERS")
+    pdf_pages_per_task: int = Field(default=8, alias="PDF_PAGES_PER_TASK")
+    # Target size of an extraction window, and context repeated between windows
+    pdf_chunk_tokens: int = Field(default=1500, alias="PDF_CHUNK_TOKENS")
+    pdf_chunk_overlap_tokens: int = Field(
+        default=100,
+        alias="PDF_CHUNK_OVERLAP_TOKENS"
+    )
+    # Windows scoring below this on question features skip the LLM (0 sends all)
+    pdf_prefilter_threshold: float = Field(
+        default=2.0,
+        alias="PDF_PREFILTER_THRESHOLD"
+    )
+    pdf_extract_concurrency: int = Field(default=4, alias="PDF_EXTRACT_CONCURRENCY")
+    pdf_commit_batch: int = Field(default=10, alias="PDF_COMMIT_BATCH")
+    
+    # Background Import Jobs (jobs run at once; 0 leaves jobs queued)
+    import_job_workers: int = Field(default=2, alias="IMPORT_JOB_WORKERS")
+    anki_commit_batch: int = Field(default=200, alias="ANKI_COMMIT_BATCH")
+    
+    # Batch Mnemonic Generation
+    mnemonic_batch_size: int = Field(default=20, alias="MNEMONIC_BATCH_SIZE")
+    mnemonic_batch_concurrency: int = Field(
+        default=4,
+        alias="MNEMONIC_BATCH_CONCURRENCY"
+    )
+    mnemonic_batch_max_attempts: int = Field(
+        default=3,
+        alias="MNEMONIC_BATCH_MAX_ATTEMPTS"
+    )
+    
     # SRS Configuration
     default_new_words_per_day: int = Field(
         default=50,
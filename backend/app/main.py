@@ -1,18 +1,39 @@
 """Main FastAPI application."""
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from app.config import settings
 from app.database import init_db
-from app.routers import mnemonic, words, clip, explain, session, awa, import_routes
+from app.routers import mnemonic, words, clip, explain, session, awa, import_routes, embeddings, llm
+from app.services.embedding_worker import start_embedding_worker, stop_embedding_worker
+from app.services.import_jobs import start_import_runner, stop_import_runner
+from app.services.pdf_pipeline import shutdown_pdf_executor
+from app.services.token_usage import llm_route
+from app.services.vector_store import close_vector_store
 
 # Initialize database
 init_db()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application startup and shutdown."""
+    start_embedding_worker()
+    start_import_runner()
+    yield
+    await stop_import_runner()
+    stop_embedding_worker()
+    shutdown_pdf_executor()
+    # Snapshot the FAISS index so the next start doesn't replay the log
+    close_vector_store()
+
+
 # Create FastAPI app
 app = FastAPI(
     title="GRE Mentor API",
     description="Local-only GRE preparation assistant with AI-powered mnemonics, SRS, and practice",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -24,6 +45,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def attribute_llm_usage(request: Request, call_next):
+    """Count Gemini tokens spent while serving a request against its path."""
+    with llm_route(request.url.path):
+        return await call_next(request)
+
+
 # Include routers
 app.include_router(mnemonic.router)
 app.include_router(words.router)
@@ -32,6 +61,8 @@ app.include_router(explain.router)
 app.include_router(session.router)
 app.include_router(awa.router)
 app.include_router(import_routes.router)
+app.include_router(embeddings.router)
+app.include_router(llm.router)
 
 
 @app.get("/")
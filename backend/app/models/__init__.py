@@ -3,5 +3,7 @@ from app.models.word import Word
 from app.models.question import Question
 from app.models.session import Session, Attempt
 from app.models.vector_mapping import VectorMapping
+from app.models.embedding_job import EmbeddingJob
+from app.models.import_job import ImportJob, ImportJobUnit
 
-__all__ = ["Word", "Question", "Session", "Attempt", "VectorMapping"]
+__all__ = ["Word", "Question", "Session", "Attempt", "VectorMapping", "EmbeddingJob", "ImportJob", "ImportJobUnit"]
@@ -0,0 +1,34 @@
+"""Embedding job model for the background embedding queue."""
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer
+from app.database import Base
+
+
+class EmbeddingJob(Base):
+    """Queue of objects waiting to be embedded and indexed."""
+    
+    __tablename__ = "embedding_jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    object_id = Column(String, nullable=False, index=True)
+    object_type = Column(String, nullable=False)  # word|question
+    status = Column(String, nullable=False, default="pending", index=True)  # pending|running|done|failed
+    attempts = Column(Integer, default=0)
+    last_error = Column(String, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            "id": self.id,
+            "object_id": self.object_id,
+            "object_type": self.object_type,
+            "status": self.status,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None
+        }
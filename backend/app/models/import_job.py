@@ -0,0 +1,56 @@
+"""Import job models for background PDF and Anki imports."""
+import uuid
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, JSON, ForeignKey, UniqueConstraint
+from app.database import Base
+
+
+class ImportJob(Base):
+    """A PDF or Anki import running in the background."""
+    
+    __tablename__ = "import_jobs"
+    
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String, nullable=False)  # pdf|anki
+    filename = Column(String, nullable=False)
+    path = Column(String, nullable=True)  # Spooled upload, removed when the job ends
+    status = Column(String, nullable=False, default="pending", index=True)  # pending|running|done|failed
+    
+    units_total = Column(Integer, nullable=True)  # Chunks or notes, once known
+    units_completed = Column(Integer, default=0)
+    stats = Column(JSON, default=dict)
+    error = Column(String, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+    
+    def to_dict(self):
+        """Convert to dictionary."""
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "filename": self.filename,
+            "status": self.status,
+            "units_total": self.units_total,
+            "units_completed": self.units_completed or 0,
+            "stats": self.stats or {},
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ImportJobUnit(Base):
+    """Outcome of one PDF chunk or Anki note, committed with its results."""
+    
+    __tablename__ = "import_job_units"
+    __table_args__ = (UniqueConstraint("job_id", "position"),)
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, ForeignKey("import_jobs.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, nullable=False)  # Chunk or note index in the source
+    status = Column(String, nullable=False)  # done|skipped|failed
+    items = Column(Integer, default=0)  # Questions or words created
+    error = Column(String, nullable=True)
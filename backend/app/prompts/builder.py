@@ -0,0 +1,77 @@
+"""Fit user text into prompt templates within per-endpoint token budgets."""
+from typing import Callable, List
+from app.services.token_usage import estimate_tokens, record_budget
+
+
+# Maximum prompt tokens (template plus user text) per endpoint
+PROMPT_BUDGETS = {
+    "extraction": 6000,
+    "clip_classifier": 2000,
+    "explain": 4000,
+    "awa": 6000,
+}
+
+TRUNCATION_MARKER = "\n[... truncated]"
+
+
+def _prefix_length(text: str, max_tokens: int) -> int:
+    """Longest prefix of ``text`` within ``max_tokens``, ending at whitespace if possible."""
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    if low == len(text):
+        return low
+    
+    # Prefer a paragraph, then a line or word boundary in the last fifth
+    for separator in ("\n\n", "\n", " "):
+        cut = text.rfind(separator, 0, low)
+        if cut > low * 0.8:
+            return cut
+    return low
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to at most ``max_tokens``, marking the cut."""
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    budget = max(0, max_tokens - estimate_tokens(TRUNCATION_MARKER))
+    return text[:_prefix_length(text, budget)].rstrip() + TRUNCATION_MARKER
+
+
+def split_to_tokens(text: str, max_tokens: int) -> List[str]:
+    """Split ``text`` into parts of at most ``max_tokens``, at whitespace where possible."""
+    parts = []
+    rest = text
+    while estimate_tokens(rest) > max_tokens:
+        length = max(1, _prefix_length(rest, max_tokens))
+        parts.append(rest[:length].strip())
+        rest = rest[length:]
+    if rest.strip() or not parts:
+        parts.append(rest.strip())
+    return [part for part in parts if part] or [""]
+
+
+def _text_budget(endpoint: str, render: Callable[[str], str]) -> int:
+    """Tokens left for user text once the template is rendered."""
+    return max(1, PROMPT_BUDGETS[endpoint] - estimate_tokens(render("")))
+
+
+def fit_prompt(endpoint: str, render: Callable[[str], str], text: str) -> str:
+    """Render ``text`` into a prompt, truncating it to the endpoint's budget."""
+    budget = _text_budget(endpoint, render)
+    fitted = truncate_to_tokens(text, budget)
+    if fitted is not text:
+        record_budget(endpoint, "truncated")
+    return render(fitted)
+
+
+def split_prompt(endpoint: str, render: Callable[[str], str], text: str) -> List[str]:
+    """Render ``text`` into as many prompts as it takes to stay within budget."""
+    parts = split_to_tokens(text, _text_budget(endpoint, render))
+    if len(parts) > 1:
+        record_budget(endpoint, "split")
+    return [render(part) for part in parts]
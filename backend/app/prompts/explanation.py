@@ -1,4 +1,5 @@
 """Explanation prompt templates for ETS-aligned content."""
+from app.prompts.builder import fit_prompt
 
 EXPLANATION_SYSTEM_PROMPT = """You will be given a selection and domain (quant/verbal/vocab/awa). Provide:
 1) A short summary (1-2 sentences).
@@ -17,22 +18,22 @@ def create_explanation_prompt(
     domain: str,
     depth: str = "short"
 ) -> str:
-    """Create explanation prompt."""
+    """Create explanation prompt; long selections are truncated to the budget."""
     depth_instruction = {
         "short": "Keep the explanation brief and concise.",
         "detailed": "Provide a detailed explanation with reasoning.",
         "step-by-step": "Provide a complete step-by-step walkthrough."
     }.get(depth, "Keep the explanation brief and concise.")
     
-    return f"""{EXPLANATION_SYSTEM_PROMPT}
+    return fit_prompt("explain", lambda text: f"""{EXPLANATION_SYSTEM_PROMPT}
 
 DOMAIN: {domain}
 DEPTH: {depth} - {depth_instruction}
 
 TEXT TO EXPLAIN:
-{selection_text}
+{text}
 
-Provide an ETS-aligned explanation and return JSON."""
+Provide an ETS-aligned explanation and return JSON.""", selection_text)
 
 
 AWA_GRADING_PROMPT = """You are an ETS-aligned AWA grader. Grade the essay using this rubric:
@@ -54,17 +55,17 @@ Return ONLY valid JSON with no additional text."""
 
 
 def create_awa_grading_prompt(essay_text: str, task_type: str) -> str:
-    """Create AWA grading prompt."""
+    """Create AWA grading prompt; overlong essays are truncated to the budget."""
     task_description = {
         "issue": "Analyze an Issue - Present a position on an issue",
         "argument": "Analyze an Argument - Critique the logic of an argument"
     }.get(task_type, task_type)
     
-    return f"""{AWA_GRADING_PROMPT}
+    return fit_prompt("awa", lambda text: f"""{AWA_GRADING_PROMPT}
 
 TASK TYPE: {task_description}
 
 ESSAY TO GRADE:
-{essay_text}
+{text}
 
-Grade this essay and return JSON."""
+Grade this essay and return JSON.""", essay_text)
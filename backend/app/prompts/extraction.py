@@ -1,12 +1,14 @@
 """Question extraction prompt templates."""
+from typing import List
+from app.prompts.builder import fit_prompt, split_prompt
 
 QUESTION_EXTRACTION_PROMPT = """You are a question extractor. Input is a blob of text which may contain one or more GRE-style questions. Identify and extract every question with choices (if present), answer (if present), and explanation (if present). For ambiguous parts, return 'uncertain' fields. Output JSON array of objects: {question_text, choices (array|null), answer|null, explanation|null, detected_type: "text_completion|sentence_equivalence|rc|quant|unknown", confidence:0.0-1.0}. Keep outputs concise.
 
 Return ONLY valid JSON array with no additional text."""
 
 
-def create_extraction_prompt(text: str) -> str:
-    """Create question extraction prompt."""
+def _render_extraction_prompt(text: str) -> str:
+    """Extraction template around ``text``."""
     return f"""{QUESTION_EXTRACTION_PROMPT}
 
 TEXT TO ANALYZE:
@@ -15,6 +17,16 @@ TEXT TO ANALYZE:
 Extract all questions and return as JSON array."""
 
 
+def create_extraction_prompt(text: str) -> str:
+    """Create question extraction prompt; long text is truncated to the budget."""
+    return fit_prompt("extraction", _render_extraction_prompt, text)
+
+
+def create_extraction_prompts(text: str) -> List[str]:
+    """Create as many extraction prompts as it takes to cover ``text`` within the budget."""
+    return split_prompt("extraction", _render_extraction_prompt, text)
+
+
 CLIP_CLASSIFIER_PROMPT = """You are a content classifier for GRE study materials. Given a text selection, determine if it is:
 1. A vocabulary word (single word or phrase with definition)
 2. A practice question (with or without answer choices)
@@ -26,12 +38,12 @@ Return ONLY valid JSON with no additional text."""
 
 
 def create_clip_classifier_prompt(text: str, hint: str = "auto") -> str:
-    """Create clip classification prompt."""
+    """Create clip classification prompt; long clips are truncated to the budget."""
     hint_text = f"\nUSER HINT: The content is likely related to {hint}." if hint != "auto" else ""
     
-    return f"""{CLIP_CLASSIFIER_PROMPT}{hint_text}
+    return fit_prompt("clip_classifier", lambda clip: f"""{CLIP_CLASSIFIER_PROMPT}{hint_text}
 
 TEXT TO CLASSIFY:
-{text}
+{clip}
 
-Classify this content and return JSON."""
+Classify this content and return JSON.""", text)
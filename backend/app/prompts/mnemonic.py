@@ -1,4 +1,6 @@
 """Mnemonic generation prompt templates."""
+import json
+from typing import Dict, List, Optional
 
 MNEMONIC_SYSTEM_PROMPT = """You are a GRE mnemonic generator. ALWAYS return valid JSON only (no extra commentary). Output must include the fields in this order exactly:
 word, pos, gre_definition, pithy_definition, base_word, associations (array of 5 strings), examples (array of 3 strings), easy_synonyms (array of 3 strings), gre_synonyms (array of 3 strings), story (single string).
@@ -21,3 +23,22 @@ def create_mnemonic_prompt(word: str, pos: str = None, style: str = "prude") ->
 USER: {user_input}
 
 Generate a mnemonic for the word "{word}" following the exact JSON schema above."""
+
+
+def create_batch_mnemonic_prompt(
+    words: List[Dict[str, Optional[str]]],
+    style: str = "prude"
+) -> str:
+    """Create one prompt generating mnemonics for several {word, pos} entries."""
+    user_input = [
+        {"word": entry["word"], "pos": entry.get("pos") or "unknown", "style": style}
+        for entry in words
+    ]
+    
+    return f"""{MNEMONIC_SYSTEM_PROMPT}
+
+BATCH: Return a JSON array with one object per entry below, in the same order. Each object follows the exact JSON schema above and repeats its "word" unchanged.
+
+WORDS: {json.dumps(user_input)}
+
+Generate a mnemonic for each of the {len(user_input)} words and return the JSON array."""
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas.awa import AWAGradeRequest, AWAGradeResponse, RubricScore
 from app.services.gemini_client import get_gemini_client
+from app.services.response_cache import acached_generate_json
 from app.prompts.explanation import create_awa_grading_prompt
 
 router = APIRouter(prefix="/api/v1/awa", tags=["awa"])
@@ -25,7 +26,7 @@ async def grade_essay(
         )
         
         # Generate grading
-        result = client.generate_json(prompt)
+        result = await acached_generate_json(client, prompt, endpoint="awa")
         
         # Extract rubric scores
         rubric_data = result.get("rubric", {})
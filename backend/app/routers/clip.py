@@ -6,7 +6,8 @@ from app.schemas.clip import ClipRequest, ClipResponse
 from app.schemas.word import WordCreate
 from app.schemas.question import QuestionCreate
 from app.services.gemini_client import get_gemini_client
-from app.services.vector_store import get_vector_store
+from app.services.response_cache import acached_generate_json
+from app.services.embedding_worker import enqueue_embedding
 from app.prompts.extraction import create_clip_classifier_prompt, create_extraction_prompt
 from app.prompts.mnemonic import create_mnemonic_prompt
 from app.models.word import Word
@@ -26,7 +27,9 @@ async def ingest_clip(
         
         # Step 1: Classify the content
         classifier_prompt = create_clip_classifier_prompt(request.text, request.hint)
-        classification = client.generate_json(classifier_prompt)
+        classification = await acached_generate_json(
+            client, classifier_prompt, endpoint="clip_classifier"
+        )
         
         content_type = classification.get("type", "concept")
         
@@ -48,7 +51,7 @@ async def ingest_clip(
             
             # Generate mnemonic
             mnemonic_prompt = create_mnemonic_prompt(target_word)
-            mnemonic_data = client.generate_json(mnemonic_prompt)
+            mnemonic_data = await client.agenerate_json(mnemonic_prompt)
             
             # Save word
             word = Word(
@@ -70,16 +73,8 @@ async def ingest_clip(
             db.commit()
             db.refresh(word)
             
-            # Generate embedding
-            try:
-                embed_text = f"{word.word} {word.gre_definition or ''} {word.story or ''}"
-                embedding = client.generate_embedding(embed_text)
-                vector_store = get_vector_store()
-                vector_id = vector_store.add_vector(embedding, word.id, "word", db)
-                word.embedding_vector_id = vector_id
-                db.commit()
-            except Exception as e:
-                print(f"Warning: Failed to create embedding: {e}")
+            # Queue embedding
+            enqueue_embedding(db, word.id, "word")
             
             return ClipResponse(
                 type="word",
@@ -90,7 +85,7 @@ async def ingest_clip(
         elif content_type == "question" and request.save:
             # Extract question data
             extraction_prompt = create_extraction_prompt(request.text)
-            questions_data = client.generate_json(extraction_prompt)
+            questions_data = await client.agenerate_json(extraction_prompt)
             
             # Handle both single object and array
             if not isinstance(questions_data, list):
@@ -115,16 +110,8 @@ async def ingest_clip(
                 db.commit()
                 db.refresh(question)
                 
-                # Generate embedding
-                try:
-                    embed_text = f"{question.question_text} {question.explanation or ''}"
-                    embedding = client.generate_embedding(embed_text)
-                    vector_store = get_vector_store()
-                    vector_id = vector_store.add_vector(embedding, question.id, "question", db)
-                    question.embedding_vector_id = vector_id
-                    db.commit()
-                except Exception as e:
-                    print(f"Warning: Failed to create embedding: {e}")
+                # Queue embedding
+                enqueue_embedding(db, question.id, "question")
                 
                 return ClipResponse(
                     type="question",
@@ -0,0 +1,14 @@
+"""Embedding queue endpoints."""
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from app.database import get_db
+from app.schemas.embedding import EmbeddingStatusResponse
+from app.services.embedding_worker import get_queue_status
+
+router = APIRouter(prefix="/api/v1/embeddings", tags=["embeddings"])
+
+
+@router.get("/status", response_model=EmbeddingStatusResponse)
+async def embedding_status(db: Session = Depends(get_db)):
+    """Report how much content is still waiting to be embedded."""
+    return EmbeddingStatusResponse(**get_queue_status(db))
@@ -1,14 +1,37 @@
 """Explanation endpoints for on-the-fly help."""
+import json
+from typing import Any, Dict
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from app.database import get_db
 from app.schemas.explain import ExplainRequest, ExplainResponse, Reference
-from app.services.gemini_client import get_gemini_client
+from app.services.gemini_client import get_gemini_client, parse_json_response
+from app.services.json_stream import JSONFieldStream
+from app.services.response_cache import acached_generate_json
 from app.prompts.explanation import create_explanation_prompt
 
 router = APIRouter(prefix="/api/v1", tags=["explain"])
 
 
+def _build_response(result: Dict[str, Any]) -> ExplainResponse:
+    """Turn the model's JSON into an ExplainResponse."""
+    explanation = result.get("summary", "") + "\n\n" + result.get("details", "")
+    references_data = result.get("references", [])
+    references = [Reference(**ref) for ref in references_data if isinstance(ref, dict)]
+    
+    return ExplainResponse(
+        explanation=explanation,
+        references=references,
+        saved_id=None
+    )
+
+
+def _sse(event: str, data: Any) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
 @router.post("/explain", response_model=ExplainResponse)
 async def explain_selection(
     request: ExplainRequest,
@@ -26,25 +49,50 @@ async def explain_selection(
         )
         
         # Generate explanation
-        result = client.generate_json(prompt)
-        
-        # Extract explanation components
-        explanation = result.get("summary", "") + "\n\n" + result.get("details", "")
-        references_data = result.get("references", [])
-        references = [Reference(**ref) for ref in references_data if isinstance(ref, dict)]
-        
-        saved_id = None
+        result = await acached_generate_json(client, prompt, endpoint="explain")
         
         # Save if requested
         if request.save:
             # TODO: Implement saving explanation as a note or concept
             pass
         
-        return ExplainResponse(
-            explanation=explanation,
-            references=references,
-            saved_id=saved_id
-        )
+        return _build_response(result)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate explanation: {str(e)}")
+
+
+@router.post("/explain/stream")
+async def explain_selection_stream(request: ExplainRequest):
+    """
+    Stream an explanation as Server-Sent Events.
+    
+    Events: ``token`` for each chunk of model output, ``field`` when a
+    top-level field (summary, details, references) is complete, then
+    ``done`` with the full ExplainResponse, or ``error``.
+    """
+    client = get_gemini_client()
+    prompt = create_explanation_prompt(
+        selection_text=request.selection_text,
+        domain=request.domain,
+        depth=request.depth
+    )
+    
+    async def events():
+        parser = JSONFieldStream()
+        try:
+            async for chunk in client.astream_text(prompt):
+                yield _sse("token", {"text": chunk})
+                for name, value in parser.feed(chunk):
+                    yield _sse("field", {"name": name, "value": value})
+            
+            result = parser.fields if parser.closed else parse_json_response(parser.buffer)
+            yield _sse("done", _build_response(result).model_dump())
+        except Exception as e:
+            yield _sse("error", {"detail": f"Failed to generate explanation: {str(e)}"})
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -0,0 +1,22 @@
+"""Gemini usage and scheduling metrics."""
+from fastapi import APIRouter
+from app.schemas.llm import LLMStatsResponse
+from app.services.embedding_cache import embedding_cache_stats
+from app.services.gemini_client import single_flight_stats
+from app.services.llm_scheduler import llm_scheduler_stats
+from app.services.response_cache import response_cache_stats
+from app.services.token_usage import token_usage_stats
+
+router = APIRouter(prefix="/api/v1/llm", tags=["llm"])
+
+
+@router.get("/stats", response_model=LLMStatsResponse)
+async def llm_stats():
+    """Report scheduler queue depth, wait times, retries, cache hit rates, coalesced calls and token usage."""
+    return LLMStatsResponse(
+        scheduler=llm_scheduler_stats(),
+        response_cache=response_cache_stats(),
+        embedding_cache=embedding_cache_stats(),
+        single_flight=single_flight_stats(),
+        token_usage=token_usage_stats()
+    )
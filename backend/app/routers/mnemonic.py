@@ -2,9 +2,16 @@
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from app.database import get_db
-from app.schemas.word import MnemonicRequest, MnemonicResponse, WordCreate, WordResponse
+from app.config import settings
+from app.schemas.word import (
+    MnemonicBatchFailure, MnemonicBatchRequest, MnemonicBatchResponse, MnemonicRequest,
+    MnemonicResponse, WordCreate, WordResponse
+)
 from app.services.gemini_client import get_gemini_client
-from app.services.vector_store import get_vector_store
+from app.services.llm_scheduler import BULK, llm_priority
+from app.services.mnemonic_batch import generate_mnemonic_batch
+from app.services.response_cache import acached_generate_json
+from app.services.embedding_worker import enqueue_embedding, enqueue_embeddings
 from app.prompts.mnemonic import create_mnemonic_prompt
 from app.models.word import Word
 
@@ -29,14 +36,86 @@ async def generate_mnemonic(
         )
         
         # Generate mnemonic
-        result = client.generate_json(prompt, temperature=request.temperature)
+        result = await acached_generate_json(
+            client,
+            prompt,
+            temperature=request.temperature,
+            endpoint="mnemonic",
+            cache=request.cache
+        )
         
         return MnemonicResponse(**result)
-        
+    
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to generate mnemonic: {str(e)}")
 
 
+@router.post("/generate-batch", response_model=MnemonicBatchResponse)
+async def generate_mnemonics(
+    request: MnemonicBatchRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    Generate mnemonics for many words, several words per prompt.
+    
+    Packs run concurrently; only words that fail validation are retried.
+    With ``save``, new words are stored in one transaction and queued for
+    embedding together.
+    """
+    try:
+        client = get_gemini_client()
+        words = [word.strip() for word in request.words if word.strip()]
+        
+        # Deck building yields to interactive requests in the scheduler
+        with llm_priority(BULK):
+            results, errors = await generate_mnemonic_batch(
+                client,
+                words,
+                style=request.style,
+                temperature=request.temperature,
+                pack_size=request.pack_size or settings.mnemonic_batch_size,
+                concurrency=settings.mnemonic_batch_concurrency,
+                max_attempts=settings.mnemonic_batch_max_attempts
+            )
+        
+        mnemonics = [results[word] for word in dict.fromkeys(words) if word in results]
+        response = MnemonicBatchResponse(
+            mnemonics=mnemonics,
+            failed=[MnemonicBatchFailure(word=word, error=error) for word, error in errors.items()]
+        )
+        
+        if request.save and mnemonics:
+            existing = {
+                word for (word,) in db.query(Word.word).filter(
+                    Word.word.in_([m.word for m in mnemonics])
+                )
+            }
+            new_words = []
+            for mnemonic in mnemonics:
+                if mnemonic.word in existing:
+                    response.existing.append(mnemonic.word)
+                    continue
+                existing.add(mnemonic.word)
+                new_words.append(Word(
+                    **mnemonic.model_dump(exclude={"tags", "source"}),
+                    tags=request.tags or mnemonic.tags,
+                    source=request.source or mnemonic.source
+                ))
+            
+            db.add_all(new_words)
+            db.flush()
+            response.saved_ids = [word.id for word in new_words]
+            
+            # Commits the words together with their embedding jobs
+            enqueue_embeddings(db, response.saved_ids, "word")
+        
+        return response
+    
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Failed to generate mnemonics: {str(e)}")
+
+
 @router.post("/save", response_model=WordResponse)
 async def save_mnemonic(
     word_data: WordCreate,
@@ -69,32 +148,11 @@ async def save_mnemonic(
         db.commit()
         db.refresh(word)
         
-        # Generate and store embedding
-        try:
-            client = get_gemini_client()
-            vector_store = get_vector_store()
-            
-            # Create text for embedding
-            embed_text = f"{word.word} {word.gre_definition or ''} {word.story or ''}"
-            embedding = client.generate_embedding(embed_text)
-            
-            # Add to vector store
-            vector_id = vector_store.add_vector(
-                embedding,
-                word.id,
-                "word",
-                db
-            )
-            
-            word.embedding_vector_id = vector_id
-            db.commit()
-            db.refresh(word)
-            
-        except Exception as e:
-            print(f"Warning: Failed to create embedding: {e}")
+        # Embedding is generated in the background
+        enqueue_embedding(db, word.id, "word")
         
         return WordResponse(**word.to_dict())
-        
+    
     except HTTPException:
         raise
     except Exception as e:
@@ -7,6 +7,7 @@ from app.schemas.word import WordResponse, WordUpdate
 from app.models.word import Word
 from app.services.gemini_client import get_gemini_client
 from app.services.vector_store import get_vector_store
+from app.services.embedding_worker import enqueue_embedding
 
 router = APIRouter(prefix="/api/v1/words", tags=["words"])
 
@@ -16,6 +17,8 @@ async def search_words(
     q: str = Query(default="", description="Search query"),
     tags: Optional[str] = Query(default=None, description="Comma-separated tags"),
     limit: int = Query(default=20, ge=1, le=100),
+    nprobe: Optional[int] = Query(default=None, ge=1, description="IVF lists to scan"),
+    ef_search: Optional[int] = Query(default=None, ge=1, description="HNSW candidate list size"),
     db: Session = Depends(get_db)
 ):
     """
@@ -40,30 +43,19 @@ async def search_words(
             vector_store = get_vector_store()
             
             # Generate query embedding
-            query_embedding = client.generate_embedding(q)
+            query_embedding = await client.agenerate_embedding(q)
             
-            # Search in vector store
-            results = vector_store.search(
+            # Search in vector store, hydrating words in rank order
+            results = vector_store.search_objects(
                 query_embedding,
                 k=limit,
                 db=db,
-                object_type="word"
+                object_type="word",
+                nprobe=nprobe,
+                ef_search=ef_search
             )
             
-            # Get word IDs from results
-            word_ids = [r[0] for r in results]
-            
-            if word_ids:
-                # Fetch words maintaining order
-                words = []
-                for word_id in word_ids:
-                    word = db.query(Word).filter(Word.id == word_id).first()
-                    if word:
-                        words.append(word)
-                
-                return [WordResponse(**w.to_dict()) for w in words]
-            else:
-                return []
+            return [WordResponse(**word.to_dict()) for word, _ in results]
         
         # Otherwise return recent words
         words = query.order_by(Word.created_at.desc()).limit(limit).all()
@@ -102,26 +94,9 @@ async def update_word(
     db.commit()
     db.refresh(word)
     
-    # Update embedding if content changed
+    # Re-embed in the background if content changed
     if any(k in update_data for k in ['word', 'gre_definition', 'story']):
-        try:
-            client = get_gemini_client()
-            embed_text = f"{word.word} {word.gre_definition or ''} {word.story or ''}"
-            embedding = client.generate_embedding(embed_text)
-            
-            vector_store = get_vector_store()
-            
-            # Delete old vector if exists
-            if word.embedding_vector_id:
-                vector_store.delete_vector(word.embedding_vector_id, db)
-            
-            # Add new vector
-            vector_id = vector_store.add_vector(embedding, word.id, "word", db)
-            word.embedding_vector_id = vector_id
-            db.commit()
-            
-        except Exception as e:
-            print(f"Warning: Failed to update embedding: {e}")
+        enqueue_embedding(db, word.id, "word")
     
     return WordResponse(**word.to_dict())
 
@@ -5,6 +5,8 @@ from app.schemas.clip import ClipRequest, ClipResponse
 from app.schemas.explain import ExplainRequest, ExplainResponse
 from app.schemas.session import SessionStartRequest, SessionResponse
 from app.schemas.awa import AWAGradeRequest, AWAGradeResponse
+from app.schemas.embedding import EmbeddingStatusResponse
+from app.schemas.llm import LLMStatsResponse
 
 __all__ = [
     "WordCreate", "WordUpdate", "WordResponse", "MnemonicRequest",
@@ -12,5 +14,7 @@ __all__ = [
     "ClipRequest", "ClipResponse",
     "ExplainRequest", "ExplainResponse",
     "SessionStartRequest", "SessionResponse",
-    "AWAGradeRequest", "AWAGradeResponse"
+    "AWAGradeRequest", "AWAGradeResponse",
+    "EmbeddingStatusResponse",
+    "LLMStatsResponse"
 ]
@@ -0,0 +1,14 @@
+"""Embedding queue schemas."""
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+
+
+class EmbeddingStatusResponse(BaseModel):
+    """Response schema for the embedding backlog."""
+    pending: int
+    running: int
+    done: int
+    failed: int
+    oldest_pending_seconds: Optional[float] = None
+    workers: int
+    cache: Optional[Dict[str, Any]] = None
@@ -0,0 +1,18 @@
+"""Import job schemas."""
+from typing import Any, Dict, Optional
+from pydantic import BaseModel
+
+
+class ImportJobResponse(BaseModel):
+    """Response schema for a background import job."""
+    id: str
+    kind: str
+    filename: str
+    status: str
+    units_total: Optional[int] = None
+    units_completed: int
+    stats: Dict[str, Any]
+    error: Optional[str] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+    finished_at: Optional[str] = None
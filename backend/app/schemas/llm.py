@@ -0,0 +1,13 @@
+"""Gemini usage schemas."""
+from typing import Any, Dict, Optional
+from pydantic import BaseModel, Field
+
+
+class LLMStatsResponse(BaseModel):
+    """Response schema for Gemini client metrics."""
+    scheduler: Optional[Dict[str, Any]] = None
+    response_cache: Dict[str, Dict[str, Any]] = Field(default_factory=dict)
+    embedding_cache: Optional[Dict[str, Any]] = None
+    single_flight: Dict[str, int] = Field(default_factory=dict)
+    # Prompt/completion tokens per route and budget truncations/splits per endpoint
+    token_usage: Dict[str, Any] = Field(default_factory=dict)
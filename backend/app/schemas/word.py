@@ -67,8 +67,37 @@ class MnemonicRequest(BaseModel):
     pos: Optional[str] = None
     style: str = Field(default="prude", pattern="^(prude|compact|story)$")
     temperature: float = Field(default=0.7, ge=0.0, le=2.0)
+    # None caches only temperature-0 requests
+    cache: Optional[bool] = None
 
 
 class MnemonicResponse(WordBase):
     """Response schema for generated mnemonics."""
     pass
+
+
+class MnemonicBatchRequest(BaseModel):
+    """Request schema for generating mnemonics for many words."""
+    words: List[str] = Field(min_length=1, max_length=1000)
+    style: str = Field(default="prude", pattern="^(prude|compact|story)$")
+    temperature: float = Field(default=0.7, ge=0.0, le=2.0)
+    # Words per prompt; None uses MNEMONIC_BATCH_SIZE
+    pack_size: Optional[int] = Field(default=None, ge=1, le=50)
+    save: bool = Field(default=False)
+    tags: List[str] = Field(default_factory=list)
+    source: Optional[str] = None
+
+
+class MnemonicBatchFailure(BaseModel):
+    """A word whose mnemonic could not be generated."""
+    word: str
+    error: str
+
+
+class MnemonicBatchResponse(BaseModel):
+    """Response schema for batch mnemonic generation."""
+    mnemonics: List[MnemonicResponse] = Field(default_factory=list)
+    failed: List[MnemonicBatchFailure] = Field(default_factory=list)
+    saved_ids: List[str] = Field(default_factory=list)
+    # Generated but not saved because the word already exists
+    existing: List[str] = Field(default_factory=list)
@@ -0,0 +1,147 @@
+"""Pack PDF text into token-sized extraction windows along question boundaries, and score them."""
+import re
+from typing import AsyncIterator, List, Tuple
+from app.services.token_usage import estimate_tokens
+
+
+# "12. ", "12) ", "Question 12." - the start of a numbered item
+QUESTION_START = re.compile(r"^\s*(?:Question\s+|Q\.?\s*)?\d{1,3}\s*[.)]\s+\S", re.IGNORECASE)
+
+# "(A) ", "A. ", "B) " - answer choices stay with their stem
+CHOICE_LINE = re.compile(r"^\s*(?:\([A-Ea-e]\)|[A-E][.)])\s+")
+
+# Answer-choice markers anywhere in a line: "(A)", or "A." / "B)" after a line start or gap
+CHOICE_MARKER = re.compile(r"\(([A-E])\)|(?:^|\s)([A-E])[.)]\s", re.MULTILINE)
+
+# Text completion blanks: "_____" or "Blank (i)"
+BLANK = re.compile(r"_{3,}|\bBlank\s*\((?:i|ii|iii)\)", re.IGNORECASE)
+
+QUANTITY_COMPARISON = re.compile(r"\bQuantity\s+A\b.*\bQuantity\s+B\b", re.IGNORECASE | re.DOTALL)
+
+# GRE instruction wording
+QUESTION_PHRASE = re.compile(
+    r"which of the following|what is the value|select (?:one|two|the)|indicate all"
+    r"|must be true|closest in meaning|according to the passage",
+    re.IGNORECASE
+)
+
+# Arithmetic such as "x + 3 = 7"
+EQUATION = re.compile(r"[\w)]\s*[=<>]\s*[\w(-]|\w\s+[-+*/]\s+[\w(]")
+
+
+class QuestionChunker:
+    """
+    Splits streamed text into units - numbered items with their answer
+    choices, or paragraphs - and packs adjacent units into windows of
+    about ``target_tokens``.
+    
+    Units continue across page breaks, so a question split over two pages
+    stays whole. Each window after the first starts with up to
+    ``overlap_tokens`` of trailing lines from the previous one, for
+    context. A unit larger than the target gets a window of its own.
+    """
+    
+    def __init__(self, target_tokens: int, overlap_tokens: int = 0):
+        """Initialize an empty chunker."""
+        self.target_tokens = target_tokens
+        self.overlap_tokens = overlap_tokens
+        self._unit: List[str] = []
+        self._window: List[str] = []
+        self._window_tokens = 0
+        self._has_content = False
+        self._paragraph_break = False
+    
+    def feed(self, text: str) -> List[str]:
+        """Add a page of text and return the windows it completed."""
+        windows = []
+        for line in text.splitlines():
+            if not line.strip():
+                self._paragraph_break = True
+                continue
+            
+            starts_unit = QUESTION_START.match(line) or (
+                self._paragraph_break and not CHOICE_LINE.match(line)
+            )
+            if starts_unit and self._unit:
+                windows.extend(self._close_unit())
+            self._unit.append(line)
+            self._paragraph_break = False
+        return windows
+    
+    def finish(self) -> List[str]:
+        """Return the remaining windows."""
+        windows = self._close_unit() if self._unit else []
+        if self._has_content:
+            windows.append(self._emit())
+        return windows
+    
+    def _close_unit(self) -> List[str]:
+        """Add the current unit to the window, emitting the window if it is full."""
+        unit = "\n".join(self._unit)
+        self._unit = []
+        tokens = estimate_tokens(unit)
+        
+        windows = []
+        if self._has_content and self._window_tokens + tokens > self.target_tokens:
+            windows.append(self._emit())
+        self._window.append(unit)
+        self._window_tokens += tokens
+        self._has_content = True
+        return windows
+    
+    def _emit(self) -> str:
+        """Return the current window and start the next one with the overlap."""
+        window = "\n".join(self._window)
+        
+        overlap: List[str] = []
+        overlap_tokens = 0
+        for line in reversed(window.splitlines()):
+            tokens = estimate_tokens(line)
+            if overlap_tokens + tokens > self.overlap_tokens:
+                break
+            overlap.insert(0, line)
+            overlap_tokens += tokens
+        
+        self._window = ["\n".join(overlap)] if overlap else []
+        self._window_tokens = overlap_tokens
+        self._has_content = False
+        return window
+
+
+def question_score(text: str) -> float:
+    """
+    Cheap local estimate of how likely ``text`` holds a practice question.
+    
+    Adds up regex features - answer-choice markers, numbered items,
+    question marks, Quantity A/B, blanks, instruction wording, equations -
+    so that prose, answer keys and tables of contents score low and skip
+    the LLM. Question marks weigh less than blanks and numbering, so a few
+    rhetorical questions don't outrank a numbered fill-in-the-blank stem.
+    """
+    letters = {a or b for a, b in CHOICE_MARKER.findall(text)}
+    score = 0.5 * len(letters)
+    if any(QUESTION_START.match(line) for line in text.splitlines()):
+        score += 1
+    score += 0.75 * min(text.count("?"), 2)
+    score += 1.5 * min(len(BLANK.findall(text)), 2)
+    if QUANTITY_COMPARISON.search(text):
+        score += 3
+    if QUESTION_PHRASE.search(text):
+        score += 1
+    if EQUATION.search(text):
+        score += 0.5
+    return score
+
+
+async def aiter_chunks(
+    pages: AsyncIterator[Tuple[int, str]],
+    target_tokens: int,
+    overlap_tokens: int = 0
+) -> AsyncIterator[str]:
+    """Pack streamed (page number, text) pairs into extraction windows."""
+    chunker = QuestionChunker(target_tokens, overlap_tokens)
+    async for _, text in pages:
+        for window in chunker.feed(text):
+            yield window
+    for window in chunker.finish():
+        yield window
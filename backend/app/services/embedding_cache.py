@@ -0,0 +1,279 @@
+"""Persistent content-addressed cache for text embeddings."""
+import hashlib
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+import numpy as np
+from app.config import settings
+from app.services.gemini_client import GeminiClientInterface
+
+
+# Distinct texts per IN query, under SQLite's default bound-variable limit
+LOOKUP_BATCH = 500
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed map from (embedding model, text hash) to a float32 vector.
+    
+    Entries are evicted least-recently-used first once the cache holds more
+    than ``max_entries`` vectors. Hit and miss counts cover the lifetime of
+    the process.
+    """
+    
+    def __init__(self, path: Path, max_entries: int):
+        """Open (or create) the cache database at ``path``."""
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash TEXT NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used INTEGER NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS ix_embeddings_last_used ON embeddings (last_used)"
+        )
+        self._conn.commit()
+        self._size, self._clock = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(MAX(last_used), 0) FROM embeddings"
+        ).fetchone()
+    
+    @staticmethod
+    def text_hash(text: str) -> str:
+        """Content address of ``text``."""
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+    
+    def _tick(self) -> int:
+        """Next value of the logical access clock used for LRU order."""
+        self._clock += 1
+        return self._clock
+    
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Return the cached embedding of ``text``, or None."""
+        key = (model, self.text_hash(text))
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT vector FROM embeddings WHERE model = ? AND text_hash = ?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            
+            self.hits += 1
+            self._conn.execute(
+                "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                (self._tick(),) + key
+            )
+            self._conn.commit()
+        return np.frombuffer(row[0], dtype="<f4").tolist()
+    
+    def get_many(self, model: str, texts: List[str]) -> List[Optional[List[float]]]:
+        """
+        Return the cached embedding of each text (None for misses).
+        
+        Lookups run as one IN query per ``LOOKUP_BATCH`` distinct texts and
+        every hit is touched in a single commit.
+        """
+        hashes = [self.text_hash(text) for text in texts]
+        distinct = list(dict.fromkeys(hashes))
+        with self._lock:
+            found: Dict[str, bytes] = {}
+            for start in range(0, len(distinct), LOOKUP_BATCH):
+                batch = distinct[start:start + LOOKUP_BATCH]
+                rows = self._conn.execute(
+                    "SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN "
+                    f"({', '.join('?' * len(batch))})",
+                    [model] + batch
+                ).fetchall()
+                found.update(rows)
+            
+            hits = sum(1 for text_hash in hashes if text_hash in found)
+            self.hits += hits
+            self.misses += len(hashes) - hits
+            if found:
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+                    [(self._tick(), model, text_hash) for text_hash in found]
+                )
+                self._conn.commit()
+        
+        vectors = {
+            text_hash: np.frombuffer(blob, dtype="<f4").tolist()
+            for text_hash, blob in found.items()
+        }
+        return [vectors.get(text_hash) for text_hash in hashes]
+    
+    def put(self, model: str, text: str, embedding: List[float]):
+        """Store the embedding of ``text``, evicting old entries if full."""
+        self.put_many(model, [text], [embedding])
+    
+    def put_many(self, model: str, texts: List[str], embeddings: List[List[float]]):
+        """
+        Store the embedding of each text with one insert pass, one eviction
+        pass and one commit.
+        """
+        rows = {
+            self.text_hash(text): np.asarray(embedding, dtype="<f4").tobytes()
+            for text, embedding in zip(texts, embeddings)
+        }
+        if not rows:
+            return
+        
+        distinct = list(rows)
+        with self._lock:
+            existing = 0
+            for start in range(0, len(distinct), LOOKUP_BATCH):
+                batch = distinct[start:start + LOOKUP_BATCH]
+                existing += self._conn.execute(
+                    "SELECT COUNT(*) FROM embeddings WHERE model = ? AND text_hash IN "
+                    f"({', '.join('?' * len(batch))})",
+                    [model] + batch
+                ).fetchone()[0]
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) "
+                "VALUES (?, ?, ?, ?)",
+                [(model, text_hash, blob, self._tick()) for text_hash, blob in rows.items()]
+            )
+            self._size += len(rows) - existing
+            
+            overflow = self._size - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM embeddings WHERE rowid IN ("
+                    " SELECT rowid FROM embeddings ORDER BY last_used LIMIT ?)",
+                    (overflow,)
+                )
+                self._size -= overflow
+            self._conn.commit()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+    
+    def close(self):
+        """Close the cache database."""
+        with self._lock:
+            self._conn.close()
+
+
+class CachingGeminiClient(GeminiClientInterface):
+    """
+    Wraps any client so repeated embeddings of the same text are served
+    from an ``EmbeddingCache`` without a network call.
+    """
+    
+    def __init__(
+        self,
+        client: GeminiClientInterface,
+        cache: EmbeddingCache,
+        model: Optional[str] = None
+    ):
+        """Initialize the wrapper around ``client``."""
+        self.client = client
+        self.cache = cache
+        # Vectors from different embedding models must never be mixed
+        self.model = model or getattr(client, "embedding_model_name", type(client).__name__)
+    
+    @property
+    def model_name(self) -> str:
+        """Generation model of the wrapped client."""
+        return getattr(self.client, "model_name", type(self.client).__name__)
+    
+    def generate_text(self, prompt: str, temperature: float = 0.7) -> str:
+        """Generate text using the wrapped client."""
+        return self.client.generate_text(prompt, temperature)
+    
+    def generate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
+        """Generate JSON using the wrapped client."""
+        return self.client.generate_json(prompt, temperature)
+    
+    def generate_embedding(self, text: str) -> List[float]:
+        """Generate embeddings for text, consulting the cache first."""
+        cached = self.cache.get(self.model, text)
+        if cached is not None:
+            return cached
+        
+        embedding = self.client.generate_embedding(text)
+        self.cache.put(self.model, text, embedding)
+        return embedding
+    
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for many texts, sending only cache misses upstream."""
+        cached = self.cache.get_many(self.model, texts)
+        missing = [i for i, vector in enumerate(cached) if vector is None]
+        
+        if missing:
+            fresh = self.client.generate_embeddings([texts[i] for i in missing])
+            self.cache.put_many(self.model, [texts[i] for i in missing], list(fresh))
+            for i, vector in zip(missing, fresh):
+                cached[i] = vector
+        
+        if not texts:
+            return self.client.generate_embeddings([])
+        return np.asarray(cached, dtype=np.float32)
+    
+    def function_call(
+        self,
+        prompt: str,
+        functions: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Execute function calling using the wrapped client."""
+        return self.client.function_call(prompt, functions)
+    
+    async def agenerate_text(self, prompt: str, temperature: float = 0.7) -> str:
+        """Generate text using the wrapped client."""
+        return await self.client.agenerate_text(prompt, temperature)
+    
+    async def agenerate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
+        """Generate JSON using the wrapped client."""
+        return await self.client.agenerate_json(prompt, temperature)
+    
+    async def agenerate_embedding(self, text: str) -> List[float]:
+        """Generate embeddings for text, consulting the cache first."""
+        cached = self.cache.get(self.model, text)
+        if cached is not None:
+            return cached
+        
+        embedding = await self.client.agenerate_embedding(text)
+        self.cache.put(self.model, text, embedding)
+        return embedding
+    
+    def astream_text(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Stream text using the wrapped client."""
+        return self.client.astream_text(prompt, temperature)
+
+
+# Global cache instance
+_cache: Optional[EmbeddingCache] = None
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Get the embedding cache stored in the data directory."""
+    global _cache
+    if _cache is None:
+        _cache = EmbeddingCache(
+            settings.expanded_data_dir / "embedding_cache.db",
+            settings.embedding_cache_size
+        )
+    return _cache
+
+
+def embedding_cache_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the embedding cache, or None if it was never opened."""
+    return _cache.stats() if _cache is not None else None
@@ -0,0 +1,203 @@
+"""Memory-mapped on-disk store for raw embedding vectors."""
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+import numpy as np
+
+
+# Rows reserved the first time the store is created
+INITIAL_CAPACITY = 1024
+
+# Marker for unused rows in the id array
+EMPTY_ID = -1
+
+# Names the generation of the file pair in use; replacing it is the commit point
+CURRENT_FILE = "embedding_store.current"
+
+
+class EmbeddingStore:
+    """
+    Keeps every embedding next to the FAISS index so the index can be
+    rebuilt, compacted or migrated without re-embedding anything.
+    
+    Vectors live in a float32 ``.npy`` matrix and their vector IDs in a
+    parallel int64 ``.npy`` array. Both are memory-mapped and grown by
+    doubling, so appends are cheap and reads never load the whole file.
+    
+    Rewrites produce a new generation of both files and then switch
+    ``CURRENT_FILE`` to it with one rename, so a crash mid-rewrite leaves
+    either the old pair or the new one, never a mix.
+    """
+    
+    def __init__(self, directory: Path, dimension: int):
+        """Open (or lazily create) the store in ``directory``."""
+        self.directory = Path(directory)
+        self.dimension = dimension
+        self.current_file = self.directory / CURRENT_FILE
+        self.generation = 0
+        self._vectors: Optional[np.ndarray] = None
+        self._ids: Optional[np.ndarray] = None
+        self.size = 0
+        self._open()
+    
+    def _paths(self, generation: int) -> Tuple[Path, Path]:
+        """Vector and id files of ``generation`` (0 is the original, unversioned pair)."""
+        suffix = f".{generation}" if generation else ""
+        return (
+            self.directory / f"embeddings{suffix}.npy",
+            self.directory / f"embedding_ids{suffix}.npy"
+        )
+    
+    @property
+    def vectors_file(self) -> Path:
+        """Vector file of the current generation."""
+        return self._paths(self.generation)[0]
+    
+    @property
+    def ids_file(self) -> Path:
+        """Id file of the current generation."""
+        return self._paths(self.generation)[1]
+    
+    def _stale_files(self) -> List[Path]:
+        """Files left by other generations or an interrupted rewrite."""
+        current = set(self._paths(self.generation))
+        return [
+            path
+            for pattern in ("embeddings*.npy", "embedding_ids*.npy", "*.npy.tmp", f"{CURRENT_FILE}.tmp")
+            for path in self.directory.glob(pattern)
+            if path not in current
+        ]
+    
+    def _open(self):
+        """Memory-map the current generation, if any, and drop stale files."""
+        if self.current_file.exists():
+            self.generation = int(self.current_file.read_text().strip())
+        if not self.directory.exists():
+            return
+        for path in self._stale_files():
+            path.unlink(missing_ok=True)
+        if not (self.vectors_file.exists() and self.ids_file.exists()):
+            return
+        
+        vectors = np.load(self.vectors_file, mmap_mode="r+")
+        ids = np.load(self.ids_file, mmap_mode="r+")
+        if vectors.ndim != 2 or vectors.shape[1] != self.dimension:
+            raise ValueError(
+                f"Embedding store has shape {vectors.shape}, "
+                f"expected dimension {self.dimension}"
+            )
+        if ids.shape[0] != vectors.shape[0]:
+            raise ValueError("Embedding store vector and id files disagree")
+        
+        self._vectors = vectors
+        self._ids = ids
+        # Rows are filled contiguously, so every used row has a valid id
+        self.size = int(np.count_nonzero(ids != EMPTY_ID))
+    
+    @property
+    def capacity(self) -> int:
+        """Number of rows allocated on disk."""
+        return 0 if self._ids is None else self._ids.shape[0]
+    
+    def _write(self, vectors: np.ndarray, ids: np.ndarray, capacity: int):
+        """Atomically replace the files with ``vectors``/``ids`` padded to ``capacity``."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        count = len(ids)
+        
+        generation = self.generation + 1
+        new_vectors_file, new_ids_file = self._paths(generation)
+        
+        new_vectors = np.lib.format.open_memmap(
+            new_vectors_file, mode="w+", dtype=np.float32,
+            shape=(capacity, self.dimension)
+        )
+        new_vectors[:count] = vectors
+        new_vectors.flush()
+        
+        new_ids = np.lib.format.open_memmap(
+            new_ids_file, mode="w+", dtype=np.int64, shape=(capacity,)
+        )
+        new_ids[:] = EMPTY_ID
+        new_ids[:count] = ids
+        new_ids.flush()
+        del new_vectors, new_ids
+        
+        # Until this rename the old generation is still the store
+        tmp_current = self.current_file.with_name(f"{CURRENT_FILE}.tmp")
+        with open(tmp_current, "w") as f:
+            f.write(str(generation))
+            f.flush()
+            os.fsync(f.fileno())
+        self._vectors = None
+        self._ids = None
+        os.replace(tmp_current, self.current_file)
+        self._open()
+    
+    def _grow(self, min_capacity: int):
+        """Reallocate the files with at least ``min_capacity`` rows."""
+        capacity = max(INITIAL_CAPACITY, self.capacity * 2, min_capacity)
+        self._write(self.vectors(), self.ids(), capacity)
+    
+    def append(self, vectors: np.ndarray, ids: np.ndarray):
+        """Append a block of vectors with their vector IDs."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        if len(vectors) != len(ids):
+            raise ValueError("Number of vectors and ids must match")
+        if len(ids) == 0:
+            return
+        
+        end = self.size + len(ids)
+        if end > self.capacity:
+            self._grow(end)
+        
+        # Not flushed here: the vector log makes appends durable and
+        # snapshots call flush()
+        self._vectors[self.size:end] = vectors
+        self._ids[self.size:end] = ids
+        self.size = end
+    
+    def flush(self):
+        """Write dirty pages of both files to disk."""
+        if self._vectors is not None:
+            self._vectors.flush()
+            self._ids.flush()
+    
+    def truncate(self, size: int):
+        """Drop every row from ``size`` onwards."""
+        if size >= self.size:
+            return
+        self._ids[size:self.size] = EMPTY_ID
+        self._ids.flush()
+        self.size = size
+    
+    def vectors(self) -> np.ndarray:
+        """Return a read-only view of all stored vectors."""
+        if self._vectors is None:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        view = self._vectors[:self.size]
+        view.flags.writeable = False
+        return view
+    
+    def ids(self) -> np.ndarray:
+        """Return a read-only view of all stored vector IDs."""
+        if self._ids is None:
+            return np.empty((0,), dtype=np.int64)
+        view = self._ids[:self.size]
+        view.flags.writeable = False
+        return view
+    
+    def delete(self):
+        """Remove every file of the store."""
+        self._vectors = None
+        self._ids = None
+        self.size = 0
+        for path in self._stale_files() + list(self._paths(self.generation)) + [self.current_file]:
+            path.unlink(missing_ok=True)
+    
+    def replace(self, vectors: np.ndarray, ids: np.ndarray):
+        """Replace the whole store, e.g. after compaction."""
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        ids = np.asarray(ids, dtype=np.int64).reshape(-1)
+        capacity = max(INITIAL_CAPACITY, len(ids))
+        self._write(np.array(vectors), np.array(ids), capacity)
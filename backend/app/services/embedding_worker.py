@@ -0,0 +1,307 @@
+"""Background embedding queue and worker pool."""
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func
+from sqlalchemy.orm import Session, aliased
+from app.config import settings
+from app.database import SessionLocal
+from app.models.embedding_job import EmbeddingJob
+from app.services.embedding_cache import embedding_cache_stats
+from app.services.gemini_client import get_gemini_client
+from app.services.llm_scheduler import BULK, llm_priority
+from app.services.token_usage import llm_route
+from app.services.vector_store import OBJECT_MODELS, get_vector_store
+
+
+def embedding_text(obj: Any, object_type: str) -> str:
+    """Text that represents an object in the vector store."""
+    if object_type == "word":
+        return f"{obj.word} {obj.gre_definition or ''} {obj.story or ''}"
+    if object_type == "question":
+        return f"{obj.question_text} {obj.explanation or ''}"
+    raise ValueError(f"Unknown object type: {object_type}")
+
+
+def enqueue_embedding(db: Session, object_id: str, object_type: str) -> EmbeddingJob:
+    """
+    Queue an object for (re-)embedding and commit.
+    
+    A job that is still pending for the same object is reused, so rapid
+    edits only cost one embedding call.
+    """
+    job = db.query(EmbeddingJob).filter(
+        EmbeddingJob.object_id == object_id,
+        EmbeddingJob.object_type == object_type,
+        EmbeddingJob.status == "pending"
+    ).first()
+    
+    if job is None:
+        job = EmbeddingJob(object_id=object_id, object_type=object_type)
+        db.add(job)
+    db.commit()
+    
+    worker = _worker
+    if worker is not None:
+        worker.notify()
+    
+    return job
+
+
+def enqueue_embeddings(db: Session, object_ids: List[str], object_type: str) -> int:
+    """
+    Queue many objects for embedding with one lookup and one commit.
+    
+    Returns the number of new jobs (objects already pending are skipped).
+    """
+    pending = {
+        object_id for (object_id,) in db.query(EmbeddingJob.object_id).filter(
+            EmbeddingJob.object_id.in_(object_ids),
+            EmbeddingJob.object_type == object_type,
+            EmbeddingJob.status == "pending"
+        )
+    } if object_ids else set()
+    
+    new_ids = [object_id for object_id in dict.fromkeys(object_ids) if object_id not in pending]
+    db.add_all([EmbeddingJob(object_id=object_id, object_type=object_type) for object_id in new_ids])
+    db.commit()
+    
+    worker = _worker
+    if worker is not None and new_ids:
+        worker.notify()
+    
+    return len(new_ids)
+
+
+# Serializes job claiming between worker threads
+_claim_lock = threading.Lock()
+
+
+def _claim_jobs(db: Session, limit: int) -> List[EmbeddingJob]:
+    """
+    Mark up to ``limit`` pending jobs as running and return them.
+    
+    Objects with a job already running are left for a later batch, so two
+    workers never replace the same object's vector at once.
+    """
+    running = aliased(EmbeddingJob)
+    with _claim_lock:
+        jobs = db.query(EmbeddingJob).filter(
+            EmbeddingJob.status == "pending",
+            ~db.query(running).filter(
+                running.object_id == EmbeddingJob.object_id,
+                running.object_type == EmbeddingJob.object_type,
+                running.status == "running"
+            ).exists()
+        ).order_by(EmbeddingJob.created_at).limit(limit).all()
+        
+        for job in jobs:
+            job.status = "running"
+        db.commit()
+    return jobs
+
+
+def _record_failure(jobs: List[EmbeddingJob], error: Exception):
+    """Send jobs back to pending, or park them as failed once out of attempts."""
+    for job in jobs:
+        job.attempts = (job.attempts or 0) + 1
+        job.last_error = str(error)
+        job.status = "failed" if job.attempts >= settings.embedding_max_attempts else "pending"
+
+
+def _index_vectors(jobs: List[EmbeddingJob], objects: List[Any], vectors: List, db: Session):
+    """Add the new vectors, point the objects at them, then drop their old vectors."""
+    vector_store = get_vector_store()
+    old_vector_ids = [obj.embedding_vector_id for obj in objects]
+    
+    vector_ids = vector_store.add_vectors(
+        vectors,
+        [job.object_id for job in jobs],
+        [job.object_type for job in jobs],
+        db
+    )
+    for job, obj, vector_id in zip(jobs, objects, vector_ids):
+        obj.embedding_vector_id = vector_id
+        job.status = "done"
+        job.last_error = None
+    db.commit()
+    
+    # Replace vectors from earlier versions only once the new ones are live
+    for vector_id in old_vector_ids:
+        if vector_id is None:
+            continue
+        try:
+            vector_store.delete_vector(vector_id, db)
+        except Exception as e:
+            print(f"Warning: Failed to delete replaced vector {vector_id}: {e}")
+
+
+def process_embedding_jobs(db: Session, limit: Optional[int] = None) -> int:
+    """
+    Embed one batch of pending jobs and index the results.
+    
+    Objects that were deleted in the meantime are skipped. Failed jobs go
+    back to pending until they run out of attempts.
+    
+    Returns:
+        Number of jobs claimed
+    """
+    jobs = _claim_jobs(db, limit or settings.embedding_batch_size)
+    if not jobs:
+        return 0
+    
+    # Load every object in the batch with one IN query per type
+    objects: Dict[tuple, Any] = {}
+    ids_by_type: Dict[str, set] = {}
+    for job in jobs:
+        ids_by_type.setdefault(job.object_type, set()).add(job.object_id)
+    for object_type, object_ids in ids_by_type.items():
+        model = OBJECT_MODELS[object_type]
+        for obj in db.query(model).filter(model.id.in_(object_ids)).all():
+            objects[(object_type, obj.id)] = obj
+    
+    embedded_jobs, embedded_objects = [], []
+    for job in jobs:
+        obj = objects.get((job.object_type, job.object_id))
+        if obj is None:
+            job.status = "done"
+            continue
+        embedded_jobs.append(job)
+        embedded_objects.append(obj)
+    
+    vectors = None
+    if embedded_jobs:
+        try:
+            vectors = get_gemini_client().generate_embeddings([
+                embedding_text(obj, job.object_type)
+                for job, obj in zip(embedded_jobs, embedded_objects)
+            ])
+        except Exception as e:
+            _record_failure(embedded_jobs, e)
+            print(f"Warning: Failed to create embeddings for {len(embedded_jobs)} jobs: {e}")
+    
+    if vectors is not None:
+        try:
+            _index_vectors(embedded_jobs, embedded_objects, vectors, db)
+        except Exception as e:
+            # Claimed jobs must not stay running until the next restart
+            db.rollback()
+            for job in jobs:
+                if job not in embedded_jobs:
+                    job.status = "done"
+            _record_failure(embedded_jobs, e)
+            print(f"Warning: Failed to index embeddings for {len(embedded_jobs)} jobs: {e}")
+    
+    db.commit()
+    return len(jobs)
+
+
+def get_queue_status(db: Session) -> Dict[str, Any]:
+    """Summarize the embedding backlog."""
+    counts = dict(
+        db.query(EmbeddingJob.status, func.count(EmbeddingJob.id))
+        .group_by(EmbeddingJob.status)
+        .all()
+    )
+    oldest = db.query(func.min(EmbeddingJob.created_at)).filter(
+        EmbeddingJob.status.in_(["pending", "running"])
+    ).scalar()
+    
+    return {
+        "pending": counts.get("pending", 0),
+        "running": counts.get("running", 0),
+        "done": counts.get("done", 0),
+        "failed": counts.get("failed", 0),
+        "oldest_pending_seconds": (
+            (datetime.utcnow() - oldest).total_seconds() if oldest else None
+        ),
+        "workers": _worker.alive_count if _worker else 0,
+        "cache": embedding_cache_stats()
+    }
+
+
+class EmbeddingWorker:
+    """Pool of threads that drain the embedding queue in the app process."""
+    
+    def __init__(self, num_workers: int, poll_interval: float):
+        """Initialize worker pool."""
+        self.num_workers = num_workers
+        self.poll_interval = poll_interval
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._threads: List[threading.Thread] = []
+    
+    @property
+    def alive_count(self) -> int:
+        """Number of running worker threads."""
+        return sum(1 for t in self._threads if t.is_alive())
+    
+    def start(self):
+        """Requeue jobs interrupted by a restart and start the threads."""
+        db = SessionLocal()
+        try:
+            db.query(EmbeddingJob).filter(
+                EmbeddingJob.status == "running"
+            ).update({"status": "pending"})
+            db.commit()
+        finally:
+            db.close()
+        
+        for i in range(self.num_workers):
+            thread = threading.Thread(
+                target=self._run,
+                name=f"embedding-worker-{i}",
+                daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+    
+    def notify(self):
+        """Wake idle workers after new jobs are queued."""
+        self._wakeup.set()
+    
+    def stop(self, timeout: float = 10.0):
+        """Stop the threads, letting in-flight batches finish."""
+        self._stopping.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+    
+    def _run(self):
+        """Worker loop: drain batches until the queue is empty, then wait."""
+        while not self._stopping.is_set():
+            db = SessionLocal()
+            try:
+                with llm_priority(BULK), llm_route("embedding_worker"):
+                    processed = process_embedding_jobs(db)
+            except Exception as e:
+                db.rollback()
+                processed = 0
+                print(f"Warning: Embedding worker failed: {e}")
+            finally:
+                db.close()
+            
+            if not processed:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+
+
+# Global worker pool
+_worker: Optional[EmbeddingWorker] = None
+
+
+def start_embedding_worker():
+    """Start the embedding worker pool, if enabled."""
+    global _worker
+    if _worker is None and settings.embedding_workers > 0:
+        _worker = EmbeddingWorker(settings.embedding_workers, settings.embedding_poll_interval)
+        _worker.start()
+
+
+def stop_embedding_worker():
+    """Stop the embedding worker pool, if running."""
+    global _worker
+    if _worker is not None:
+        _worker.stop()
+        _worker = None
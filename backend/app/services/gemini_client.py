@@ -1,10 +1,19 @@
 """Gemini API client wrapper with mocking support."""
+import asyncio
 import json
-import os
-from typing import List, Dict, Any, Optional
+import threading
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, Any, Optional
 from abc import ABC, abstractmethod
+import numpy as np
 import google.generativeai as genai
 from app.config import settings
+from app.services.json_stream import extract_json
+from app.services.llm_scheduler import get_llm_scheduler
+from app.services.token_usage import estimate_tokens, record_usage
+
+
+# Maximum number of texts per embed_content request
+EMBEDDING_BATCH_LIMIT = 100
 
 
 class GeminiClientInterface(ABC):
@@ -25,6 +34,11 @@ class GeminiClientInterface(ABC):
         """Generate embeddings for text."""
         pass
     
+    @abstractmethod
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for many texts as one float32 matrix."""
+        pass
+    
     @abstractmethod
     def function_call(
         self, 
@@ -33,6 +47,134 @@ class GeminiClientInterface(ABC):
     ) -> Dict[str, Any]:
         """Execute function calling."""
         pass
+    
+    @abstractmethod
+    async def agenerate_text(self, prompt: str, temperature: float = 0.7) -> str:
+        """Generate text without blocking the event loop."""
+        pass
+    
+    @abstractmethod
+    async def agenerate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
+        """Generate JSON response without blocking the event loop."""
+        pass
+    
+    @abstractmethod
+    async def agenerate_embedding(self, text: str) -> List[float]:
+        """Generate embeddings for text without blocking the event loop."""
+        pass
+    
+    @abstractmethod
+    def astream_text(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Stream generated text in chunks as the model produces it."""
+        pass
+
+
+# Model families that support structured output (response_mime_type)
+JSON_MODE_MODEL_PREFIXES = ("gemini-1.5", "gemini-2", "gemini-exp")
+
+
+def parse_json_response(text: str) -> Dict[str, Any]:
+    """Extract the JSON payload from a model response."""
+    try:
+        return extract_json(text)
+    except ValueError as e:
+        raise ValueError(f"Failed to parse JSON from response: {e}")
+
+
+def supports_json_mode(model_name: str) -> bool:
+    """Whether ``model_name`` accepts response_mime_type="application/json"."""
+    name = model_name.split("/")[-1]
+    return name.startswith(JSON_MODE_MODEL_PREFIXES)
+
+
+def record_response_usage(prompt: str, response: Any, completion: str = ""):
+    """Count a call, preferring the token counts reported in the response."""
+    usage = getattr(response, "usage_metadata", None)
+    record_usage(
+        prompt,
+        completion,
+        getattr(usage, "prompt_token_count", None) or None,
+        getattr(usage, "candidates_token_count", None) or None
+    )
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent calls into one underlying request.
+    
+    Callers that arrive while a call with the same key is in flight get
+    its result (or exception) instead of issuing their own. Sync and
+    async calls are coalesced separately, so a sync caller on the event
+    loop thread never blocks waiting for an async leader.
+    """
+    
+    def __init__(self):
+        """Initialize with nothing in flight."""
+        self._lock = threading.Lock()
+        self._calls: Dict[tuple, Dict[str, Any]] = {}
+        self._tasks: Dict[tuple, asyncio.Task] = {}
+        self.calls = 0
+        self.coalesced = 0
+    
+    def do(self, key: tuple, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn`` unless an identical call is in flight, then share its outcome."""
+        with self._lock:
+            self.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = {"done": threading.Event()}
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            call["done"].wait()
+            if "error" in call:
+                raise call["error"]
+            return call["result"]
+        
+        try:
+            call["result"] = fn(*args, **kwargs)
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call["done"].set()
+    
+    async def ado(self, key: tuple, fn: Callable[..., Awaitable[Any]], *args, **kwargs) -> Any:
+        """Async ``do``: concurrent callers await one shared task."""
+        key = key + (id(asyncio.get_running_loop()),)
+        with self._lock:
+            self.calls += 1
+            task = self._tasks.get(key)
+            if task is None:
+                task = self._tasks[key] = asyncio.ensure_future(fn(*args, **kwargs))
+                task.add_done_callback(lambda _: self._tasks.pop(key, None))
+            else:
+                self.coalesced += 1
+        # Shielded so one caller giving up doesn't cancel the others
+        return await asyncio.shield(task)
+    
+    def stats(self) -> Dict[str, int]:
+        """Return call and coalescing counters."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls) + len(self._tasks)
+            }
+
+
+# Shared by every GeminiClient in the process
+_single_flight = SingleFlight()
+
+
+def single_flight_stats() -> Dict[str, int]:
+    """Counters of coalesced Gemini calls."""
+    return _single_flight.stats()
 
 
 class GeminiClient(GeminiClientInterface):
@@ -41,59 +183,145 @@ class GeminiClient(GeminiClientInterface):
     def __init__(self, api_key: Optional[str] = None):
         """Initialize Gemini client."""
         self.api_key = api_key or settings.gemini_api_key
-        if self.api_key:
+        self.api_endpoint = settings.gemini_api_endpoint
+        if self.api_endpoint:
+            # The REST transport is the one that can target a plain HTTP server
+            genai.configure(
+                api_key=self.api_key or "stand-in",
+                transport="rest",
+                client_options={"api_endpoint": self.api_endpoint}
+            )
+        elif self.api_key:
             genai.configure(api_key=self.api_key)
         self.model_name = settings.gemini_model
         self.embedding_model_name = settings.gemini_embedding_model
+        self._models: Dict[tuple, genai.GenerativeModel] = {}
+        self._models_lock = threading.Lock()
+    
+    def get_model(
+        self,
+        model_name: Optional[str] = None,
+        tools: Optional[List[Dict[str, Any]]] = None,
+        temperature: Optional[float] = None,
+        json_mode: bool = False
+    ) -> genai.GenerativeModel:
+        """
+        Return the pooled model handle for this configuration.
+        
+        Handles are built once per (model name, tools, generation config)
+        and reused, so calls skip model setup and share its connection.
+        """
+        model_name = model_name or self.model_name
+        key = (
+            model_name,
+            json.dumps(tools, sort_keys=True, default=str) if tools else None,
+            temperature,
+            json_mode
+        )
+        model = self._models.get(key)
+        if model is None:
+            with self._models_lock:
+                model = self._models.get(key)
+                if model is None:
+                    config = {}
+                    if temperature is not None:
+                        config["temperature"] = temperature
+                    if json_mode:
+                        config["response_mime_type"] = "application/json"
+                    generation_config = genai.types.GenerationConfig(**config) if config else None
+                    model = genai.GenerativeModel(
+                        model_name,
+                        tools=tools,
+                        generation_config=generation_config
+                    )
+                    self._models[key] = model
+        return model
     
     def generate_text(self, prompt: str, temperature: float = 0.7) -> str:
         """Generate text using Gemini."""
-        model = genai.GenerativeModel(self.model_name)
-        response = model.generate_content(
+        return _single_flight.do(
+            ("generate_text", self.model_name, prompt, temperature),
+            self._generate_text, prompt, temperature
+        )
+    
+    def _generate_text(self, prompt: str, temperature: float, json_mode: bool = False) -> str:
+        """Uncoalesced ``generate_text``."""
+        response = get_llm_scheduler().call(
+            self.get_model(temperature=temperature, json_mode=json_mode).generate_content,
             prompt,
-            generation_config=genai.types.GenerationConfig(
-                temperature=temperature
-            )
+            tokens=estimate_tokens(prompt)
         )
+        record_response_usage(prompt, response, response.text)
         return response.text
     
     def generate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
-        """Generate JSON response."""
-        text = self.generate_text(prompt, temperature)
-        # Try to extract JSON from response
-        try:
-            # Look for JSON in code blocks
-            if "```json" in text:
-                json_str = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                json_str = text.split("```")[1].split("```")[0].strip()
-            else:
-                json_str = text.strip()
-            
-            return json.loads(json_str)
-        except (json.JSONDecodeError, IndexError) as e:
-            raise ValueError(f"Failed to parse JSON from response: {e}")
+        """Generate JSON response, in structured-output mode when supported."""
+        if not supports_json_mode(self.model_name):
+            return parse_json_response(self.generate_text(prompt, temperature))
+        
+        text = _single_flight.do(
+            ("generate_json", self.model_name, prompt, temperature),
+            self._generate_text, prompt, temperature, True
+        )
+        return parse_json_response(text)
     
     def generate_embedding(self, text: str) -> List[float]:
         """Generate embeddings for text."""
-        result = genai.embed_content(
+        return _single_flight.do(
+            ("generate_embedding", self.embedding_model_name, text),
+            self._generate_embedding, text
+        )
+    
+    def _generate_embedding(self, text: str) -> List[float]:
+        """Uncoalesced ``generate_embedding``."""
+        result = get_llm_scheduler().call(
+            genai.embed_content,
             model=f"models/{self.embedding_model_name}",
             content=text,
-            task_type="retrieval_document"
+            task_type="retrieval_document",
+            tokens=estimate_tokens(text)
         )
+        record_usage(text)
         return result['embedding']
     
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate embeddings for many texts as one float32 matrix."""
+        batches = []
+        for start in range(0, len(texts), EMBEDDING_BATCH_LIMIT):
+            batch = texts[start:start + EMBEDDING_BATCH_LIMIT]
+            result = get_llm_scheduler().call(
+                genai.embed_content,
+                model=f"models/{self.embedding_model_name}",
+                content=batch,
+                task_type="retrieval_document",
+                tokens=sum(estimate_tokens(text) for text in batch)
+            )
+            record_usage("".join(batch))
+            batches.append(np.asarray(result['embedding'], dtype=np.float32))
+        
+        if not batches:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack(batches)
+    
     def function_call(
         self, 
         prompt: str, 
         functions: List[Dict[str, Any]]
     ) -> Dict[str, Any]:
         """Execute function calling."""
-        model = genai.GenerativeModel(
-            self.model_name,
-            tools=functions
+        return _single_flight.do(
+            ("function_call", self.model_name, prompt, json.dumps(functions, sort_keys=True, default=str)),
+            self._function_call, prompt, functions
+        )
+    
+    def _function_call(self, prompt: str, functions: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Uncoalesced ``function_call``."""
+        response = get_llm_scheduler().call(
+            self.get_model(tools=functions).generate_content,
+            prompt,
+            tokens=estimate_tokens(prompt)
         )
-        response = model.generate_content(prompt)
+        record_response_usage(prompt, response)
         
         if response.candidates[0].content.parts[0].function_call:
             fc = response.candidates[0].content.parts[0].function_call
@@ -103,6 +331,79 @@ class GeminiClient(GeminiClientInterface):
             }
         
         return {"name": None, "arguments": {}}
+    
+    async def agenerate_text(self, prompt: str, temperature: float = 0.7) -> str:
+        """Generate text without blocking the event loop."""
+        return await _single_flight.ado(
+            ("agenerate_text", self.model_name, prompt, temperature),
+            self._agenerate_text, prompt, temperature
+        )
+    
+    async def _agenerate_text(self, prompt: str, temperature: float, json_mode: bool = False) -> str:
+        """Uncoalesced ``agenerate_text``."""
+        if self.api_endpoint:
+            # No async REST client: run the sync call off the event loop
+            return await asyncio.to_thread(self._generate_text, prompt, temperature, json_mode)
+        response = await get_llm_scheduler().acall(
+            self.get_model(temperature=temperature, json_mode=json_mode).generate_content_async,
+            prompt,
+            tokens=estimate_tokens(prompt)
+        )
+        record_response_usage(prompt, response, response.text)
+        return response.text
+    
+    async def agenerate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
+        """Generate JSON response without blocking the event loop."""
+        if not supports_json_mode(self.model_name):
+            return parse_json_response(await self.agenerate_text(prompt, temperature))
+        
+        text = await _single_flight.ado(
+            ("agenerate_json", self.model_name, prompt, temperature),
+            self._agenerate_text, prompt, temperature, True
+        )
+        return parse_json_response(text)
+    
+    async def agenerate_embedding(self, text: str) -> List[float]:
+        """Generate embeddings for text without blocking the event loop."""
+        return await _single_flight.ado(
+            ("agenerate_embedding", self.embedding_model_name, text),
+            self._agenerate_embedding, text
+        )
+    
+    async def _agenerate_embedding(self, text: str) -> List[float]:
+        """Uncoalesced ``agenerate_embedding``."""
+        if self.api_endpoint:
+            return await asyncio.to_thread(self._generate_embedding, text)
+        result = await get_llm_scheduler().acall(
+            genai.embed_content_async,
+            model=f"models/{self.embedding_model_name}",
+            content=text,
+            task_type="retrieval_document",
+            tokens=estimate_tokens(text)
+        )
+        record_usage(text)
+        return result['embedding']
+    
+    async def astream_text(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Stream generated text in chunks as the model produces it."""
+        # The scheduler covers opening the stream (and retries it); the
+        # slot is released while chunks arrive
+        if self.api_endpoint:
+            yield await asyncio.to_thread(self._generate_text, prompt, temperature)
+            return
+        response = await get_llm_scheduler().acall(
+            self.get_model(temperature=temperature).generate_content_async,
+            prompt,
+            stream=True,
+            tokens=estimate_tokens(prompt)
+        )
+        chunks, chunk = [], None
+        async for chunk in response:
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+        # The final chunk carries the usage of the whole response
+        record_response_usage(prompt, chunk, "".join(chunks))
 
 
 class MockGeminiClient(GeminiClientInterface):
@@ -123,11 +424,27 @@ class MockGeminiClient(GeminiClientInterface):
     
     def generate_text(self, prompt: str, temperature: float = 0.7) -> str:
         """Generate mock text response."""
-        return self.responses.get("text", "Mock response")
+        text = self.responses.get("text", "Mock response")
+        record_usage(prompt, text)
+        return text
     
     def generate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
         """Generate mock JSON response."""
+        result = self._json_response(prompt)
+        record_usage(prompt, json.dumps(result))
+        return result
+    
+    def _json_response(self, prompt: str) -> Dict[str, Any]:
+        """Mock JSON for ``prompt``."""
         # Check if prompt is for mnemonic generation
+        if "mnemonic generator" in prompt.lower() and "WORDS:" in prompt:
+            # Batch prompt: one mnemonic per listed word
+            import re
+            return [
+                self._mock_mnemonic(word)
+                for word in re.findall(r'"word":\s*"([^"]+)"', prompt)
+            ]
+        
         if "mnemonic generator" in prompt.lower() or '"word"' in prompt:
             # Try to extract word from prompt
             word = "test"
@@ -140,21 +457,25 @@ class MockGeminiClient(GeminiClientInterface):
                 except:
                     pass
             
-            return {
-                "word": word,
-                "pos": "adjective",
-                "gre_definition": f"Mock definition for {word}",
-                "pithy_definition": f"Brief definition for {word}",
-                "base_word": word,
-                "associations": ["assoc1", "assoc2", "assoc3", "assoc4", "assoc5"],
-                "examples": ["Example 1", "Example 2", "Example 3"],
-                "easy_synonyms": ["syn1", "syn2", "syn3"],
-                "gre_synonyms": ["gresyn1", "gresyn2", "gresyn3"],
-                "story": f"A memorable story about {word} to help you remember it."
-            }
+            return self._mock_mnemonic(word)
         
         return self.responses.get("json", {"mock": "data"})
     
+    def _mock_mnemonic(self, word: str) -> Dict[str, Any]:
+        """Mock mnemonic for ``word``."""
+        return {
+            "word": word,
+            "pos": "adjective",
+            "gre_definition": f"Mock definition for {word}",
+            "pithy_definition": f"Brief definition for {word}",
+            "base_word": word,
+            "associations": ["assoc1", "assoc2", "assoc3", "assoc4", "assoc5"],
+            "examples": ["Example 1", "Example 2", "Example 3"],
+            "easy_synonyms": ["syn1", "syn2", "syn3"],
+            "gre_synonyms": ["gresyn1", "gresyn2", "gresyn3"],
+            "story": f"A memorable story about {word} to help you remember it."
+        }
+    
     def generate_embedding(self, text: str) -> List[float]:
         """Generate mock embedding."""
         if text in self.embeddings:
@@ -164,6 +485,12 @@ class MockGeminiClient(GeminiClientInterface):
         hash_val = int(hashlib.md5(text.encode()).hexdigest(), 16)
         return [(hash_val >> i) % 100 / 100.0 for i in range(768)]
     
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate mock embeddings for many texts."""
+        if not texts:
+            return np.empty((0, 768), dtype=np.float32)
+        return np.array([self.generate_embedding(text) for text in texts], dtype=np.float32)
+    
     def function_call(
         self, 
         prompt: str, 
@@ -171,6 +498,24 @@ class MockGeminiClient(GeminiClientInterface):
     ) -> Dict[str, Any]:
         """Execute mock function calling."""
         return self.responses.get("function_call", {"name": None, "arguments": {}})
+    
+    async def agenerate_text(self, prompt: str, temperature: float = 0.7) -> str:
+        """Generate mock text response."""
+        return self.generate_text(prompt, temperature)
+    
+    async def agenerate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
+        """Generate mock JSON response."""
+        return self.generate_json(prompt, temperature)
+    
+    async def agenerate_embedding(self, text: str) -> List[float]:
+        """Generate mock embedding."""
+        return self.generate_embedding(text)
+    
+    async def astream_text(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Stream the "stream" response, or the mock JSON, in small chunks."""
+        text = self.responses.get("stream") or json.dumps(self.generate_json(prompt, temperature))
+        for start in range(0, len(text), 16):
+            yield text[start:start + 16]
 
 
 # Global client instance
@@ -182,10 +527,16 @@ def get_gemini_client() -> GeminiClientInterface:
     global _client
     if _client is None:
         # Check if we should use mock client
-        if os.getenv("USE_MOCK_GEMINI", "false").lower() == "true":
+        if settings.use_mock_gemini:
             _client = MockGeminiClient()
+        elif settings.gemini_replay_cassette:
+            from app.services.replay_client import ReplayGeminiClient
+            _client = ReplayGeminiClient.from_settings()
         else:
             _client = GeminiClient()
+            if settings.embedding_cache_size > 0:
+                from app.services.embedding_cache import CachingGeminiClient, get_embedding_cache
+                _client = CachingGeminiClient(_client, get_embedding_cache())
     return _client
 
 
@@ -0,0 +1,539 @@
+"""Background import jobs: PDF and Anki imports that persist progress and resume."""
+import asyncio
+import os
+import sqlite3
+import tempfile
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+from sqlalchemy.orm import Session
+from app.config import settings
+from app.database import SessionLocal
+from app.models.import_job import ImportJob, ImportJobUnit
+from app.models.question import Question
+from app.models.word import Word
+from app.prompts.extraction import create_extraction_prompts
+from app.services.chunking import aiter_chunks, question_score
+from app.services.embedding_worker import enqueue_embeddings
+from app.services.gemini_client import get_gemini_client
+from app.services.llm_scheduler import BULK, llm_priority
+from app.services.pdf_pipeline import aiter_pages, amap_ordered, count_pages, get_pdf_executor
+from app.services.token_usage import llm_route
+from app.services.vector_store import get_vector_store
+
+
+async def _in_thread(fn, *args):
+    """
+    Run blocking ``fn`` on a thread. If the job is cancelled meanwhile, the
+    thread is awaited before the cancellation propagates, so it never runs
+    on after the job's session or the vector store is closed.
+    """
+    task = asyncio.ensure_future(asyncio.to_thread(fn, *args))
+    try:
+        return await asyncio.shield(task)
+    except asyncio.CancelledError:
+        while not task.done():
+            try:
+                await asyncio.wait({task})
+            except asyncio.CancelledError:
+                pass
+        raise
+
+
+def _index_embeddings(client, objects: List, texts: List[str], object_type: str, db: Session):
+    """
+    Embed ``objects`` and add them to the vector store in one batch.
+    
+    If the batch can't be embedded, the objects go to the embedding queue
+    to be retried by the background workers.
+    """
+    if not objects:
+        return
+    
+    try:
+        with llm_priority(BULK):
+            vectors = client.generate_embeddings(texts)
+    except Exception as e:
+        print(f"Warning: Failed to create embeddings for {len(objects)} {object_type}s, queueing them: {e}")
+        enqueue_embeddings(db, [obj.id for obj in objects], object_type)
+        return
+    
+    vector_store = get_vector_store()
+    vector_ids = vector_store.add_vectors(
+        vectors,
+        [obj.id for obj in objects],
+        [object_type] * len(objects),
+        db
+    )
+    for obj, vector_id in zip(objects, vector_ids):
+        obj.embedding_vector_id = vector_id
+
+
+async def _extract_questions(client, chunk: str) -> List[Dict[str, Any]]:
+    """Question data found in one chunk; oversized chunks become several prompts."""
+    questions_data = []
+    for extraction_prompt in create_extraction_prompts(chunk):
+        result = await client.agenerate_json(extraction_prompt)
+        if not isinstance(result, list):
+            result = [result] if result else []
+        questions_data.extend(q_data for q_data in result if isinstance(q_data, dict))
+    return questions_data
+
+
+def _commit_batch(
+    client,
+    job: ImportJob,
+    objects: List,
+    texts: List[str],
+    object_type: str,
+    units: List[ImportJobUnit],
+    stats: Dict[str, Any],
+    counter: str,
+    db: Session
+):
+    """
+    Commit one batch of imported objects together with the state of the
+    units that produced them, then index the objects.
+    
+    If the commit fails, only this batch is lost; its units are recorded as
+    failed so a resumed job doesn't retry them. If indexing fails after the
+    commit, the objects go to the embedding queue instead.
+    """
+    committed = {**stats, counter: stats[counter] + len(objects)}
+    committed["batches_committed"] += 1
+    try:
+        db.add_all(units)
+        job.units_completed = (job.units_completed or 0) + len(units)
+        job.stats = committed
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Warning: Failed to commit {len(objects)} imported {object_type}s: {e}")
+        stats["batches_failed"] += 1
+        db.add_all([
+            ImportJobUnit(job_id=job.id, position=unit.position, status="failed", error=str(e))
+            for unit in units
+        ])
+        job.units_completed = (job.units_completed or 0) + len(units)
+        job.stats = dict(stats)
+        db.commit()
+        return
+    
+    stats.update(committed)
+    object_ids = [obj.id for obj in objects]
+    try:
+        _index_embeddings(client, objects, texts, object_type, db)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        print(f"Warning: Failed to index {len(objects)} imported {object_type}s, queueing them: {e}")
+        enqueue_embeddings(db, object_ids, object_type)
+
+
+def _normalize(text: str) -> str:
+    """Lowercase ``text`` and collapse its whitespace, for duplicate checks."""
+    return " ".join(text.lower().split())
+
+
+def _finished_positions(db: Session, job_id: str) -> Set[int]:
+    """Positions of the units a job already recorded."""
+    return {
+        position for (position,) in db.query(ImportJobUnit.position).filter(
+            ImportJobUnit.job_id == job_id
+        )
+    }
+
+
+async def _run_pdf_job(job: ImportJob, db: Session):
+    """
+    Extract questions from the job's PDF, skipping chunks already recorded.
+    
+    Pages are extracted in worker processes and packed into windows of
+    about PDF_CHUNK_TOKENS along question boundaries. Windows scoring below
+    PDF_PREFILTER_THRESHOLD on local question features are skipped; the
+    rest go to question extraction up to PDF_EXTRACT_CONCURRENCY at a time,
+    and questions are committed in document order every PDF_COMMIT_BATCH
+    chunks, along with the state of those chunks.
+    """
+    path = Path(job.path)
+    if not path.exists():
+        raise FileNotFoundError(f"Uploaded file {job.filename} is missing")
+    
+    client = get_gemini_client()
+    finished = await _in_thread(_finished_positions, db, job.id)
+    stats = {
+        "questions_extracted": 0,
+        "chunks_processed": 0,
+        "chunks_skipped": 0,
+        "chunks_failed": 0,
+        "batches_committed": 0,
+        "batches_failed": 0,
+        "pages_read": 0,
+        **(job.stats or {})
+    }
+    if "pages_total" not in stats:
+        stats["pages_total"] = await asyncio.to_thread(count_pages, str(path))
+    
+    # Overlapping windows can extract a question twice, so each window drops
+    # the questions the window before it produced
+    previous_keys: Set[str] = set()
+    previous_position = None
+    # Text of windows recorded by an earlier run, keyed by the window after them
+    resumed_after: Dict[int, str] = {}
+    
+    positions = 0
+    
+    async def pages():
+        async for number, text in aiter_pages(path, get_pdf_executor()):
+            stats["pages_read"] = max(stats["pages_read"], number)
+            yield number, text
+    
+    async def pending_chunks():
+        nonlocal positions
+        previous_chunk = ""
+        async for chunk in aiter_chunks(
+            pages(),
+            settings.pdf_chunk_tokens,
+            settings.pdf_chunk_overlap_tokens
+        ):
+            position = positions
+            positions += 1
+            if position in finished:
+                previous_chunk = chunk
+                continue
+            if position - 1 in finished:
+                resumed_after[position] = previous_chunk
+            previous_chunk = chunk
+            
+            stats["chunks_processed"] += 1
+            # Very short chunks, prose, answer keys and contents pages never reach the LLM
+            if len(chunk.strip()) < 50:
+                yield position, chunk, "short"
+            elif question_score(chunk) < settings.pdf_prefilter_threshold:
+                stats["chunks_skipped"] += 1
+                yield position, chunk, "prefilter"
+            else:
+                yield position, chunk, None
+    
+    async def extract(item: Tuple[int, str, Optional[str]]):
+        _, chunk, skipped = item
+        return [] if skipped else await _extract_questions(client, chunk)
+    
+    batch: List[Question] = []
+    units: List[ImportJobUnit] = []
+    
+    async def flush():
+        await _in_thread(
+            _commit_batch,
+            client,
+            job,
+            batch,
+            [f"{q.question_text} {q.explanation or ''}" for q in batch],
+            "question",
+            units,
+            stats,
+            "questions_extracted",
+            db
+        )
+    
+    async for (position, _, skipped), questions_data in amap_ordered(
+        extract,
+        pending_chunks(),
+        settings.pdf_extract_concurrency
+    ):
+        unit = ImportJobUnit(job_id=job.id, position=position, status="skipped" if skipped else "done")
+        created = len(batch)
+        if isinstance(questions_data, Exception):
+            stats["chunks_failed"] += 1
+            print(f"Warning: Failed to extract from chunk: {questions_data}")
+            unit.status, unit.error = "failed", str(questions_data)
+            questions_data = []
+        
+        # Questions the previous window produced; when that window ran before a
+        # restart, those found in its text
+        overlap_keys = previous_keys if previous_position == position - 1 else set()
+        overlap_text = _normalize(resumed_after.pop(position, ""))
+        keys = set()
+        for q_data in questions_data:
+            key = _normalize(str(q_data.get("question_text") or ""))
+            if not key or key in keys:
+                continue
+            keys.add(key)
+            if key in overlap_keys or key in overlap_text:
+                continue
+            
+            question = Question(
+                question_text=q_data.get("question_text", ""),
+                choices=q_data.get("choices"),
+                answer=q_data.get("answer", ""),
+                explanation=q_data.get("explanation"),
+                source=f"PDF: {job.filename}",
+                difficulty=q_data.get("difficulty", "unknown"),
+                tags=["pdf_import", q_data.get("detected_type", "unknown")]
+            )
+            
+            db.add(question)
+            batch.append(question)
+        unit.items = len(batch) - created
+        units.append(unit)
+        previous_keys, previous_position = keys, position
+        
+        if len(units) >= settings.pdf_commit_batch:
+            await flush()
+            batch, units = [], []
+    
+    if units:
+        await flush()
+    job.units_total = positions
+
+
+def _read_anki_notes(path: str) -> List[Tuple[str, str]]:
+    """(fields, tags) of every note in an .apkg, in creation order."""
+    with tempfile.TemporaryDirectory() as tmpdir:
+        # An .apkg is a zip holding the collection database
+        with zipfile.ZipFile(path, "r") as zip_ref:
+            zip_ref.extract("collection.anki2", tmpdir)
+        
+        anki_conn = sqlite3.connect(os.path.join(tmpdir, "collection.anki2"))
+        try:
+            return anki_conn.execute("SELECT flds, tags FROM notes ORDER BY rowid").fetchall()
+        finally:
+            anki_conn.close()
+
+
+def is_anki_package(path: Path) -> bool:
+    """Whether ``path`` is a zip holding an Anki collection."""
+    if not zipfile.is_zipfile(path):
+        return False
+    with zipfile.ZipFile(path, "r") as zip_ref:
+        return "collection.anki2" in zip_ref.namelist()
+
+
+def _import_anki_batch(
+    client,
+    job: ImportJob,
+    notes: List[Tuple[int, str, str]],
+    stats: Dict[str, Any],
+    seen_words: Set[str],
+    db: Session
+):
+    """Create words for one batch of (position, fields, tags) notes and commit them."""
+    parsed = {}
+    for position, flds, tags in notes:
+        fields = flds.split('\x1f')  # Anki field separator
+        if len(fields) >= 2:
+            parsed[position] = (fields, tags.split())
+    
+    # Check which words already exist with one IN query
+    existing = {
+        word for (word,) in db.query(Word.word).filter(
+            Word.word.in_([fields[0].strip() for fields, _ in parsed.values()])
+        )
+    } if parsed else set()
+    
+    words, units = [], []
+    for position, _, _ in notes:
+        unit = ImportJobUnit(job_id=job.id, position=position, status="skipped", items=0)
+        units.append(unit)
+        if position not in parsed:
+            continue
+        
+        # Assume first field is word, second is definition
+        fields, tags = parsed[position]
+        word_text = fields[0].strip()
+        definition = fields[1].strip()
+        if word_text in existing or word_text in seen_words:
+            stats["notes_skipped"] += 1
+            continue
+        seen_words.add(word_text)
+        
+        word = Word(
+            word=word_text,
+            gre_definition=definition,
+            pithy_definition=definition[:100] if len(definition) > 100 else definition,
+            tags=["anki_import"] + tags,
+            source=f"Anki: {job.filename}"
+        )
+        db.add(word)
+        words.append(word)
+        unit.status, unit.items = "done", 1
+    
+    _commit_batch(
+        client,
+        job,
+        words,
+        [f"{w.word} {w.gre_definition or ''}" for w in words],
+        "word",
+        units,
+        stats,
+        "words_imported",
+        db
+    )
+
+
+async def _run_anki_job(job: ImportJob, db: Session):
+    """Import the job's Anki notes as words, ANKI_COMMIT_BATCH notes per commit."""
+    path = Path(job.path)
+    if not path.exists():
+        raise FileNotFoundError(f"Uploaded file {job.filename} is missing")
+    
+    client = get_gemini_client()
+    notes = await asyncio.to_thread(_read_anki_notes, str(path))
+    finished = await _in_thread(_finished_positions, db, job.id)
+    job.units_total = len(notes)
+    stats = {
+        "words_imported": 0,
+        "notes_skipped": 0,
+        "batches_committed": 0,
+        "batches_failed": 0,
+        **(job.stats or {})
+    }
+    seen_words: Set[str] = set()
+    
+    pending = [
+        (position, flds, tags) for position, (flds, tags) in enumerate(notes)
+        if position not in finished
+    ]
+    batch_size = max(1, settings.anki_commit_batch)
+    for start in range(0, len(pending), batch_size):
+        await _in_thread(
+            _import_anki_batch,
+            client,
+            job,
+            pending[start:start + batch_size],
+            stats,
+            seen_words,
+            db
+        )
+
+
+JOB_RUNNERS = {
+    "pdf": _run_pdf_job,
+    "anki": _run_anki_job
+}
+
+
+async def run_import_job(job_id: str):
+    """
+    Run an import job to the end, or resume it where it stopped.
+    
+    Units recorded by an earlier run are skipped. A job that is cancelled
+    (the app shutting down) finishes the batch it is committing, stays
+    running and is picked up by the next start; the spooled upload is
+    removed once the job is done or failed.
+    """
+    db = SessionLocal()
+    try:
+        job = db.get(ImportJob, job_id)
+        if job is None or job.status in ("done", "failed"):
+            return
+        job.status = "running"
+        await _in_thread(db.commit)
+        
+        try:
+            with llm_priority(BULK), llm_route(f"/api/v1/import/{job.kind}"):
+                await JOB_RUNNERS[job.kind](job, db)
+            job.status = "done"
+        except Exception as e:
+            db.rollback()
+            print(f"Warning: Import job {job_id} failed: {e}")
+            job.status = "failed"
+            job.error = str(e)
+        
+        job.finished_at = datetime.utcnow()
+        await _in_thread(db.commit)
+        if job.path:
+            Path(job.path).unlink(missing_ok=True)
+    finally:
+        db.close()
+
+
+class ImportJobRunner:
+    """Runs import jobs on the event loop, at most ``max_jobs`` at a time."""
+    
+    def __init__(self, max_jobs: int):
+        """Initialize runner."""
+        self.max_jobs = max_jobs
+        self._slots = asyncio.Semaphore(max(1, max_jobs))
+        self._tasks: Dict[str, asyncio.Task] = {}
+    
+    @property
+    def active_count(self) -> int:
+        """Number of jobs queued or running in this process."""
+        return len(self._tasks)
+    
+    def start(self):
+        """Requeue jobs interrupted by a restart and schedule every pending job."""
+        db = SessionLocal()
+        try:
+            db.query(ImportJob).filter(
+                ImportJob.status == "running"
+            ).update({"status": "pending"})
+            db.commit()
+            job_ids = [
+                job_id for (job_id,) in db.query(ImportJob.id).filter(
+                    ImportJob.status == "pending"
+                ).order_by(ImportJob.created_at)
+            ]
+        finally:
+            db.close()
+        
+        for job_id in job_ids:
+            self.submit(job_id)
+    
+    def submit(self, job_id: str):
+        """Schedule a job; it runs once a slot is free."""
+        if job_id in self._tasks:
+            return
+        task = asyncio.ensure_future(self._run(job_id))
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+    
+    async def stop(self):
+        """Cancel running jobs once in-flight batches commit; they resume on the next start."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+    
+    async def _run(self, job_id: str):
+        """Run one job once a slot is free."""
+        async with self._slots:
+            try:
+                await run_import_job(job_id)
+            except Exception as e:
+                print(f"Warning: Import job {job_id} crashed: {e}")
+
+
+def create_import_job(db: Session, kind: str, filename: str, path: Path) -> ImportJob:
+    """Persist a pending import job for a spooled upload and schedule it."""
+    job = ImportJob(kind=kind, filename=filename, path=str(path), stats={})
+    db.add(job)
+    db.commit()
+    
+    runner = _runner
+    if runner is not None:
+        runner.submit(job.id)
+    
+    return job
+
+
+# Global job runner
+_runner: Optional[ImportJobRunner] = None
+
+
+def start_import_runner():
+    """Start running import jobs, if enabled; call from the event loop."""
+    global _runner
+    if _runner is None and settings.import_job_workers > 0:
+        _runner = ImportJobRunner(settings.import_job_workers)
+        _runner.start()
+
+
+async def stop_import_runner():
+    """Stop running import jobs, if started."""
+    global _runner
+    if _runner is not None:
+        await _runner.stop()
+        _runner = None
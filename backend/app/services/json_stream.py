@@ -0,0 +1,255 @@
+"""Tolerant and incremental parsing of JSON produced by the model."""
+import json
+from typing import Any, Iterator, List, Tuple
+
+
+_decoder = json.JSONDecoder()
+
+WHITESPACE = " \t\r\n"
+
+
+class JSONFieldStream:
+    """
+    Yields the top-level fields of a streamed JSON object as each one
+    completes, e.g. ``summary`` before ``details`` has finished.
+    
+    Text before the opening brace (such as a ```json fence) is ignored.
+    """
+    
+    def __init__(self):
+        """Initialize an empty stream."""
+        self.buffer = ""
+        self.fields: dict = {}
+        self._pos = -1  # index after the last parsed field, -1 before "{"
+        self.closed = False
+    
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Add ``chunk`` and return the (name, value) pairs it completed."""
+        self.buffer += chunk
+        return list(self._parse())
+    
+    def _skip(self, pos: int, chars: str) -> int:
+        """Advance past any of ``chars``."""
+        while pos < len(self.buffer) and self.buffer[pos] in chars:
+            pos += 1
+        return pos
+    
+    def _parse(self) -> Iterator[Tuple[str, Any]]:
+        """Parse as many complete fields as the buffer holds."""
+        if self.closed:
+            return
+        if self._pos < 0:
+            start = self.buffer.find("{")
+            if start < 0:
+                return
+            self._pos = start + 1
+        
+        while True:
+            pos = self._skip(self._pos, WHITESPACE + ",")
+            if pos >= len(self.buffer):
+                return
+            if self.buffer[pos] == "}":
+                self.closed = True
+                return
+            
+            try:
+                name, pos = _decoder.raw_decode(self.buffer, pos)
+                pos = self._skip(pos, WHITESPACE)
+                if pos >= len(self.buffer):
+                    return
+                if self.buffer[pos] != ":":
+                    raise ValueError(f"Expected ':' after {name!r}")
+                pos = self._skip(pos + 1, WHITESPACE)
+                value, end = _decoder.raw_decode(self.buffer, pos)
+            except json.JSONDecodeError:
+                # Value still streaming in
+                return
+            
+            # A number at the end of the buffer may still have digits coming
+            if end >= len(self.buffer) and isinstance(value, (int, float)):
+                return
+            
+            self._pos = end
+            self.fields[name] = value
+            yield name, value
+
+
+CLOSERS = {"{": "}", "[": "]"}
+
+FENCE = "```json"
+
+
+class JSONExtractor:
+    """
+    Tolerant extraction of the first JSON object or array in model output.
+    
+    Prose and code fences around the value are skipped, and the contents
+    of a ```json fence are preferred when one has arrived. A bracket that
+    turns out to be prose (it closes without valid JSON, or mismatched) is
+    abandoned and the scan restarts at the next opener. Trailing commas
+    are dropped, and output cut off mid-value is repaired by closing what
+    is still open (falling back to the last complete element). Text can
+    be fed in chunks as it streams; ``result(partial=True)`` then returns
+    the best value for what has arrived so far.
+    """
+    
+    def __init__(self):
+        """Initialize an empty extractor."""
+        self._raw = ""
+        self._pos = 0
+        self._start = -1
+        self._reset()
+    
+    def _reset(self):
+        """Forget the current candidate value."""
+        self._out: List[str] = []
+        self._stack: List[str] = []
+        self._in_string = False
+        self._escape = False
+        self._pending_comma = False
+        self._safe: Tuple[int, Tuple[str, ...]] = (0, ())
+        self._value: Any = None
+        self.started = False
+        self.complete = False
+    
+    def _mark_safe(self):
+        """Remember that the output so far ends on an element boundary."""
+        self._safe = (len(self._out), tuple(self._stack))
+    
+    def _next_start(self, pos: int) -> int:
+        """Index of the next candidate opener at or after ``pos``, or -1."""
+        fence = self._raw.find(FENCE, pos)
+        if fence >= 0:
+            pos = fence + len(FENCE)
+        starts = [i for i in (self._raw.find("{", pos), self._raw.find("[", pos)) if i >= 0]
+        return min(starts) if starts else -1
+    
+    def feed(self, chunk: str) -> "JSONExtractor":
+        """Scan ``chunk``; returns self so calls can be chained."""
+        self._raw += chunk
+        raw = self._raw
+        out = self._out
+        pos = self._pos
+        while pos < len(raw) and not self.complete:
+            if not self.started:
+                start = self._next_start(pos)
+                if start < 0:
+                    # Keep a fence marker split across chunks findable
+                    pos = max(pos, len(raw) - len(FENCE) + 1)
+                    break
+                self._start = start
+                self.started = True
+                self._stack.append(raw[start])
+                out.append(raw[start])
+                self._mark_safe()
+                pos = start + 1
+                continue
+            
+            ch = raw[pos]
+            pos += 1
+            
+            if self._in_string:
+                out.append(ch)
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                continue
+            
+            if ch in " \t\r\n":
+                continue
+            
+            if ch in "}]":
+                # A comma right before a closer is a trailing comma: drop it
+                self._pending_comma = False
+                opener = self._stack.pop()
+                out.append(ch)
+                if CLOSERS[opener] == ch:
+                    if self._stack:
+                        self._mark_safe()
+                        continue
+                    try:
+                        self._value = json.loads("".join(out))
+                        self.complete = True
+                        continue
+                    except json.JSONDecodeError:
+                        pass
+                
+                # Mismatched, or closed without valid JSON: the bracket was
+                # prose, so try the next opener
+                pos = self._start + 1
+                self._reset()
+                out = self._out
+                continue
+            
+            if self._pending_comma:
+                out.append(",")
+                self._pending_comma = False
+            
+            if ch == ",":
+                self._mark_safe()
+                self._pending_comma = True
+                continue
+            
+            out.append(ch)
+            if ch == '"':
+                self._in_string = True
+            elif ch in CLOSERS:
+                self._stack.append(ch)
+        self._pos = pos
+        return self
+    
+    def _repair(self, partial: bool) -> Any:
+        """Close the value cut off mid-way, or raise ValueError."""
+        if not partial:
+            raise ValueError("JSON value is incomplete")
+        
+        closers = "".join(CLOSERS[opener] for opener in reversed(self._stack))
+        # Keep the value that was being written if closing it is enough
+        candidate = "".join(self._out)
+        if self._in_string:
+            candidate += "\\" if self._escape else ""
+            candidate += '"'
+        try:
+            return json.loads(candidate + closers)
+        except json.JSONDecodeError:
+            pass
+        
+        length, stack = self._safe
+        return json.loads(
+            "".join(self._out[:length])
+            + "".join(CLOSERS[opener] for opener in reversed(stack))
+        )
+    
+    def result(self, partial: bool = True) -> Any:
+        """
+        Return the extracted value.
+        
+        Args:
+            partial: Repair output that ends before the value is closed
+                instead of raising
+        """
+        if not self.started:
+            # No object or array: the whole text may still be a scalar
+            try:
+                return json.loads(self._raw.strip())
+            except json.JSONDecodeError:
+                raise ValueError("No JSON value found in response")
+        
+        if self.complete:
+            return self._value
+        try:
+            return self._repair(partial)
+        except ValueError:
+            # The open bracket may be prose that never closed
+            rest = self._raw[self._start + 1:]
+            if not any(opener in rest for opener in CLOSERS):
+                raise
+            return JSONExtractor().feed(rest).result(partial)
+
+
+def extract_json(text: str, partial: bool = True) -> Any:
+    """Extract the first JSON object or array from ``text``."""
+    return JSONExtractor().feed(text).result(partial)
@@ -0,0 +1,377 @@
+"""Shared client-side scheduler for Gemini API calls."""
+import asyncio
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.config import settings
+
+try:
+    from google.api_core import exceptions as google_exceptions
+    RETRYABLE_EXCEPTIONS = (
+        google_exceptions.TooManyRequests,
+        google_exceptions.ResourceExhausted,
+        google_exceptions.InternalServerError,
+        google_exceptions.ServiceUnavailable,
+        google_exceptions.GatewayTimeout,
+        google_exceptions.DeadlineExceeded,
+    )
+except ImportError:
+    RETRYABLE_EXCEPTIONS = ()
+
+# HTTP status codes worth retrying
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+# Lower values are admitted first
+INTERACTIVE = 0
+BULK = 1
+PRIORITY_NAMES = {INTERACTIVE: "interactive", BULK: "bulk"}
+
+_priority: ContextVar[int] = ContextVar("llm_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def llm_priority(priority: int):
+    """Run the enclosed Gemini calls at ``priority`` (INTERACTIVE or BULK)."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def is_retryable(error: Exception) -> bool:
+    """Whether ``error`` is a transient quota or server failure."""
+    if RETRYABLE_EXCEPTIONS and isinstance(error, RETRYABLE_EXCEPTIONS):
+        return True
+    code = getattr(error, "code", None) or getattr(error, "status_code", None)
+    return code in RETRYABLE_STATUS_CODES
+
+
+class TokenBucket:
+    """Continuously refilled budget of ``per_minute`` units; 0 means unlimited."""
+    
+    def __init__(self, per_minute: float):
+        """Initialize a full bucket."""
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.level = float(per_minute)
+        self.updated = time.monotonic()
+    
+    def _refill(self, now: float):
+        """Add the budget accrued since the last update."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until ``amount`` units are available."""
+        if self.capacity <= 0:
+            return 0.0
+        self._refill(now)
+        # Requests larger than the bucket only wait for a full bucket
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+    
+    def take(self, amount: float):
+        """Spend ``amount`` units."""
+        if self.capacity > 0:
+            self.level -= min(amount, self.capacity)
+
+
+def _resolve(future: asyncio.Future):
+    """Wake an async waiter, unless it was cancelled meanwhile."""
+    if not future.done():
+        future.set_result(None)
+
+
+class _Waiter:
+    """
+    A call queued for admission.
+    
+    ``grant`` wakes the caller once admitted and returns False if nobody is
+    left to use the slot.
+    """
+    
+    def __init__(self, priority: int, tokens: int, grant: Callable[[], bool]):
+        """Initialize an unadmitted waiter."""
+        self.priority = priority
+        self.tokens = tokens
+        self.grant = grant
+        self.admitted = False
+        self.start = time.monotonic()
+
+
+class LLMScheduler:
+    """
+    Admission control for every Gemini call in the process.
+    
+    Calls wait for a concurrency slot and for request and token budget.
+    Waiters are admitted strictly by priority, then arrival order, so
+    interactive requests overtake queued bulk work. Retryable failures
+    are retried with exponential backoff and full jitter.
+    """
+    
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_concurrency: int,
+        max_retries: int,
+        retry_base_delay: float,
+        retry_max_delay: float
+    ):
+        """Initialize the scheduler."""
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        
+        self._cond = threading.Condition()
+        # Heap of [priority, arrival, waiter]
+        self._waiters: list = []
+        self._seq = itertools.count()
+        self._in_flight = 0
+        self._timer: Optional[threading.Timer] = None
+        self._timer_due = 0.0
+        
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+    
+    def _admit(self, tokens: int):
+        """Take a slot and budget; caller holds the lock."""
+        self.requests.take(1)
+        self.tokens.take(tokens)
+        self._in_flight += 1
+        self.calls += 1
+    
+    def _record_wait(self, waited: float):
+        """Update wait-time metrics; caller holds the lock."""
+        self.wait_total += waited
+        self.wait_max = max(self.wait_max, waited)
+    
+    def _try_acquire(self, tokens: int) -> bool:
+        """Acquire without waiting if nobody is queued and budget is free."""
+        with self._cond:
+            if self._waiters or self._in_flight >= self.max_concurrency:
+                return False
+            now = time.monotonic()
+            if self.requests.wait_time(1, now) > 0 or self.tokens.wait_time(tokens, now) > 0:
+                return False
+            self._admit(tokens)
+            self._record_wait(0.0)
+            return True
+    
+    def _dispatch(self):
+        """
+        Admit queued waiters in priority order while slots and budget allow;
+        caller holds the lock.
+        
+        When the head waiter is short of budget, a timer runs this again once
+        the buckets have refilled.
+        """
+        while self._waiters and self._in_flight < self.max_concurrency:
+            waiter = self._waiters[0][2]
+            now = time.monotonic()
+            delay = max(
+                self.requests.wait_time(1, now),
+                self.tokens.wait_time(waiter.tokens, now)
+            )
+            if delay > 0:
+                self._schedule_dispatch(delay)
+                return
+            
+            heapq.heappop(self._waiters)
+            self._admit(waiter.tokens)
+            waiter.admitted = True
+            if not waiter.grant():
+                # Nobody is left to use the slot
+                self._in_flight -= 1
+                continue
+            self._record_wait(now - waiter.start)
+    
+    def _schedule_dispatch(self, delay: float):
+        """Run ``_dispatch`` again after ``delay`` seconds; caller holds the lock."""
+        due = time.monotonic() + delay
+        if self._timer is not None and self._timer_due <= due:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(delay, self._on_timer)
+        self._timer.daemon = True
+        self._timer_due = due
+        self._timer.start()
+    
+    def _on_timer(self):
+        """Budget has refilled: admit whoever can start now."""
+        with self._cond:
+            self._timer = None
+            self._dispatch()
+    
+    def _enqueue(self, waiter: _Waiter):
+        """Queue ``waiter`` and admit it right away if possible; caller holds the lock."""
+        heapq.heappush(self._waiters, [waiter.priority, next(self._seq), waiter])
+        self._dispatch()
+    
+    def _abandon(self, waiter: _Waiter):
+        """Withdraw a waiter that gave up, handing back its slot if it got one."""
+        with self._cond:
+            if waiter.admitted:
+                self._in_flight -= 1
+            else:
+                self._waiters = [entry for entry in self._waiters if entry[2] is not waiter]
+                heapq.heapify(self._waiters)
+            self._dispatch()
+    
+    def _acquire(self, tokens: int, priority: int):
+        """Block the calling thread until this call may start."""
+        def grant() -> bool:
+            self._cond.notify_all()
+            return True
+        
+        waiter = _Waiter(priority, tokens, grant)
+        try:
+            with self._cond:
+                self._enqueue(waiter)
+                while not waiter.admitted:
+                    self._cond.wait()
+        except BaseException:
+            self._abandon(waiter)
+            raise
+    
+    def _release(self):
+        """Free a concurrency slot."""
+        with self._cond:
+            self._in_flight -= 1
+            self._dispatch()
+    
+    async def _aacquire(self, tokens: int, priority: int):
+        """
+        Async ``_acquire``; waits on a future resolved by whichever thread
+        frees the slot, so queued calls hold no worker threads.
+        """
+        if self._try_acquire(tokens):
+            return
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        
+        def grant() -> bool:
+            try:
+                loop.call_soon_threadsafe(_resolve, future)
+            except RuntimeError:
+                # The loop is closed
+                return False
+            return True
+        
+        waiter = _Waiter(priority, tokens, grant)
+        with self._cond:
+            self._enqueue(waiter)
+        try:
+            await future
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+            raise
+    
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff for retry ``attempt``."""
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+    
+    def _should_retry(self, error: Exception, attempt: int) -> bool:
+        """Count the failure and decide whether to try again."""
+        with self._cond:
+            if attempt < self.max_retries and is_retryable(error):
+                self.retries += 1
+                return True
+            self.failures += 1
+            return False
+    
+    def call(self, fn: Callable[..., Any], *args, tokens: int = 0, **kwargs) -> Any:
+        """Run ``fn(*args, **kwargs)`` under the scheduler."""
+        priority = _priority.get()
+        attempt = 0
+        while True:
+            if not self._try_acquire(tokens):
+                self._acquire(tokens, priority)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+            finally:
+                self._release()
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+    
+    async def acall(self, fn: Callable[..., Awaitable[Any]], *args, tokens: int = 0, **kwargs) -> Any:
+        """Await ``fn(*args, **kwargs)`` under the scheduler."""
+        priority = _priority.get()
+        attempt = 0
+        while True:
+            await self._aacquire(tokens, priority)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                if not self._should_retry(e, attempt):
+                    raise
+            finally:
+                self._release()
+            await asyncio.sleep(self._backoff(attempt))
+            attempt += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth, wait time and retry metrics."""
+        with self._cond:
+            depth = {name: 0 for name in PRIORITY_NAMES.values()}
+            for priority, _, _ in self._waiters:
+                depth[PRIORITY_NAMES.get(priority, str(priority))] += 1
+            return {
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "queue_depth": depth,
+                "calls": self.calls,
+                "retries": self.retries,
+                "failures": self.failures,
+                "wait_seconds": {
+                    "total": self.wait_total,
+                    "mean": self.wait_total / self.calls if self.calls else 0.0,
+                    "max": self.wait_max
+                },
+                "requests_per_minute": self.requests.capacity,
+                "tokens_per_minute": self.tokens.capacity
+            }
+
+
+# Global scheduler instance
+_scheduler: Optional[LLMScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> LLMScheduler:
+    """Get the process-wide scheduler."""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = LLMScheduler(
+                    requests_per_minute=settings.llm_requests_per_minute,
+                    tokens_per_minute=settings.llm_tokens_per_minute,
+                    max_concurrency=settings.llm_max_concurrency,
+                    max_retries=settings.llm_max_retries,
+                    retry_base_delay=settings.llm_retry_base_delay,
+                    retry_max_delay=settings.llm_retry_max_delay
+                )
+    return _scheduler
+
+
+def llm_scheduler_stats() -> Optional[Dict[str, Any]]:
+    """Stats of the scheduler, or None if no call has used it yet."""
+    return _scheduler.stats() if _scheduler is not None else None
@@ -0,0 +1,82 @@
+"""Batched mnemonic generation: several words per prompt, packs in parallel."""
+import asyncio
+from typing import Any, Dict, List, Optional, Tuple
+from pydantic import ValidationError
+from app.prompts.mnemonic import create_batch_mnemonic_prompt
+from app.schemas.word import MnemonicResponse
+from app.services.gemini_client import GeminiClientInterface
+
+
+def validate_mnemonic(item: Any, word: str) -> Optional[MnemonicResponse]:
+    """Return ``item`` as a MnemonicResponse if it is a usable mnemonic for ``word``."""
+    if not isinstance(item, dict) or str(item.get("word", "")).strip().lower() != word.lower():
+        return None
+    try:
+        mnemonic = MnemonicResponse(**item)
+    except ValidationError:
+        return None
+    if not mnemonic.gre_definition or not mnemonic.story:
+        return None
+    return mnemonic
+
+
+async def generate_mnemonic_batch(
+    client: GeminiClientInterface,
+    words: List[str],
+    style: str = "prude",
+    temperature: float = 0.7,
+    pack_size: int = 20,
+    concurrency: int = 4,
+    max_attempts: int = 3
+) -> Tuple[Dict[str, MnemonicResponse], Dict[str, str]]:
+    """
+    Generate mnemonics for ``words``, ``pack_size`` words per prompt.
+    
+    Up to ``concurrency`` packs are in flight at once. Words missing from a
+    response or failing validation are retried in smaller packs, up to
+    ``max_attempts`` times; words that answered correctly are never resent.
+    
+    Returns:
+        (mnemonics by word, error by word for the words that never succeeded)
+    """
+    results: Dict[str, MnemonicResponse] = {}
+    errors: Dict[str, str] = {}
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    
+    async def run_pack(pack: List[str]):
+        async with semaphore:
+            try:
+                response = await client.agenerate_json(
+                    create_batch_mnemonic_prompt([{"word": word} for word in pack], style),
+                    temperature
+                )
+            except Exception as e:
+                for word in pack:
+                    errors[word] = f"Generation failed: {e}"
+                return
+        
+        items = response if isinstance(response, list) else [response]
+        by_word = {
+            str(item.get("word", "")).strip().lower(): item
+            for item in items if isinstance(item, dict)
+        }
+        for word in pack:
+            mnemonic = validate_mnemonic(by_word.get(word.lower()), word)
+            if mnemonic is None:
+                errors[word] = "Missing or invalid in model response"
+            else:
+                results[word] = mnemonic
+                errors.pop(word, None)
+    
+    pending = list(dict.fromkeys(words))
+    for attempt in range(max(1, max_attempts)):
+        if not pending:
+            break
+        # Smaller packs on retries isolate the words the model keeps fumbling
+        size = max(1, pack_size // 2 ** attempt)
+        await asyncio.gather(*(
+            run_pack(pending[start:start + size]) for start in range(0, len(pending), size)
+        ))
+        pending = [word for word in pending if word not in results]
+    
+    return results, {word: errors[word] for word in pending}
@@ -0,0 +1,176 @@
+"""Streaming PDF text extraction: spool to disk, parse pages in worker processes."""
+import asyncio
+import multiprocessing
+import os
+import tempfile
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple, TypeVar, Union
+from app.config import settings
+
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Bytes read from the upload per write to the spool file
+SPOOL_CHUNK_SIZE = 1024 * 1024
+
+
+async def spool_upload(upload, directory: Optional[Path] = None, suffix: str = ".pdf") -> Path:
+    """
+    Copy an UploadFile to a temporary file in chunks and return its path.
+    
+    Worker processes open the file by path, and the upload is never held
+    in memory as a whole. The caller deletes the file.
+    """
+    directory = Path(directory or settings.expanded_data_dir / "uploads")
+    directory.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await upload.read(SPOOL_CHUNK_SIZE)
+                if not chunk:
+                    break
+                out.write(chunk)
+    except BaseException:
+        os.unlink(name)
+        raise
+    return Path(name)
+
+
+def count_pages(path: str) -> int:
+    """Number of pages in the PDF at ``path``."""
+    import pdfplumber
+    
+    with pdfplumber.open(path) as pdf:
+        return len(pdf.pages)
+
+
+def extract_pages(path: str, start: int, end: int) -> List[Tuple[int, str]]:
+    """
+    Text of pages ``start`` to ``end`` (exclusive), as (page number, text).
+    
+    Runs in a worker process; each page's layout cache is dropped once
+    its text is out.
+    """
+    import pdfplumber
+    
+    pages = []
+    with pdfplumber.open(path, pages=list(range(start + 1, end + 1))) as pdf:
+        for page in pdf.pages:
+            pages.append((page.page_number, page.extract_text() or ""))
+            page.close()
+    return pages
+
+
+async def aiter_pages(
+    path: Path,
+    executor: Optional[Executor] = None,
+    pages_per_task: Optional[int] = None,
+    max_pending: Optional[int] = None
+) -> AsyncIterator[Tuple[int, str]]:
+    """
+    Yield (page number, text) in page order as the pages are extracted.
+    
+    Page ranges are parsed in ``executor`` (the default thread pool if
+    None) with at most ``max_pending`` ranges in flight, so a long
+    document is neither parsed on the event loop nor held in memory.
+    """
+    loop = asyncio.get_running_loop()
+    pages_per_task = pages_per_task or settings.pdf_pages_per_task
+    max_pending = max_pending or 2 * max(1, settings.pdf_extract_workers)
+    
+    total = await loop.run_in_executor(executor, count_pages, str(path))
+    ranges = iter([
+        (start, min(start + pages_per_task, total))
+        for start in range(0, total, pages_per_task)
+    ])
+    
+    pending = deque()
+    
+    def submit():
+        page_range = next(ranges, None)
+        if page_range is not None:
+            pending.append(loop.run_in_executor(executor, extract_pages, str(path), *page_range))
+    
+    for _ in range(max_pending):
+        submit()
+    try:
+        while pending:
+            pages = await pending.popleft()
+            submit()
+            for page in pages:
+                yield page
+    finally:
+        # The consumer stopped early: drop ranges that haven't started
+        for future in pending:
+            future.cancel()
+
+
+async def amap_ordered(
+    fn: Callable[[T], Awaitable[R]],
+    items: AsyncIterator[T],
+    limit: int
+) -> AsyncIterator[Tuple[T, Union[R, Exception]]]:
+    """
+    Yield (item, result) for every item, in input order, running ``fn`` on
+    at most ``limit`` items at a time.
+    
+    A failure is yielded as the exception instead of a result, so one bad
+    item doesn't stop the rest. A window of ``2 * limit`` tasks keeps the
+    pool busy while an early, slow item holds up the output.
+    """
+    semaphore = asyncio.Semaphore(max(1, limit))
+    
+    async def run(item):
+        async with semaphore:
+            try:
+                return await fn(item)
+            except Exception as e:
+                return e
+    
+    window = deque()
+    source = items.__aiter__()
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(window) < 2 * max(1, limit):
+                try:
+                    item = await source.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                window.append((item, asyncio.ensure_future(run(item))))
+            if not window:
+                return
+            item, task = window.popleft()
+            yield item, await task
+    finally:
+        for _, task in window:
+            task.cancel()
+
+
+# Worker processes, created on first use
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def get_pdf_executor() -> Optional[ProcessPoolExecutor]:
+    """Process pool for page extraction, or None to use threads (PDF_EXTRACT_WORKERS=0)."""
+    global _executor
+    if _executor is None and settings.pdf_extract_workers > 0:
+        # spawn: forking a process that runs threads can inherit held locks
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.pdf_extract_workers,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _executor
+
+
+def shutdown_pdf_executor():
+    """Stop the worker processes."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(cancel_futures=True)
+        _executor = None
@@ -0,0 +1,371 @@
+"""Record/replay Gemini stand-in with latency and fault injection."""
+import asyncio
+import hashlib
+import json
+import math
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional
+import numpy as np
+from app.config import settings
+from app.services.gemini_client import GeminiClientInterface, parse_json_response
+from app.services.llm_scheduler import get_llm_scheduler
+from app.services.token_usage import estimate_tokens, record_usage
+
+
+# Cassette interaction kinds
+TEXT = "text"
+EMBEDDING = "embedding"
+FUNCTION_CALL = "function_call"
+
+
+def prompt_hash(prompt: str) -> str:
+    """Key under which a prompt's response is recorded."""
+    return hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+
+
+class ReplayError(Exception):
+    """Injected API failure; ``code`` is the HTTP status it stands for."""
+    
+    def __init__(self, code: int, message: str):
+        """Initialize with an HTTP status code."""
+        super().__init__(f"{code} {message}")
+        self.code = code
+
+
+class Cassette:
+    """
+    Recorded Gemini responses, stored as JSON.
+    
+    ``interactions`` hold {"kind", "prompt_sha256", "response"} entries
+    (plus a ``prompt_preview`` for humans). Hand-written entries may use
+    ``match`` (a substring of the prompt) instead of a hash, and
+    ``fallback`` gives a per-kind response for anything unrecorded.
+    Unrecorded embeddings get a deterministic vector derived from the text.
+    """
+    
+    def __init__(self, path: Optional[Path] = None, data: Optional[Dict[str, Any]] = None):
+        """Load the cassette at ``path`` (or wrap ``data``)."""
+        self.path = Path(path) if path else None
+        if data is None and self.path is not None and self.path.exists():
+            data = json.loads(self.path.read_text())
+        data = data or {}
+        self.interactions: List[Dict[str, Any]] = data.get("interactions", [])
+        self.fallback: Dict[str, Any] = data.get("fallback", {})
+        self.embedding_dimension: int = data.get("embedding_dimension", 768)
+        self._lock = threading.Lock()
+        self._index = {
+            (item["kind"], item["prompt_sha256"]): item["response"]
+            for item in self.interactions if "prompt_sha256" in item
+        }
+    
+    def lookup(self, kind: str, prompt: str) -> Any:
+        """Return the recorded response for ``prompt``."""
+        response = self._index.get((kind, prompt_hash(prompt)))
+        if response is not None:
+            return response
+        
+        for item in self.interactions:
+            if item["kind"] == kind and item.get("match") and item["match"] in prompt:
+                return item["response"]
+        
+        if kind in self.fallback:
+            return self.fallback[kind]
+        if kind == EMBEDDING:
+            seed = int(prompt_hash(prompt)[:16], 16)
+            return np.random.default_rng(seed).random(self.embedding_dimension).tolist()
+        raise KeyError(f"No recorded {kind} response for prompt: {prompt[:80]!r}")
+    
+    def record(self, kind: str, prompt: str, response: Any):
+        """Add an interaction."""
+        key = (kind, prompt_hash(prompt))
+        with self._lock:
+            if key in self._index:
+                return
+            self._index[key] = response
+            self.interactions.append({
+                "kind": kind,
+                "prompt_sha256": key[1],
+                "prompt_preview": prompt[:80],
+                "response": response
+            })
+    
+    def save(self, path: Optional[Path] = None):
+        """Write the cassette as JSON."""
+        path = Path(path or self.path)
+        with self._lock:
+            data = {
+                "embedding_dimension": self.embedding_dimension,
+                "fallback": self.fallback,
+                "interactions": self.interactions
+            }
+        path.write_text(json.dumps(data, indent=2))
+
+
+class LatencyModel:
+    """
+    Samples response latency.
+    
+    Specs: ``fixed:MS``, ``uniform:MIN_MS:MAX_MS`` or
+    ``lognormal:MEDIAN_MS:SIGMA`` (long right tail, like real LLM calls).
+    """
+    
+    def __init__(self, spec: str = "fixed:0", seed: Optional[int] = None):
+        """Parse ``spec``."""
+        kind, *params = spec.split(":")
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = [float(p) for p in params]
+        self._random = random.Random(seed)
+    
+    def sample(self) -> float:
+        """Return one latency in seconds."""
+        if self.kind == "fixed":
+            ms = self.params[0]
+        elif self.kind == "uniform":
+            ms = self._random.uniform(self.params[0], self.params[1])
+        else:
+            ms = self._random.lognormvariate(math.log(self.params[0]), self.params[1])
+        return ms / 1000.0
+
+
+class FaultInjector:
+    """
+    Decides which calls fail: a random ``error_rate`` of 503s plus 429
+    bursts of ``burst_length`` calls at the end of every ``burst_every``.
+    """
+    
+    def __init__(
+        self,
+        error_rate: float = 0.0,
+        burst_every: int = 0,
+        burst_length: int = 0,
+        seed: Optional[int] = None
+    ):
+        """Initialize the injector."""
+        self.error_rate = error_rate
+        self.burst_every = burst_every
+        self.burst_length = burst_length
+        self.calls = 0
+        self.injected: Dict[int, int] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+    
+    def next_fault(self) -> Optional[int]:
+        """Return the HTTP status to fail the next call with, or None."""
+        with self._lock:
+            self.calls += 1
+            code = None
+            if self.burst_every and (self.calls - 1) % self.burst_every >= self.burst_every - self.burst_length:
+                code = 429
+            elif self.error_rate and self._random.random() < self.error_rate:
+                code = 503
+            if code:
+                self.injected[code] = self.injected.get(code, 0) + 1
+            return code
+    
+    def check(self):
+        """Raise a ReplayError if the next call should fail."""
+        code = self.next_fault()
+        if code == 429:
+            raise ReplayError(429, "Resource has been exhausted (e.g. check quota).")
+        if code:
+            raise ReplayError(code, "The service is currently unavailable.")
+
+
+class ReplayGeminiClient(GeminiClientInterface):
+    """
+    Serves responses from a cassette with simulated latency and failures.
+    
+    Calls go through the shared scheduler like the real client, so rate
+    limits, retries and priorities behave as they would against Gemini.
+    """
+    
+    def __init__(
+        self,
+        cassette: Cassette,
+        latency: Optional[LatencyModel] = None,
+        faults: Optional[FaultInjector] = None
+    ):
+        """Initialize the replay client."""
+        self.cassette = cassette
+        self.latency = latency or LatencyModel()
+        self.faults = faults or FaultInjector()
+        self.model_name = "replay"
+        self.embedding_model_name = "replay"
+    
+    @classmethod
+    def from_settings(cls) -> "ReplayGeminiClient":
+        """Build the client configured by the GEMINI_REPLAY_* settings."""
+        return cls(
+            Cassette(Path(settings.gemini_replay_cassette).expanduser()),
+            LatencyModel(settings.gemini_replay_latency),
+            FaultInjector(
+                settings.gemini_replay_error_rate,
+                settings.gemini_replay_burst_every,
+                settings.gemini_replay_burst_length
+            )
+        )
+    
+    def _lookup(self, kind: str, prompt: str) -> Any:
+        """Return the recorded response and count its tokens."""
+        response = self.cassette.lookup(kind, prompt)
+        record_usage(prompt, response if kind == TEXT else "")
+        return response
+    
+    def _respond(self, kind: str, prompt: str) -> Any:
+        """Sleep, maybe fail, then return the recorded response."""
+        time.sleep(self.latency.sample())
+        self.faults.check()
+        return self._lookup(kind, prompt)
+    
+    async def _arespond(self, kind: str, prompt: str) -> Any:
+        """Async ``_respond``."""
+        await asyncio.sleep(self.latency.sample())
+        self.faults.check()
+        return self._lookup(kind, prompt)
+    
+    def _call(self, kind: str, prompt: str) -> Any:
+        """Replay one call under the scheduler."""
+        return get_llm_scheduler().call(self._respond, kind, prompt, tokens=estimate_tokens(prompt))
+    
+    async def _acall(self, kind: str, prompt: str) -> Any:
+        """Replay one async call under the scheduler."""
+        return await get_llm_scheduler().acall(
+            self._arespond, kind, prompt, tokens=estimate_tokens(prompt)
+        )
+    
+    def generate_text(self, prompt: str, temperature: float = 0.7) -> str:
+        """Replay generated text."""
+        return self._call(TEXT, prompt)
+    
+    def generate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
+        """Replay a JSON response."""
+        return parse_json_response(self.generate_text(prompt, temperature))
+    
+    def generate_embedding(self, text: str) -> List[float]:
+        """Replay an embedding."""
+        return self._call(EMBEDDING, text)
+    
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Replay embeddings for many texts as one call."""
+        def respond():
+            time.sleep(self.latency.sample())
+            self.faults.check()
+            vectors = [self.cassette.lookup(EMBEDDING, text) for text in texts]
+            record_usage("".join(texts))
+            return vectors
+        
+        vectors = get_llm_scheduler().call(
+            respond, tokens=sum(estimate_tokens(text) for text in texts)
+        )
+        if not vectors:
+            return np.empty((0, self.cassette.embedding_dimension), dtype=np.float32)
+        return np.asarray(vectors, dtype=np.float32)
+    
+    def function_call(
+        self,
+        prompt: str,
+        functions: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Replay a function call."""
+        try:
+            return self._call(FUNCTION_CALL, prompt)
+        except KeyError:
+            return {"name": None, "arguments": {}}
+    
+    async def agenerate_text(self, prompt: str, temperature: float = 0.7) -> str:
+        """Replay generated text without blocking the event loop."""
+        return await self._acall(TEXT, prompt)
+    
+    async def agenerate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
+        """Replay a JSON response without blocking the event loop."""
+        return parse_json_response(await self.agenerate_text(prompt, temperature))
+    
+    async def agenerate_embedding(self, text: str) -> List[float]:
+        """Replay an embedding without blocking the event loop."""
+        return await self._acall(EMBEDDING, text)
+    
+    async def astream_text(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Replay text in chunks; the first arrives after a quarter of the latency."""
+        total = self.latency.sample()
+        await asyncio.sleep(total / 4)
+        self.faults.check()
+        text = self._lookup(TEXT, prompt)
+        chunks = [text[i:i + 32] for i in range(0, len(text), 32)] or [""]
+        for chunk in chunks:
+            yield chunk
+            await asyncio.sleep(total * 3 / 4 / len(chunks))
+
+
+class RecordingGeminiClient(GeminiClientInterface):
+    """Wraps a real client and records every response into a cassette."""
+    
+    def __init__(self, client: GeminiClientInterface, cassette: Cassette):
+        """Initialize the recorder."""
+        self.client = client
+        self.cassette = cassette
+    
+    def generate_text(self, prompt: str, temperature: float = 0.7) -> str:
+        """Generate and record text."""
+        text = self.client.generate_text(prompt, temperature)
+        self.cassette.record(TEXT, prompt, text)
+        return text
+    
+    def generate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
+        """Generate JSON and record it as text."""
+        result = self.client.generate_json(prompt, temperature)
+        self.cassette.record(TEXT, prompt, json.dumps(result))
+        return result
+    
+    def generate_embedding(self, text: str) -> List[float]:
+        """Generate and record an embedding."""
+        embedding = list(self.client.generate_embedding(text))
+        self.cassette.record(EMBEDDING, text, embedding)
+        return embedding
+    
+    def generate_embeddings(self, texts: List[str]) -> np.ndarray:
+        """Generate and record embeddings for many texts."""
+        vectors = self.client.generate_embeddings(texts)
+        for text, vector in zip(texts, vectors):
+            self.cassette.record(EMBEDDING, text, [float(x) for x in vector])
+        return vectors
+    
+    def function_call(
+        self,
+        prompt: str,
+        functions: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Execute and record a function call."""
+        result = self.client.function_call(prompt, functions)
+        self.cassette.record(FUNCTION_CALL, prompt, result)
+        return result
+    
+    async def agenerate_text(self, prompt: str, temperature: float = 0.7) -> str:
+        """Generate and record text without blocking the event loop."""
+        text = await self.client.agenerate_text(prompt, temperature)
+        self.cassette.record(TEXT, prompt, text)
+        return text
+    
+    async def agenerate_json(self, prompt: str, temperature: float = 0.7) -> Dict[str, Any]:
+        """Generate JSON and record it without blocking the event loop."""
+        result = await self.client.agenerate_json(prompt, temperature)
+        self.cassette.record(TEXT, prompt, json.dumps(result))
+        return result
+    
+    async def agenerate_embedding(self, text: str) -> List[float]:
+        """Generate and record an embedding without blocking the event loop."""
+        embedding = list(await self.client.agenerate_embedding(text))
+        self.cassette.record(EMBEDDING, text, embedding)
+        return embedding
+    
+    async def astream_text(self, prompt: str, temperature: float = 0.7) -> AsyncIterator[str]:
+        """Stream text and record the full response once it ends."""
+        chunks = []
+        async for chunk in self.client.astream_text(prompt, temperature):
+            chunks.append(chunk)
+            yield chunk
+        self.cassette.record(TEXT, prompt, "".join(chunks))
@@ -0,0 +1,171 @@
+"""In-memory cache for deterministic generate_json responses."""
+import copy
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from app.config import settings
+from app.services.gemini_client import GeminiClientInterface
+
+
+# Per-endpoint (ttl_seconds, max_entries)
+RESPONSE_CACHE_POLICIES: Dict[str, Tuple[float, int]] = {
+    "clip_classifier": (24 * 3600, 2000),
+    "mnemonic": (24 * 3600, 1000),
+    "explain": (3600, 500),
+    "awa": (3600, 200),
+    "default": (3600, 500),
+}
+
+# Endpoints whose prompts are cached even at non-zero temperature
+CACHED_BY_DEFAULT = {"clip_classifier"}
+
+
+class ResponseCache:
+    """
+    LRU map of JSON responses with a time-to-live.
+    
+    Values are deep-copied in and out so callers can't mutate cached
+    responses.
+    """
+    
+    def __init__(self, ttl: float, max_entries: int):
+        """Initialize an empty cache."""
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: tuple) -> Optional[Any]:
+        """Return the cached value for ``key``, or None if absent or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[1]
+        return copy.deepcopy(value)
+    
+    def put(self, key: tuple, value: Any):
+        """Store ``value`` under ``key``, evicting the oldest entry if full."""
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop every entry."""
+        with self._lock:
+            self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return size and hit/miss counters."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+# One cache per endpoint, created on first use
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_response_cache(endpoint: str) -> ResponseCache:
+    """Get the response cache for ``endpoint``."""
+    cache = _caches.get(endpoint)
+    if cache is None:
+        with _caches_lock:
+            cache = _caches.get(endpoint)
+            if cache is None:
+                ttl, max_entries = RESPONSE_CACHE_POLICIES.get(
+                    endpoint, RESPONSE_CACHE_POLICIES["default"]
+                )
+                cache = _caches[endpoint] = ResponseCache(ttl, max_entries)
+    return cache
+
+
+def clear_response_caches():
+    """Drop all cached responses."""
+    with _caches_lock:
+        _caches.clear()
+
+
+def response_cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats of every endpoint cache."""
+    return {endpoint: cache.stats() for endpoint, cache in list(_caches.items())}
+
+
+def _should_cache(endpoint: str, temperature: float, cache: Optional[bool]) -> bool:
+    """Decide whether a call goes through the cache."""
+    if not settings.response_cache_enabled:
+        return False
+    if cache is not None:
+        return cache
+    return temperature == 0 or endpoint in CACHED_BY_DEFAULT
+
+
+def _cache_key(client: GeminiClientInterface, prompt: str, temperature: float) -> tuple:
+    """Key of a response: (model, prompt hash, temperature)."""
+    model = getattr(client, "model_name", type(client).__name__)
+    return (model, hashlib.sha256(prompt.encode("utf-8")).hexdigest(), temperature)
+
+
+def cached_generate_json(
+    client: GeminiClientInterface,
+    prompt: str,
+    temperature: float = 0.7,
+    endpoint: str = "default",
+    cache: Optional[bool] = None
+) -> Dict[str, Any]:
+    """
+    ``client.generate_json`` with response caching.
+    
+    Args:
+        endpoint: Selects the TTL and size limits
+        cache: True/False to force caching on or off; None caches
+            temperature-0 calls and endpoints in ``CACHED_BY_DEFAULT``
+    """
+    if not _should_cache(endpoint, temperature, cache):
+        return client.generate_json(prompt, temperature)
+    
+    response_cache = get_response_cache(endpoint)
+    key = _cache_key(client, prompt, temperature)
+    result = response_cache.get(key)
+    if result is None:
+        result = client.generate_json(prompt, temperature)
+        response_cache.put(key, result)
+    return result
+
+
+async def acached_generate_json(
+    client: GeminiClientInterface,
+    prompt: str,
+    temperature: float = 0.7,
+    endpoint: str = "default",
+    cache: Optional[bool] = None
+) -> Dict[str, Any]:
+    """Async variant of ``cached_generate_json``."""
+    if not _should_cache(endpoint, temperature, cache):
+        return await client.agenerate_json(prompt, temperature)
+    
+    response_cache = get_response_cache(endpoint)
+    key = _cache_key(client, prompt, temperature)
+    result = response_cache.get(key)
+    if result is None:
+        result = await client.agenerate_json(prompt, temperature)
+        response_cache.put(key, result)
+    return result
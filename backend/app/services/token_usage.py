@@ -0,0 +1,116 @@
+"""Local token estimation and per-route token accounting."""
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+
+_route: ContextVar[str] = ContextVar("llm_route", default="other")
+
+
+@contextmanager
+def llm_route(route: str):
+    """Attribute the enclosed Gemini calls to ``route``."""
+    token = _route.set(route)
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Local token estimate: ~4 ASCII characters per token, and one token
+    per other character (accented and non-Latin text tokenizes densely).
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return ascii_chars // 4 + (len(text) - ascii_chars) + 1
+
+
+class TokenUsage:
+    """Prompt and completion token counts per route, plus budget actions."""
+    
+    def __init__(self):
+        """Initialize empty counters."""
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Dict[str, int]] = {}
+        self._budgets: Dict[str, Dict[str, int]] = {}
+    
+    def record(self, route: str, prompt_tokens: int, completion_tokens: int):
+        """Count one call."""
+        with self._lock:
+            usage = self._routes.setdefault(route, {
+                "calls": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "max_prompt_tokens": 0
+            })
+            usage["calls"] += 1
+            usage["prompt_tokens"] += prompt_tokens
+            usage["completion_tokens"] += completion_tokens
+            usage["max_prompt_tokens"] = max(usage["max_prompt_tokens"], prompt_tokens)
+    
+    def record_budget(self, endpoint: str, action: str):
+        """Count a prompt that was ``truncated`` or ``split`` to fit its budget."""
+        with self._lock:
+            counts = self._budgets.setdefault(endpoint, {"truncated": 0, "split": 0})
+            counts[action] += 1
+    
+    def stats(self) -> Dict[str, Any]:
+        """Return per-route usage and per-endpoint budget actions."""
+        with self._lock:
+            routes = {}
+            for route, usage in self._routes.items():
+                routes[route] = dict(usage)
+                routes[route]["mean_prompt_tokens"] = usage["prompt_tokens"] / usage["calls"]
+                routes[route]["mean_completion_tokens"] = usage["completion_tokens"] / usage["calls"]
+            return {
+                "routes": routes,
+                "budgets": {endpoint: dict(counts) for endpoint, counts in self._budgets.items()}
+            }
+    
+    def reset(self):
+        """Drop all counters."""
+        with self._lock:
+            self._routes.clear()
+            self._budgets.clear()
+
+
+# Global usage instance
+_usage = TokenUsage()
+
+
+def record_usage(
+    prompt: str,
+    completion: str = "",
+    prompt_tokens: Optional[int] = None,
+    completion_tokens: Optional[int] = None
+):
+    """
+    Count a call against the current route.
+    
+    Counts reported by the API are used when given, local estimates of
+    ``prompt`` and ``completion`` otherwise.
+    """
+    _usage.record(
+        _route.get(),
+        prompt_tokens or estimate_tokens(prompt),
+        completion_tokens if completion_tokens is not None else (
+            estimate_tokens(completion) if completion else 0
+        )
+    )
+
+
+def record_budget(endpoint: str, action: str):
+    """Count a prompt that was truncated or split to fit its budget."""
+    _usage.record_budget(endpoint, action)
+
+
+def token_usage_stats() -> Dict[str, Any]:
+    """Per-route token usage and budget actions."""
+    return _usage.stats()
+
+
+def reset_token_usage():
+    """Drop all token counters."""
+    _usage.reset()
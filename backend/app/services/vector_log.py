@@ -0,0 +1,86 @@
+"""Append-only write-ahead log for vector store changes."""
+import os
+import struct
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+import numpy as np
+
+
+OP_ADD = 1
+OP_DELETE = 2
+
+# op (uint8) + vector_id (int64); OP_ADD records are followed by the vector
+RECORD_HEADER = struct.Struct("<Bq")
+
+
+class VectorLog:
+    """
+    Durable record of every add and delete since the last index snapshot.
+    
+    Each batch is appended and fsynced in one go, so a crash loses nothing
+    that was acknowledged, without rewriting the FAISS index per change.
+    The log is replayed on load and discarded once a snapshot covers it.
+    """
+    
+    def __init__(self, path: Path, dimension: int):
+        """Open the log at ``path`` for appending."""
+        self.path = Path(path)
+        self.dimension = dimension
+        self._file = open(self.path, "ab")
+    
+    def _write(self, payload: bytes):
+        """Append ``payload`` and make it durable."""
+        self._file.write(payload)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+    
+    def append_adds(self, vectors: np.ndarray, ids: np.ndarray):
+        """Log a batch of added vectors."""
+        vectors = np.asarray(vectors, dtype="<f4").reshape(-1, self.dimension)
+        payload = b"".join(
+            RECORD_HEADER.pack(OP_ADD, int(vector_id)) + vector.tobytes()
+            for vector_id, vector in zip(ids, vectors)
+        )
+        self._write(payload)
+    
+    def append_deletes(self, ids):
+        """Log a batch of deleted vector IDs."""
+        self._write(b"".join(RECORD_HEADER.pack(OP_DELETE, int(vector_id)) for vector_id in ids))
+    
+    def close(self):
+        """Close the log file."""
+        self._file.close()
+    
+    @staticmethod
+    def replay(path: Path, dimension: int) -> Iterator[Tuple[int, int, Optional[np.ndarray]]]:
+        """
+        Yield (op, vector_id, vector) records from a log file.
+        
+        A torn record left by a crash mid-write ends the replay and is cut
+        off the file, so later appends start on a record boundary.
+        """
+        path = Path(path)
+        if not path.exists():
+            return
+        
+        vector_size = dimension * 4
+        with open(path, "r+b") as f:
+            data = f.read()
+            offset = 0
+            while offset + RECORD_HEADER.size <= len(data):
+                op, vector_id = RECORD_HEADER.unpack_from(data, offset)
+                end = offset + RECORD_HEADER.size
+                vector = None
+                if op == OP_ADD:
+                    if end + vector_size > len(data):
+                        break
+                    vector = np.frombuffer(data, dtype="<f4", count=dimension, offset=end)
+                    end += vector_size
+                elif op != OP_DELETE:
+                    break
+                yield op, vector_id, vector
+                offset = end
+            
+            if offset < len(data):
+                print(f"Truncating torn record at byte {offset} of {path.name}")
+                f.truncate(offset)
@@ -1,48 +1,518 @@
 """FAISS vector store implementation."""
+import heapq
 import os
 import pickle
+import re
+import threading
 from pathlib import Path
-from typing import List, Tuple, Optional
+from typing import Any, Callable, Dict, List, Tuple, Optional
 import numpy as np
 import faiss
 from sqlalchemy.orm import Session
 from app.config import settings
 from app.models.vector_mapping import VectorMapping
+from app.models.word import Word
+from app.models.question import Question
+from app.services.embedding_store import CURRENT_FILE, EmbeddingStore
+from app.services.vector_log import VectorLog, OP_ADD, OP_DELETE
+
+
+# Exact search used until the corpus is large enough to promote
+FLAT_FACTORY = "Flat"
+
+# Cap on vectors used to train IVF/PQ indexes
+MAX_TRAINING_VECTORS = 100_000
+
+# Object types double as partition directory names
+OBJECT_TYPE_PATTERN = re.compile(r"^[a-z][a-z0-9_]*$")
+
+# Files of the single mixed index used before partitioning
+LEGACY_FILES = ("index.faiss", "embeddings.npy", CURRENT_FILE)
+
+
+def _replace_atomically(path: Path, write: Callable[[Path], None]):
+    """Write ``path`` through a synced temp file so readers never see a partial file."""
+    tmp = path.with_name(path.name + ".tmp")
+    write(tmp)
+    with open(tmp, "rb") as f:
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def _pickle_to(data: Any) -> Callable[[Path], None]:
+    """Writer for _replace_atomically that pickles ``data``."""
+    def write(path: Path):
+        with open(path, "wb") as f:
+            pickle.dump(data, f)
+    return write
+
+
+# ORM model backing each object_type stored in the index
+OBJECT_MODELS = {
+    "word": Word,
+    "question": Question,
+}
+
+
+class VectorPartition:
+    """
+    FAISS index, embedding store and tombstones for one object type.
+    
+    Each partition is compacted and promoted to an ANN index on its own,
+    so a large question corpus never slows down or crowds out word search.
+    """
+    
+    def __init__(self, path: Path, dimension: int):
+        """Initialize partition stored under ``path``."""
+        self.dimension = dimension
+        self.path = Path(path)
+        self.index_file = self.path / "index.faiss"
+        self.metadata_file = self.path / "metadata.pkl"
+        self.index_factory = FLAT_FACTORY
+        self.index = self._new_index(FLAT_FACTORY)
+        self.tombstones: set = set()
+        self._lock = threading.RLock()
+        self._compaction_lock = threading.Lock()
+        self._maintenance_thread: Optional[threading.Thread] = None
+        # Corpus size at which to retry a promotion whose training failed
+        self._promotion_retry_at = 0
+        self.log_generation = 0
+        self._log: Optional[VectorLog] = None
+        self._unsnapshotted = 0
+        self.load()
+    
+    def _log_file(self, generation: int) -> Path:
+        """Path of the vector log for ``generation``."""
+        return self.path / f"vectors-{generation}.log"
+    
+    def _new_index(self, factory: str) -> faiss.Index:
+        """
+        Create an empty index addressed by stable vector IDs.
+        
+        Args:
+            factory: FAISS index factory string, e.g. "Flat", "IVF1024,Flat",
+                "HNSW32" or "IVF1024,PQ64"
+        """
+        return faiss.IndexIDMap2(faiss.index_factory(self.dimension, factory))
+    
+    def _target_factory(self, live_count: int) -> str:
+        """Pick the index type for a corpus of ``live_count`` vectors."""
+        configured = settings.vector_index_factory
+        # Never demote automatically once promoted
+        if self.index_factory == configured:
+            return configured
+        threshold = max(settings.vector_index_promote_threshold, self._promotion_retry_at)
+        if live_count >= threshold:
+            return configured
+        return FLAT_FACTORY
+    
+    def _build_index(self, factory: str, vectors: np.ndarray, ids: np.ndarray) -> Tuple[faiss.Index, str]:
+        """Build (and train, if needed) an index holding ``vectors``."""
+        index = self._new_index(factory)
+        if not index.is_trained:
+            sample = vectors
+            if len(sample) > MAX_TRAINING_VECTORS:
+                rows = np.random.default_rng(0).choice(len(sample), MAX_TRAINING_VECTORS, replace=False)
+                sample = sample[np.sort(rows)]
+            try:
+                index.train(sample)
+            except RuntimeError as e:
+                print(f"Failed to train {factory} index: {e}. Falling back to {FLAT_FACTORY}.")
+                self._promotion_retry_at = len(vectors) * 2
+                return self._build_index(FLAT_FACTORY, vectors, ids)
+        if len(ids) > 0:
+            index.add_with_ids(vectors, ids)
+        return index, factory
+    
+    def load(self):
+        """Load existing FAISS index, metadata and embedding store from disk."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.embeddings = EmbeddingStore(self.path, self.dimension)
+        
+        loaded = None
+        if self.index_file.exists():
+            try:
+                loaded = faiss.read_index(str(self.index_file))
+                print(f"Loaded FAISS index {self.path.name} with {loaded.ntotal} vectors")
+            except Exception as e:
+                print(f"Failed to load index: {e}. Rebuilding from embedding store.")
+        
+        metadata = {}
+        if self.metadata_file.exists():
+            with open(self.metadata_file, "rb") as f:
+                metadata = pickle.load(f)
+            self.tombstones = set(metadata.get("tombstones", ()))
+            self.index_factory = metadata.get("index_factory", FLAT_FACTORY)
+            self.log_generation = metadata.get("log_generation", 0)
+        
+        # Rows appended after the snapshot were never flushed and may be
+        # torn; the log holds the authoritative copy of them
+        if "snapshot_rows" in metadata:
+            self.embeddings.truncate(metadata["snapshot_rows"])
+        self._replay_log()
+        
+        if loaded is not None and self.embeddings.size == 0 and loaded.ntotal > 0:
+            # Index predates the embedding store: backfill it once
+            self.embeddings.append(
+                loaded.reconstruct_n(0, loaded.ntotal),
+                self._index_ids(loaded)
+            )
+        
+        if isinstance(loaded, faiss.IndexIDMap2):
+            self.index = loaded
+        else:
+            # Legacy positional index: re-key it from the embedding store
+            self.index = self._new_index(FLAT_FACTORY)
+            self.index_factory = FLAT_FACTORY
+        
+        # Add vectors that only reached the store before the last save
+        missing = ~np.isin(self.embeddings.ids(), self._index_ids(self.index))
+        if missing.any():
+            self.index.add_with_ids(
+                np.ascontiguousarray(self.embeddings.vectors()[missing]),
+                self.embeddings.ids()[missing]
+            )
+        
+        # Migrate to the configured index type if it changed
+        self._maybe_schedule_maintenance()
+    
+    def _replay_log(self):
+        """Re-apply changes logged since the last snapshot and open the log."""
+        log_file = self._log_file(self.log_generation)
+        stored = set(self.embeddings.ids().tolist())
+        replayed = 0
+        
+        for op, vector_id, vector in VectorLog.replay(log_file, self.dimension):
+            if op == OP_ADD and vector_id not in stored:
+                self.embeddings.append(vector, [vector_id])
+                stored.add(vector_id)
+                self._unsnapshotted += 1
+            elif op == OP_DELETE and vector_id in stored:
+                self.tombstones.add(vector_id)
+            replayed += 1
+        
+        if replayed:
+            print(f"Replayed {replayed} logged changes for {self.path.name}")
+        
+        # Logs from other generations are left over from an interrupted snapshot
+        for stale in self.path.glob("vectors-*.log"):
+            if stale != log_file:
+                stale.unlink()
+        
+        self._log = VectorLog(log_file, self.dimension)
+    
+    def close(self):
+        """Close the vector log."""
+        with self._lock:
+            if self._log is not None:
+                self._log.close()
+                self._log = None
+    
+    @staticmethod
+    def _index_ids(index: faiss.Index) -> np.ndarray:
+        """Return the vector IDs held by an index."""
+        if isinstance(index, faiss.IndexIDMap2):
+            return faiss.vector_to_array(index.id_map)
+        # Positional index: the position is the vector ID
+        return np.arange(index.ntotal, dtype=np.int64)
+    
+    @property
+    def max_id(self) -> int:
+        """Largest vector ID stored in this partition, or -1."""
+        if self.embeddings.size == 0:
+            return -1
+        return int(self.embeddings.ids().max())
+    
+    def save(self):
+        """
+        Snapshot the FAISS index, embedding store and metadata to disk.
+        
+        Every file is replaced atomically, and the log is rotated so the
+        next load only replays changes made after this snapshot.
+        """
+        with self._lock:
+            try:
+                self.embeddings.flush()
+                
+                # Start the next log before the metadata points at it
+                old_generation = self.log_generation
+                new_generation = old_generation + 1
+                if self._log is not None:
+                    self._log.close()
+                self._log = VectorLog(self._log_file(new_generation), self.dimension)
+                
+                _replace_atomically(
+                    self.index_file,
+                    lambda path: faiss.write_index(self.index, str(path))
+                )
+                _replace_atomically(self.metadata_file, _pickle_to({
+                    "tombstones": self.tombstones,
+                    "index_factory": self.index_factory,
+                    "snapshot_rows": self.embeddings.size,
+                    "log_generation": new_generation
+                }))
+                self.log_generation = new_generation
+                self._unsnapshotted = 0
+                self._log_file(old_generation).unlink(missing_ok=True)
+                print(f"Saved FAISS index {self.path.name} with {self.index.ntotal} vectors")
+            except Exception as e:
+                print(f"Failed to save index: {e}")
+    
+    def add(self, vectors: np.ndarray, ids: np.ndarray):
+        """Add vectors under the given vector IDs."""
+        with self._lock:
+            # Durable once logged; index and store are rebuilt from the log
+            self._log.append_adds(vectors, ids)
+            self.index.add_with_ids(vectors, ids)
+            self.embeddings.append(vectors, ids)
+            self._unsnapshotted += len(ids)
+            snapshot_due = self._unsnapshotted >= settings.vector_snapshot_interval
+        
+        if snapshot_due:
+            self.save()
+        
+        self._maybe_schedule_maintenance()
+    
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None
+    ) -> List[Tuple[int, float]]:
+        """Return up to ``k`` live (vector_id, distance) hits, nearest first."""
+        with self._lock:
+            if self.index.ntotal == 0:
+                return []
+            # Over-fetch so deleted vectors can't take live results' slots
+            tombstones = set(self.tombstones)
+            fetch_k = min(k + len(tombstones), self.index.ntotal)
+            params = self._search_params(fetch_k, nprobe, ef_search)
+            distances, indices = self.index.search(query, fetch_k, params=params)
+        
+        return [
+            (int(idx), float(dist))
+            for idx, dist in zip(indices[0], distances[0])
+            # FAISS returns -1 for missing results
+            if idx >= 0 and int(idx) not in tombstones
+        ][:k]
+    
+    def _search_params(
+        self,
+        k: int,
+        nprobe: Optional[int],
+        ef_search: Optional[int]
+    ) -> Optional[faiss.SearchParameters]:
+        """Build per-call search parameters for the current index type."""
+        inner = faiss.downcast_index(self.index.index)
+        if faiss.try_extract_index_ivf(inner) is not None:
+            return faiss.SearchParametersIVF(
+                nprobe=nprobe or settings.vector_search_nprobe
+            )
+        if isinstance(inner, faiss.IndexHNSW):
+            # efSearch below k would cap the number of results
+            return faiss.SearchParametersHNSW(
+                efSearch=max(ef_search or settings.vector_search_ef, k)
+            )
+        return None
+    
+    def contains(self, vector_id: int) -> bool:
+        """Whether ``vector_id`` is stored (live or tombstoned) here."""
+        return bool(np.isin(vector_id, self.embeddings.ids()))
+    
+    def delete(self, vector_id: int) -> bool:
+        """Tombstone a vector; returns False if it isn't stored here."""
+        with self._lock:
+            if vector_id in self.tombstones or not self.contains(vector_id):
+                return False
+            self._log.append_deletes([vector_id])
+            self.tombstones.add(vector_id)
+        
+        self._maybe_schedule_maintenance()
+        return True
+    
+    @property
+    def tombstone_ratio(self) -> float:
+        """Fraction of indexed vectors that are deleted."""
+        if self.index.ntotal == 0:
+            return 0.0
+        return len(self.tombstones) / self.index.ntotal
+    
+    def _needs_maintenance(self) -> bool:
+        """Whether the index should be compacted or promoted."""
+        if self.tombstone_ratio >= settings.vector_compaction_ratio:
+            return True
+        live_count = self.index.ntotal - len(self.tombstones)
+        return self._target_factory(live_count) != self.index_factory
+    
+    def _maybe_schedule_maintenance(self):
+        """Compact or promote the index in the background when needed."""
+        if not self._needs_maintenance():
+            return
+        if self._maintenance_thread and self._maintenance_thread.is_alive():
+            return
+        
+        self._maintenance_thread = threading.Thread(
+            target=self.compact,
+            name=f"vector-store-maintenance-{self.path.name}",
+            daemon=True
+        )
+        self._maintenance_thread.start()
+    
+    def compact(self):
+        """
+        Rebuild the index and embedding store without tombstoned vectors.
+        
+        The rebuilt index uses the type picked by the promotion policy, so
+        this is also how the partition switches to an ANN index.
+        """
+        with self._compaction_lock:
+            self._compact()
+    
+    def _compact(self):
+        """Compaction body; callers must hold the compaction lock."""
+        with self._lock:
+            snapshot_size = self.embeddings.size
+            dead = set(self.tombstones)
+            ids = np.array(self.embeddings.ids())
+            live = ~np.isin(ids, list(dead))
+            vectors = np.array(self.embeddings.vectors()[live])
+            ids = ids[live]
+        
+        # Build (and train) the new index without blocking searches and inserts
+        factory = self._target_factory(len(ids))
+        new_index, factory = self._build_index(factory, vectors, ids)
+        
+        with self._lock:
+            # Pick up vectors added while the new index was being built
+            added_ids = np.array(self.embeddings.ids()[snapshot_size:])
+            added = np.array(self.embeddings.vectors()[snapshot_size:])
+            if len(added_ids) > 0:
+                new_index.add_with_ids(added, added_ids)
+            
+            self.embeddings.replace(
+                np.concatenate([vectors, added]),
+                np.concatenate([ids, added_ids])
+            )
+            self.index = new_index
+            self.index_factory = factory
+            # Vectors tombstoned during the build are still in the new index
+            self.tombstones -= dead
+            removed = len(dead)
+        
+        print(f"Rebuilt {factory} FAISS index {self.path.name}: dropped {removed} deleted vectors")
+        self.save()
 
 
 class VectorStore:
-    """FAISS-based vector store for semantic search."""
+    """FAISS-based vector store for semantic search, partitioned by object type."""
     
-    def __init__(self, dimension: int = 768):
+    def __init__(self, dimension: int = 768, index_path: Optional[Path] = None):
         """Initialize vector store."""
         self.dimension = dimension
-        self.index = faiss.IndexFlatL2(dimension)
-        self.index_path = settings.expanded_data_dir / "faiss_index"
-        self.index_file = self.index_path / "index.faiss"
+        self.index_path = Path(index_path) if index_path else settings.expanded_data_dir / "faiss_index"
         self.metadata_file = self.index_path / "metadata.pkl"
+        self.partitions: Dict[str, VectorPartition] = {}
+        self.next_id = 0
+        self._lock = threading.RLock()
         self.load_index()
     
     def load_index(self):
-        """Load existing FAISS index from disk."""
+        """Load every partition from disk."""
         self.index_path.mkdir(parents=True, exist_ok=True)
         
-        if self.index_file.exists():
-            try:
-                self.index = faiss.read_index(str(self.index_file))
-                print(f"Loaded FAISS index with {self.index.ntotal} vectors")
-            except Exception as e:
-                print(f"Failed to load index: {e}. Creating new index.")
-                self.index = faiss.IndexFlatL2(self.dimension)
-        else:
+        for child in sorted(self.index_path.iterdir()):
+            if child.is_dir() and OBJECT_TYPE_PATTERN.match(child.name):
+                self.partitions[child.name] = VectorPartition(child, self.dimension)
+        
+        metadata = {}
+        if self.metadata_file.exists():
+            with open(self.metadata_file, "rb") as f:
+                metadata = pickle.load(f)
+        self.next_id = metadata.get("next_id", 0)
+        
+        if any((self.index_path / name).exists() for name in LEGACY_FILES):
+            self._migrate_unpartitioned()
+        
+        for partition in self.partitions.values():
+            self.next_id = max(self.next_id, partition.max_id + 1)
+        
+        if not self.partitions:
             print("No existing index found. Created new index.")
     
-    def save_index(self):
-        """Save FAISS index to disk."""
+    def _migrate_unpartitioned(self):
+        """Split a single mixed index into per-object-type partitions."""
+        from app.database import SessionLocal
+        
+        print("Migrating FAISS index to per-object-type partitions...")
+        # Loading the old layout as a partition also re-keys positional indexes
+        legacy = VectorPartition(self.index_path, self.dimension)
+        if legacy._maintenance_thread:
+            legacy._maintenance_thread.join()
+        self.next_id = max(self.next_id, legacy.max_id + 1)
+        
+        ids = np.array(legacy.embeddings.ids())
+        live = ~np.isin(ids, list(legacy.tombstones))
+        
+        db = SessionLocal()
         try:
-            faiss.write_index(self.index, str(self.index_file))
-            print(f"Saved FAISS index with {self.index.ntotal} vectors")
-        except Exception as e:
-            print(f"Failed to save index: {e}")
+            mappings = self.resolve_mappings(ids[live].tolist(), db)
+        finally:
+            db.close()
+        
+        # Vectors without a mapping were already deleted
+        types = np.array([
+            mappings[int(vid)].object_type if int(vid) in mappings else ""
+            for vid in ids
+        ])
+        vectors = legacy.embeddings.vectors()
+        for object_type in sorted(set(types) - {""}):
+            rows = types == object_type
+            self.partition(object_type).add(
+                np.ascontiguousarray(vectors[rows]), ids[rows]
+            )
+        
+        for partition in self.partitions.values():
+            partition.save()
+        legacy.close()
+        legacy.embeddings.delete()
+        (self.index_path / "index.faiss").unlink(missing_ok=True)
+        for log_file in self.index_path.glob("vectors-*.log"):
+            log_file.unlink()
+        self._save_metadata()
+    
+    def partition(self, object_type: str) -> VectorPartition:
+        """Get (or create) the partition for ``object_type``."""
+        with self._lock:
+            partition = self.partitions.get(object_type)
+            if partition is None:
+                if not OBJECT_TYPE_PATTERN.match(object_type):
+                    raise ValueError(f"Invalid object type: {object_type!r}")
+                partition = VectorPartition(self.index_path / object_type, self.dimension)
+                self.partitions[object_type] = partition
+            return partition
+    
+    @property
+    def ntotal(self) -> int:
+        """Total vectors across partitions, including tombstoned ones."""
+        return sum(p.index.ntotal for p in self.partitions.values())
+    
+    def _save_metadata(self):
+        """Persist store-wide metadata."""
+        _replace_atomically(self.metadata_file, _pickle_to({"next_id": self.next_id}))
+    
+    def save_index(self):
+        """Snapshot every partition to disk."""
+        with self._lock:
+            self._save_metadata()
+            for partition in list(self.partitions.values()):
+                partition.save()
+    
+    def close(self):
+        """Snapshot every partition and close their logs."""
+        self.save_index()
+        for partition in list(self.partitions.values()):
+            partition.close()
     
     def add_vector(
         self, 
@@ -52,102 +522,216 @@ class VectorStore:
         db: Session
     ) -> int:
         """Add a vector to the index and create mapping in DB."""
-        # Convert to numpy array and normalize
-        vec = np.array([vector], dtype=np.float32)
-        
-        # Add to FAISS index
-        self.index.add(vec)
-        vector_id = self.index.ntotal - 1
-        
-        # Create mapping in database
-        mapping = VectorMapping(
-            vector_id=vector_id,
-            object_id=object_id,
-            object_type=object_type
-        )
-        db.add(mapping)
-        db.commit()
+        return self.add_vectors([vector], [object_id], [object_type], db)[0]
+    
+    def add_vectors(
+        self,
+        vectors: np.ndarray,
+        object_ids: List[str],
+        object_types: List[str],
+        db: Session
+    ) -> List[int]:
+        """
+        Add a block of vectors and create their mappings in one commit.
         
-        # Periodically save index
-        if self.index.ntotal % 100 == 0:
-            self.save_index()
+        Args:
+            vectors: (n, dimension) matrix, one row per object
+            object_ids: ID of the object each row embeds
+            object_types: object_type of each row
+            db: Database session
         
-        return vector_id
+        Returns:
+            Vector IDs in input order
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32).reshape(-1, self.dimension)
+        if not (len(vectors) == len(object_ids) == len(object_types)):
+            raise ValueError("vectors, object_ids and object_types must have the same length")
+        if len(vectors) == 0:
+            return []
+        
+        with self._lock:
+            start = self.next_id
+            self.next_id += len(vectors)
+        vector_ids = np.arange(start, start + len(vectors), dtype=np.int64)
+        
+        # One FAISS add (and one log fsync) per partition
+        types = np.array(object_types)
+        for object_type in dict.fromkeys(object_types):
+            rows = types == object_type
+            self.partition(object_type).add(vectors[rows], vector_ids[rows])
+        
+        # Create mappings in database
+        db.bulk_insert_mappings(VectorMapping, [
+            {
+                "vector_id": int(vector_id),
+                "object_id": object_id,
+                "object_type": object_type
+            }
+            for vector_id, object_id, object_type in zip(vector_ids, object_ids, object_types)
+        ])
+        db.commit()
+        
+        return vector_ids.tolist()
     
     def search(
-        self, 
-        query_vector: List[float], 
+        self,
+        query_vector: List[float],
         k: int = 10,
         db: Session = None,
-        object_type: Optional[str] = None
+        object_type: Optional[str] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None
     ) -> List[Tuple[str, str, float]]:
         """
         Search for similar vectors.
         
+        With an object_type only that partition is scanned, so the result
+        is a full k whenever enough objects of that type exist. Without
+        one, every partition is searched and the hits merged by distance.
+        
+        Args:
+            nprobe: IVF lists to scan (defaults to VECTOR_SEARCH_NPROBE)
+            ef_search: HNSW candidate list size (defaults to VECTOR_SEARCH_EF)
+        
+        Higher values trade latency for recall; both are ignored by indexes
+        that don't use them.
+        
         Returns:
             List of (object_id, object_type, distance) tuples
         """
-        if self.index.ntotal == 0:
-            return []
+        if object_type is not None:
+            partitions = [self.partitions[object_type]] if object_type in self.partitions else []
+        else:
+            partitions = list(self.partitions.values())
         
         # Convert to numpy array
         query = np.array([query_vector], dtype=np.float32)
         
-        # Search in FAISS
-        distances, indices = self.index.search(query, min(k, self.index.ntotal))
+        hits = heapq.nsmallest(
+            k,
+            (
+                hit
+                for partition in partitions
+                for hit in partition.search(query, k, nprobe=nprobe, ef_search=ef_search)
+            ),
+            key=lambda hit: hit[1]
+        )
+        
+        if not db or not hits:
+            return []
+        
+        # Resolve every hit with a single IN query instead of one per hit
+        mappings = self.resolve_mappings([idx for idx, _ in hits], db)
         
         results = []
-        if db:
-            for idx, dist in zip(indices[0], distances[0]):
-                if idx < 0:  # FAISS returns -1 for missing results
-                    continue
-                
-                # Get mapping from database
-                mapping = db.query(VectorMapping).filter(
-                    VectorMapping.vector_id == int(idx)
-                ).first()
-                
-                if mapping:
-                    # Filter by object type if specified
-                    if object_type is None or mapping.object_type == object_type:
-                        results.append((
-                            mapping.object_id,
-                            mapping.object_type,
-                            float(dist)
-                        ))
+        for idx, dist in hits:
+            mapping = mappings.get(idx)
+            if mapping is None:
+                continue
+            results.append((mapping.object_id, mapping.object_type, dist))
         
         return results
     
+    def resolve_mappings(
+        self,
+        vector_ids: List[int],
+        db: Session
+    ) -> Dict[int, VectorMapping]:
+        """Load the mappings for a set of vector IDs in one query."""
+        if not vector_ids:
+            return {}
+        
+        mappings = db.query(VectorMapping).filter(
+            VectorMapping.vector_id.in_(set(vector_ids))
+        ).all()
+        return {mapping.vector_id: mapping for mapping in mappings}
+    
+    def search_objects(
+        self,
+        query_vector: List[float],
+        k: int = 10,
+        db: Session = None,
+        object_type: Optional[str] = None,
+        nprobe: Optional[int] = None,
+        ef_search: Optional[int] = None
+    ) -> List[Tuple[Any, float]]:
+        """
+        Search for similar vectors and hydrate the matching ORM rows.
+        
+        Objects are loaded with one IN query per object type and returned
+        in FAISS rank order. Hits whose object no longer exists are dropped.
+        ``nprobe`` and ``ef_search`` are passed through to ``search``.
+        
+        Returns:
+            List of (object, distance) tuples
+        """
+        results = self.search(
+            query_vector,
+            k=k,
+            db=db,
+            object_type=object_type,
+            nprobe=nprobe,
+            ef_search=ef_search
+        )
+        if not results:
+            return []
+        
+        # Group object IDs by type so each table is queried once
+        ids_by_type: Dict[str, set] = {}
+        for object_id, obj_type, _ in results:
+            ids_by_type.setdefault(obj_type, set()).add(object_id)
+        
+        objects: Dict[Tuple[str, str], Any] = {}
+        for obj_type, object_ids in ids_by_type.items():
+            model = OBJECT_MODELS.get(obj_type)
+            if model is None:
+                continue
+            for obj in db.query(model).filter(model.id.in_(object_ids)).all():
+                objects[(obj_type, obj.id)] = obj
+        
+        hydrated = []
+        for object_id, obj_type, dist in results:
+            obj = objects.get((obj_type, object_id))
+            if obj is not None:
+                hydrated.append((obj, dist))
+        
+        return hydrated
+    
     def delete_vector(self, vector_id: int, db: Session):
         """
         Delete a vector from the index.
-        Note: FAISS doesn't support efficient deletion, so we mark it in DB.
+        
+        The vector is tombstoned and skipped by searches until the next
+        compaction physically drops it from the index and embedding store.
         """
         mapping = db.query(VectorMapping).filter(
             VectorMapping.vector_id == vector_id
         ).first()
         
+        object_type = None
         if mapping:
+            object_type = mapping.object_type
             db.delete(mapping)
             db.commit()
-    
-    def rebuild_index(self, db: Session):
-        """Rebuild the entire FAISS index from scratch."""
-        # This is needed periodically to remove deleted items
-        print("Rebuilding FAISS index...")
         
-        # Create new index
-        new_index = faiss.IndexFlatL2(self.dimension)
+        if object_type in self.partitions:
+            self.partitions[object_type].delete(vector_id)
+            return
         
-        # Get all mappings
-        mappings = db.query(VectorMapping).all()
-        
-        # Note: This is a placeholder - in production, you'd need to 
-        # re-fetch embeddings or store them separately
-        print(f"Rebuild would process {len(mappings)} vectors")
-        
-        self.index = new_index
-        self.save_index()
+        # No mapping left to tell us where it lives
+        for partition in list(self.partitions.values()):
+            if partition.delete(vector_id):
+                return
+    
+    def compact(self):
+        """Compact every partition, dropping tombstoned vectors."""
+        for partition in list(self.partitions.values()):
+            partition.compact()
+    
+    def rebuild_index(self, db: Session = None):
+        """Rebuild the entire FAISS index from the embedding store."""
+        print("Rebuilding FAISS index...")
+        self.compact()
 
 
 # Global vector store instance
@@ -160,3 +744,11 @@ def get_vector_store() -> VectorStore:
     if _vector_store is None:
         _vector_store = VectorStore()
     return _vector_store
+
+
+def close_vector_store():
+    """Flush and close the vector store, if it was ever opened."""
+    global _vector_store
+    if _vector_store is not None:
+        _vector_store.close()
+        _vector_store = None
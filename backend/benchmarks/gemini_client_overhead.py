@@ -0,0 +1,70 @@
+"""
+Per-call client overhead of GeminiClient, with the network stubbed out.
+
+Compares building a GenerativeModel and GenerationConfig on every call
+(the previous behaviour) with the pooled model handles. Both variants skip
+the shared scheduler, whose rate limits would otherwise dominate.
+
+Usage (from backend/):
+    python -m benchmarks.gemini_client_overhead [--calls 5000]
+"""
+import argparse
+import time
+from types import SimpleNamespace
+import google.generativeai as genai
+from app.services.gemini_client import GeminiClient
+
+
+FAKE_RESPONSE = SimpleNamespace(text="{}")
+
+
+def fake_generate_content(self, contents, generation_config=None, **kwargs):
+    """Stand-in for the API call so only client-side work is measured."""
+    return FAKE_RESPONSE
+
+
+def per_call_models(client: GeminiClient, prompt: str, temperature: float) -> str:
+    """The previous generate_text: a fresh model and config per call."""
+    model = genai.GenerativeModel(client.model_name)
+    response = model.generate_content(
+        prompt,
+        generation_config=genai.types.GenerationConfig(temperature=temperature)
+    )
+    return response.text
+
+
+def pooled_models(client: GeminiClient, prompt: str, temperature: float) -> str:
+    """The current generate_text: a pooled model handle."""
+    response = client.get_model(temperature=temperature).generate_content(prompt)
+    return response.text
+
+
+def measure(fn, client: GeminiClient, calls: int) -> float:
+    """Return mean microseconds per call."""
+    fn(client, "warm up", 0.7)
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(client, f"prompt {i}", 0.7)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    """Run the benchmark and print a small table."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=5000)
+    args = parser.parse_args()
+    
+    genai.GenerativeModel.generate_content = fake_generate_content
+    client = GeminiClient(api_key="benchmark")
+    
+    before = measure(per_call_models, client, args.calls)
+    after = measure(pooled_models, client, args.calls)
+    
+    print(f"{'variant':<16}{'us/call':>10}")
+    print(f"{'per-call model':<16}{before:>10.1f}")
+    print(f"{'pooled model':<16}{after:>10.1f}")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
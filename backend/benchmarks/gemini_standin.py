@@ -0,0 +1,170 @@
+"""
+Local HTTP stand-in for the Gemini REST API, serving cassette responses.
+
+Latency, error rate and 429 bursts are injected like ReplayGeminiClient,
+so the real GeminiClient (and its scheduler) can be load-tested offline.
+Point the API at it with GEMINI_API_ENDPOINT=http://127.0.0.1:8765.
+
+Usage (from backend/):
+    python -m benchmarks.gemini_standin cassette.json [--port 8765]
+        [--latency lognormal:800:0.5] [--error-rate 0.01]
+        [--burst-every 50 --burst-length 5]
+"""
+import argparse
+import json
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Tuple
+from app.services.replay_client import EMBEDDING, TEXT, Cassette, FaultInjector, LatencyModel
+
+
+ERROR_STATUS = {429: "RESOURCE_EXHAUSTED", 500: "INTERNAL", 503: "UNAVAILABLE"}
+
+
+def content_text(content: Dict[str, Any]) -> str:
+    """Join the text parts of a Content message."""
+    return "".join(part.get("text", "") for part in content.get("parts", []))
+
+
+def candidate(text: str) -> Dict[str, Any]:
+    """A GenerateContentResponse holding ``text``."""
+    return {
+        "candidates": [{
+            "content": {"parts": [{"text": text}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0
+        }]
+    }
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Threaded HTTP server holding the cassette and injection settings."""
+    
+    daemon_threads = True
+    
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        cassette: Cassette,
+        latency: LatencyModel,
+        faults: FaultInjector
+    ):
+        """Bind the server."""
+        super().__init__(address, StandInHandler)
+        self.cassette = cassette
+        self.latency = latency
+        self.faults = faults
+    
+    def respond(self, action: str, body: Dict[str, Any]) -> Any:
+        """Build the JSON reply to a model ``action``."""
+        if action == "generateContent":
+            return candidate(self.cassette.lookup(TEXT, "".join(
+                content_text(content) for content in body.get("contents", [])
+            )))
+        if action == "streamGenerateContent":
+            text = self.cassette.lookup(TEXT, "".join(
+                content_text(content) for content in body.get("contents", [])
+            ))
+            return [candidate(text[i:i + 32]) for i in range(0, len(text), 32)] or [candidate("")]
+        if action == "embedContent":
+            return {"embedding": {"values": self.cassette.lookup(
+                EMBEDDING, content_text(body.get("content", {}))
+            )}}
+        if action == "batchEmbedContents":
+            return {"embeddings": [
+                {"values": self.cassette.lookup(EMBEDDING, content_text(request.get("content", {})))}
+                for request in body.get("requests", [])
+            ]}
+        raise KeyError(f"Unsupported action: {action}")
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    """Handles ``POST /v1beta/models/{model}:{action}``."""
+    
+    server: StandInServer
+    
+    def _send(self, status: int, payload: Any):
+        """Write a JSON response."""
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+    
+    def _error(self, code: int, message: str):
+        """Write a Google API error body."""
+        self._send(code, {"error": {
+            "code": code,
+            "message": message,
+            "status": ERROR_STATUS.get(code, "UNKNOWN")
+        }})
+    
+    def do_POST(self):
+        """Serve one API call."""
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}")
+        action = self.path.split("?")[0].rsplit(":", 1)[-1]
+        
+        time.sleep(self.server.latency.sample())
+        code = self.server.faults.next_fault()
+        if code:
+            self._error(code, "Injected failure from the Gemini stand-in.")
+            return
+        
+        try:
+            self._send(200, self.server.respond(action, body))
+        except KeyError as e:
+            self._error(404, str(e))
+    
+    def log_message(self, format: str, *args):
+        """Keep load tests quiet."""
+        pass
+
+
+def make_server(
+    cassette: Cassette,
+    host: str = "127.0.0.1",
+    port: int = 8765,
+    latency: str = "fixed:0",
+    error_rate: float = 0.0,
+    burst_every: int = 0,
+    burst_length: int = 0
+) -> StandInServer:
+    """Create (but don't start) a stand-in server."""
+    return StandInServer(
+        (host, port),
+        cassette,
+        LatencyModel(latency),
+        FaultInjector(error_rate, burst_every, burst_length)
+    )
+
+
+def main(argv: List[str] = None):
+    """Serve until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("cassette")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", default="lognormal:800:0.5")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--burst-every", type=int, default=0)
+    parser.add_argument("--burst-length", type=int, default=0)
+    args = parser.parse_args(argv)
+    
+    server = make_server(
+        Cassette(args.cassette), args.host, args.port, args.latency,
+        args.error_rate, args.burst_every, args.burst_length
+    )
+    print(f"Gemini stand-in listening on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Injected failures: {server.faults.injected}")
+
+
+if __name__ == "__main__":
+    main()
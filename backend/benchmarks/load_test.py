@@ -0,0 +1,118 @@
+"""
+Concurrent load test of the explain, clip and PDF import routes.
+
+Run the API against recorded responses first, either in-process
+(GEMINI_REPLAY_CASSETTE=...) or through the HTTP stand-in
+(GEMINI_API_ENDPOINT=..., see benchmarks/gemini_standin.py), then:
+
+Usage (from backend/):
+    python -m benchmarks.load_test [--url http://localhost:8000]
+        [--scenario explain|explain-stream|clip|import] [--requests 200]
+        [--concurrency 20] [--pdf sample.pdf]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List
+import httpx
+
+
+SELECTIONS = [
+    "If 3x + 5 = 20, what is the value of x?",
+    "The author's tone in the passage is best described as sanguine.",
+    "Laconic: using very few words.",
+    "Evaluate the argument that remote work lowers productivity.",
+]
+
+
+def build_request(scenario: str, i: int, pdf: bytes = None) -> Dict[str, Any]:
+    """Keyword arguments for ``httpx.AsyncClient.post`` of request ``i``."""
+    text = SELECTIONS[i % len(SELECTIONS)]
+    if scenario in ("explain", "explain-stream"):
+        path = "/api/v1/explain" + ("/stream" if scenario == "explain-stream" else "")
+        return {"url": path, "json": {"selection_text": text, "domain": "verbal"}}
+    if scenario == "clip":
+        return {"url": "/api/v1/ingest/clip", "json": {
+            "text": text, "url": f"https://example.com/{i}", "save": False
+        }}
+    if scenario == "import":
+        return {"url": "/api/v1/import/pdf", "files": {
+            "file": (f"load-{i}.pdf", pdf, "application/pdf")
+        }}
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``values``."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def wait_for_job(client: httpx.AsyncClient, job_id: str, interval: float = 0.2) -> httpx.Response:
+    """Poll an import job until it finishes and return the last response."""
+    while True:
+        response = await client.get(f"/api/v1/import/jobs/{job_id}")
+        if response.status_code != 200 or response.json()["status"] in ("done", "failed"):
+            return response
+        await asyncio.sleep(interval)
+
+
+async def run(url: str, scenario: str, requests: int, concurrency: int, pdf: bytes = None):
+    """Send ``requests`` requests with at most ``concurrency`` in flight."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    statuses: Counter = Counter()
+    
+    async with httpx.AsyncClient(base_url=url, timeout=600) as client:
+        async def one(i: int):
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post(**build_request(scenario, i, pdf))
+                    if scenario == "import" and response.status_code == 202:
+                        response = await wait_for_job(client, response.json()["id"])
+                    statuses[response.status_code] += 1
+                except httpx.HTTPError as e:
+                    statuses[type(e).__name__] += 1
+                latencies.append(time.perf_counter() - start)
+        
+        start = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - start
+        llm_stats = (await client.get("/api/v1/llm/stats")).json()
+    
+    print(f"{scenario}: {requests} requests, concurrency {concurrency}, {elapsed:.1f}s "
+          f"({requests / elapsed:.1f} req/s)")
+    print(f"  latency p50 {percentile(latencies, 50):.3f}s  p95 {percentile(latencies, 95):.3f}s  "
+          f"p99 {percentile(latencies, 99):.3f}s  mean {statistics.mean(latencies):.3f}s")
+    print(f"  status codes: {dict(statuses)}")
+    scheduler = llm_stats.get("scheduler") or {}
+    print(f"  scheduler: calls {scheduler.get('calls')}, retries {scheduler.get('retries')}, "
+          f"failures {scheduler.get('failures')}, "
+          f"mean wait {(scheduler.get('wait_seconds') or {}).get('mean', 0):.3f}s")
+
+
+def main():
+    """Parse arguments and run the load test."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument(
+        "--scenario", default="explain",
+        choices=["explain", "explain-stream", "clip", "import"]
+    )
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--pdf", type=Path)
+    args = parser.parse_args()
+    
+    if args.scenario == "import" and not args.pdf:
+        parser.error("--pdf is required for the import scenario")
+    pdf = args.pdf.read_bytes() if args.pdf else None
+    asyncio.run(run(args.url, args.scenario, args.requests, args.concurrency, pdf))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,9 +8,17 @@ from fastapi.testclient import TestClient
 # Set environment for testing
 os.environ["USE_MOCK_GEMINI"] = "true"
 os.environ["DATABASE_URL"] = "sqlite:///./test_gre_mentor.db"
+# Tests drain the embedding queue explicitly
+os.environ["EMBEDDING_WORKERS"] = "0"
+# Extract PDF pages on threads; the process pool is tested explicitly
+os.environ["PDF_EXTRACT_WORKERS"] = "0"
 
 from app.main import app
+from app.config import settings
 from app.database import Base, get_db
+from app.services import vector_store
+from app.services.response_cache import clear_response_caches
+from app.services.token_usage import reset_token_usage
 from app.services.gemini_client import MockGeminiClient, set_gemini_client
 
 # Create test database
@@ -21,6 +29,16 @@ engine = create_engine(
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+@pytest.fixture(autouse=True)
+def isolated_data_dir(tmp_path, monkeypatch):
+    """Keep FAISS index and embedding files in a per-test directory, caches empty."""
+    monkeypatch.setattr(settings, "data_dir", str(tmp_path / "data"))
+    monkeypatch.setattr(vector_store, "_vector_store", None)
+    clear_response_caches()
+    reset_token_usage()
+    yield tmp_path / "data"
+
+
 @pytest.fixture(scope="function")
 def db():
     """Create a fresh database for each test."""
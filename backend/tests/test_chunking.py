@@ -0,0 +1,99 @@
+"""Tests for token-aware chunk packing."""
+from app.services.chunking import QuestionChunker, aiter_chunks, question_score
+from app.services.token_usage import estimate_tokens
+
+
+def chunk_all(pages, target_tokens, overlap_tokens=0):
+    """Feed every page through a chunker and return all windows."""
+    chunker = QuestionChunker(target_tokens, overlap_tokens)
+    windows = []
+    for page in pages:
+        windows.extend(chunker.feed(page))
+    return windows + chunker.finish()
+
+
+def numbered_questions(count):
+    """Text of ``count`` numbered questions, each with a choice block."""
+    return "\n".join(
+        f"{i}. If x + {i} = {2 * i}, what is the value of x?\n(A) 1\n(B) 2\n(C) {i}"
+        for i in range(1, count + 1)
+    )
+
+
+def test_packs_questions_into_windows_near_target():
+    """Adjacent questions share a window without going over the target."""
+    windows = chunk_all([numbered_questions(30)], target_tokens=100)
+    
+    assert 1 < len(windows) < 30
+    assert all(estimate_tokens(window) <= 100 for window in windows)
+    assert "\n".join(windows).count("what is the value of x?") == 30
+
+
+def test_choices_stay_with_their_question():
+    """A window never starts on an answer choice."""
+    windows = chunk_all([numbered_questions(10)], target_tokens=30)
+    
+    for window in windows:
+        assert window.splitlines()[0][0].isdigit()
+        assert window.count("(A)") == window.count("what is the value of x?")
+
+
+def test_question_split_across_pages_stays_whole():
+    """The tail of a question on the next page joins its stem."""
+    pages = [
+        "1. Which word means talkative?\n(A) laconic",
+        "(B) garrulous\n(C) terse\n2. What is 2 + 2?\n(A) 4"
+    ]
+    windows = chunk_all(pages, target_tokens=15)
+    
+    assert windows[0] == "1. Which word means talkative?\n(A) laconic\n(B) garrulous\n(C) terse"
+    assert windows[1] == "2. What is 2 + 2?\n(A) 4"
+
+
+def test_windows_overlap_with_previous_tail():
+    """Each window after the first repeats the last lines of the one before."""
+    windows = chunk_all([numbered_questions(6)], target_tokens=30, overlap_tokens=5)
+    
+    assert len(windows) > 1
+    for previous, window in zip(windows, windows[1:]):
+        assert window.splitlines()[:2] == previous.splitlines()[-2:]
+
+
+def test_oversized_unit_gets_its_own_window():
+    """A unit longer than the target is emitted whole."""
+    long_passage = "Reading passage " + "word " * 200
+    windows = chunk_all([f"{long_passage}\n\n1. Short question?"], target_tokens=50)
+    
+    assert windows == [long_passage, "1. Short question?"]
+
+
+async def test_aiter_chunks_streams_pages():
+    """Pages from an async source come out as packed windows."""
+    async def pages():
+        for number, text in enumerate(["1. First?\n(A) yes", "2. Second?\n(A) no"], start=1):
+            yield number, text
+    
+    windows = [window async for window in aiter_chunks(pages(), target_tokens=1000)]
+    
+    assert windows == ["1. First?\n(A) yes\n2. Second?\n(A) no"]
+
+
+def test_question_score_separates_questions_from_prose():
+    """Question formats score above the default threshold; prose and keys below it."""
+    questions = [
+        "1. Which of the following is a prime number?\n(A) 4\n(B) 6\n(C) 7\n(D) 9\n(E) 10",
+        "x > 0\nQuantity A: x + 1\nQuantity B: x - 1",
+        "Her _____ manner belied the (i) _____ of her intentions.",
+        "If 3x + 2 = 11, what is the value of x?",
+        "1. Although the critics _____ the play, audiences flocked to it for months.",
+    ]
+    not_questions = [
+        "Chapter 3 covers arithmetic, algebra and geometry. Work through it slowly.",
+        "Why does the exam reward patience? And why do so many people rush it?",
+        "1. Read the chapter twice.\n2. Then work through the drills.",
+        "Answer Key\n1. B 2. C 3. A 4. E 5. D",
+        "Contents\nArithmetic ........ 12\nGeometry ........ 48",
+    ]
+    
+    assert all(question_score(text) >= 2.0 for text in questions)
+    assert all(question_score(text) < 2.0 for text in not_questions)
@@ -0,0 +1,107 @@
+"""Tests for the persistent embedding cache."""
+import pytest
+from app.services.embedding_cache import CachingGeminiClient, EmbeddingCache
+from app.services.gemini_client import MockGeminiClient
+
+
+class CountingClient(MockGeminiClient):
+    """Mock client that counts embedding calls."""
+    
+    def __init__(self):
+        super().__init__()
+        self.embedding_calls = 0
+    
+    def generate_embedding(self, text):
+        self.embedding_calls += 1
+        return super().generate_embedding(text)
+
+
+def test_hits_skip_the_client(tmp_path):
+    """Embedding the same text twice calls the client once."""
+    inner = CountingClient()
+    client = CachingGeminiClient(inner, EmbeddingCache(tmp_path / "cache.db", 10))
+    
+    first = client.generate_embedding("ubiquitous present everywhere")
+    second = client.generate_embedding("ubiquitous present everywhere")
+    
+    assert inner.embedding_calls == 1
+    assert second == pytest.approx(first, abs=1e-6)
+    stats = client.cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+
+def test_cache_persists(tmp_path):
+    """Cached vectors survive reopening the cache file."""
+    EmbeddingCache(tmp_path / "cache.db", 10).put("model", "text", [0.5] * 4)
+    
+    cache = EmbeddingCache(tmp_path / "cache.db", 10)
+    
+    assert cache.get("model", "text") == [0.5] * 4
+    assert cache.get("other-model", "text") is None
+
+
+def test_lru_eviction(tmp_path):
+    """The least recently used entry is evicted when the cache is full."""
+    cache = EmbeddingCache(tmp_path / "cache.db", 2)
+    cache.put("model", "a", [1.0])
+    cache.put("model", "b", [2.0])
+    cache.get("model", "a")
+    cache.put("model", "c", [3.0])
+    
+    assert cache.get("model", "b") is None
+    assert cache.get("model", "a") == [1.0]
+    assert cache.get("model", "c") == [3.0]
+    assert cache.stats()["entries"] == 2
+
+
+def test_batch_sends_only_misses(tmp_path):
+    """Batch embedding only asks the wrapped client for uncached texts."""
+    inner = CountingClient()
+    client = CachingGeminiClient(inner, EmbeddingCache(tmp_path / "cache.db", 10))
+    client.generate_embedding("a")
+    
+    vectors = client.generate_embeddings(["a", "b", "c"])
+    
+    assert vectors.shape == (3, 768)
+    assert inner.embedding_calls == 3
+    assert vectors[0] == pytest.approx(inner.generate_embedding("a"), abs=1e-6)
+
+
+def test_get_many_touches_hits_in_one_commit(tmp_path):
+    """A batch lookup runs one SELECT and commits its LRU touches once."""
+    cache = EmbeddingCache(tmp_path / "cache.db", 100)
+    for i in range(5):
+        cache.put("model", f"text {i}", [float(i)] * 4)
+    
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    vectors = cache.get_many("model", ["text 0", "missing", "text 3", "text 0"])
+    cache._conn.set_trace_callback(None)
+    
+    assert vectors[0] == vectors[3] == [0.0] * 4
+    assert vectors[1] is None
+    assert vectors[2] == [3.0] * 4
+    assert sum(s.startswith("SELECT") for s in statements) == 1
+    assert sum(s == "COMMIT" for s in statements) == 1
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 1
+
+
+def test_batch_misses_stored_in_one_commit(tmp_path):
+    """Fresh embeddings from a batch are written with a single commit and eviction pass."""
+    cache = EmbeddingCache(tmp_path / "cache.db", 3)
+    client = CachingGeminiClient(CountingClient(), cache)
+    cache.put(client.model, "a", [1.0] * 768)
+    
+    statements = []
+    cache._conn.set_trace_callback(statements.append)
+    client.generate_embeddings(["a", "b", "c", "d", "b"])
+    cache._conn.set_trace_callback(None)
+    
+    # One commit touches the hit, one stores the misses
+    assert sum(s == "COMMIT" for s in statements) == 2
+    assert sum(s.startswith("DELETE") for s in statements) == 1
+    assert cache.stats()["entries"] == 3
+    assert cache.get(client.model, "a") is None
+    assert all(cache.get(client.model, text) is not None for text in "bcd")
@@ -0,0 +1,104 @@
+"""Tests for the memory-mapped embedding store."""
+import os
+import numpy as np
+import pytest
+from app.services import embedding_store
+from app.services.embedding_store import EmbeddingStore, INITIAL_CAPACITY
+
+
+def test_append_and_reopen(tmp_path):
+    """Test that appended vectors survive reopening the store."""
+    store = EmbeddingStore(tmp_path, dimension=4)
+    vectors = np.arange(8, dtype=np.float32).reshape(2, 4)
+    store.append(vectors, [0, 1])
+    
+    reopened = EmbeddingStore(tmp_path, dimension=4)
+    
+    assert reopened.size == 2
+    np.testing.assert_array_equal(reopened.vectors(), vectors)
+    np.testing.assert_array_equal(reopened.ids(), [0, 1])
+
+
+def test_append_grows_capacity(tmp_path):
+    """Test that the store grows past its initial capacity."""
+    store = EmbeddingStore(tmp_path, dimension=2)
+    count = INITIAL_CAPACITY + 10
+    vectors = np.random.rand(count, 2).astype(np.float32)
+    
+    store.append(vectors[:5], np.arange(5))
+    store.append(vectors[5:], np.arange(5, count))
+    
+    assert store.size == count
+    assert store.capacity >= count
+    np.testing.assert_array_equal(store.vectors(), vectors)
+
+
+def test_replace(tmp_path):
+    """Test replacing the store contents."""
+    store = EmbeddingStore(tmp_path, dimension=2)
+    store.append(np.ones((3, 2)), [0, 1, 2])
+    
+    store.replace(np.zeros((1, 2)), [2])
+    
+    assert store.size == 1
+    np.testing.assert_array_equal(store.ids(), [2])
+
+
+def test_dimension_mismatch(tmp_path):
+    """Test that opening with the wrong dimension fails loudly."""
+    EmbeddingStore(tmp_path, dimension=2).append(np.ones((1, 2)), [0])
+    
+    with pytest.raises(ValueError):
+        EmbeddingStore(tmp_path, dimension=3)
+
+
+def test_crash_before_swap_keeps_old_pair(tmp_path, monkeypatch):
+    """Test that a rewrite interrupted before the switch leaves the old files in use."""
+    store = EmbeddingStore(tmp_path, dimension=2)
+    store.append(np.ones((3, 2)), [0, 1, 2])
+    store.flush()
+    
+    def crash(src, dst):
+        raise OSError("simulated crash")
+    
+    monkeypatch.setattr(embedding_store.os, "replace", crash)
+    with pytest.raises(OSError):
+        store.replace(np.zeros((1, 2)), [2])
+    monkeypatch.undo()
+    
+    reopened = EmbeddingStore(tmp_path, dimension=2)
+    
+    np.testing.assert_array_equal(reopened.ids(), [0, 1, 2])
+    assert {p.name for p in tmp_path.iterdir()} == {
+        reopened.vectors_file.name, reopened.ids_file.name, embedding_store.CURRENT_FILE
+    }
+
+
+def test_crash_after_swap_uses_new_pair(tmp_path, monkeypatch):
+    """Test that a rewrite interrupted after the switch opens the new files."""
+    store = EmbeddingStore(tmp_path, dimension=2)
+    store.append(np.ones((3, 2)), [0, 1, 2])
+    old_vectors, old_ids = store.vectors_file, store.ids_file
+    
+    # Crash right after the switch, before the old generation is cleaned up
+    monkeypatch.setattr(EmbeddingStore, "_open", lambda self: None)
+    store.replace(np.zeros((1, 2)), [2])
+    monkeypatch.undo()
+    assert old_vectors.exists() and old_ids.exists()
+    
+    reopened = EmbeddingStore(tmp_path, dimension=2)
+    
+    np.testing.assert_array_equal(reopened.ids(), [2])
+    assert not old_vectors.exists() and not old_ids.exists()
+    reopened.append(np.ones((1, 2)), [3])
+    np.testing.assert_array_equal(EmbeddingStore(tmp_path, dimension=2).ids(), [2, 3])
+
+
+def test_delete_removes_every_generation(tmp_path):
+    """Test that delete leaves nothing behind."""
+    store = EmbeddingStore(tmp_path, dimension=2)
+    store.append(np.ones((INITIAL_CAPACITY + 1, 2)), np.arange(INITIAL_CAPACITY + 1))
+    
+    store.delete()
+    
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,176 @@
+"""Tests for the background embedding queue."""
+import pytest
+from sqlalchemy.orm import sessionmaker
+from app.models.embedding_job import EmbeddingJob
+from app.models.word import Word
+from app.services.embedding_worker import enqueue_embedding, process_embedding_jobs
+from app.services.vector_store import get_vector_store
+
+
+WORD_DATA = {
+    "word": "ubiquitous",
+    "gre_definition": "Present everywhere",
+    "associations": ["a", "b", "c", "d", "e"],
+    "examples": ["ex1", "ex2", "ex3"],
+    "easy_synonyms": ["s1", "s2", "s3"],
+    "gre_synonyms": ["g1", "g2", "g3"]
+}
+
+
+def is_live(store, vector_id):
+    """Whether a word vector is stored and not tombstoned."""
+    partition = store.partitions["word"]
+    return partition.contains(vector_id) and vector_id not in partition.tombstones
+
+
+def test_save_enqueues_embedding(client, db, mock_gemini):
+    """Saving a word queues its embedding instead of generating it inline."""
+    response = client.post("/api/v1/mnemonic/save", json=WORD_DATA)
+    assert response.status_code == 200
+    word_id = response.json()["id"]
+    
+    assert response.json()["embedding_vector_id"] is None
+    status = client.get("/api/v1/embeddings/status").json()
+    assert status["pending"] == 1
+    assert status["oldest_pending_seconds"] is not None
+    
+    assert process_embedding_jobs(db) == 1
+    
+    word = db.query(Word).filter(Word.id == word_id).first()
+    assert word.embedding_vector_id is not None
+    results = get_vector_store().search(mock_gemini.generate_embedding("x"), k=1, db=db)
+    assert results[0][0] == word_id
+    
+    status = client.get("/api/v1/embeddings/status").json()
+    assert status["pending"] == 0
+    assert status["done"] == 1
+
+
+def test_update_replaces_vector(client, db, mock_gemini):
+    """Re-embedding an edited word drops its previous vector."""
+    word_id = client.post("/api/v1/mnemonic/save", json=WORD_DATA).json()["id"]
+    process_embedding_jobs(db)
+    old_vector_id = db.query(Word).filter(Word.id == word_id).first().embedding_vector_id
+    
+    client.put(f"/api/v1/words/{word_id}", json={"gre_definition": "Everywhere at once"})
+    process_embedding_jobs(db)
+    
+    word = db.query(Word).filter(Word.id == word_id).first()
+    assert word.embedding_vector_id != old_vector_id
+    # The old vector is tombstoned (or already compacted away) once the new one is live
+    store = get_vector_store()
+    assert not is_live(store, old_vector_id)
+    results = store.search(mock_gemini.generate_embedding("x"), k=5, db=db)
+    assert [object_id for object_id, _, _ in results] == [word_id]
+
+
+def test_overlapping_reembeds_leave_one_vector(client, db, mock_gemini, monkeypatch):
+    """A job queued while another runs for the same object waits for it to finish."""
+    word_id = client.post("/api/v1/mnemonic/save", json=WORD_DATA).json()["id"]
+    process_embedding_jobs(db)
+    client.put(f"/api/v1/words/{word_id}", json={"gre_definition": "Everywhere at once"})
+    
+    embed = mock_gemini.generate_embeddings
+    claimed_meanwhile = []
+    
+    def edit_meanwhile(texts):
+        # A second edit lands and another worker polls while the first batch embeds
+        monkeypatch.setattr(mock_gemini, "generate_embeddings", embed)
+        client.put(f"/api/v1/words/{word_id}", json={"story": "Seen on every corner"})
+        claimed_meanwhile.append(process_embedding_jobs(db))
+        return embed(texts)
+    monkeypatch.setattr(mock_gemini, "generate_embeddings", edit_meanwhile)
+    
+    worker_db = sessionmaker(bind=db.get_bind())()
+    try:
+        process_embedding_jobs(worker_db)
+    finally:
+        worker_db.close()
+    process_embedding_jobs(db)
+    
+    assert claimed_meanwhile == [0]
+    assert db.query(EmbeddingJob).filter(EmbeddingJob.status != "done").count() == 0
+    results = get_vector_store().search_objects(
+        mock_gemini.generate_embedding("x"),
+        k=5,
+        db=db,
+        object_type="word"
+    )
+    assert [word.id for word, _ in results] == [word_id]
+
+
+def test_pending_jobs_are_deduplicated(db):
+    """Repeated edits before the worker runs cost one embedding."""
+    enqueue_embedding(db, "word-1", "word")
+    enqueue_embedding(db, "word-1", "word")
+    
+    assert db.query(EmbeddingJob).count() == 1
+
+
+def test_failed_jobs_retry_until_limit(db, mock_gemini, monkeypatch):
+    """Embedding failures are retried, then parked as failed."""
+    monkeypatch.setattr("app.config.settings.embedding_max_attempts", 2)
+    
+    def fail(texts):
+        raise RuntimeError("quota exceeded")
+    monkeypatch.setattr(mock_gemini, "generate_embeddings", fail)
+    
+    word = Word(word="laconic", gre_definition="Using few words")
+    db.add(word)
+    db.commit()
+    enqueue_embedding(db, word.id, "word")
+    
+    process_embedding_jobs(db)
+    job = db.query(EmbeddingJob).first()
+    assert job.status == "pending"
+    assert job.attempts == 1
+    
+    process_embedding_jobs(db)
+    db.refresh(job)
+    assert job.status == "failed"
+    assert "quota exceeded" in job.last_error
+
+
+def test_deleted_objects_are_skipped(db, mock_gemini):
+    """Jobs for objects deleted before processing finish without a vector."""
+    enqueue_embedding(db, "missing-word", "word")
+    
+    assert process_embedding_jobs(db) == 1
+    assert db.query(EmbeddingJob).first().status == "done"
+    assert get_vector_store().ntotal == 0
+
+
+def test_indexing_failure_requeues_and_keeps_old_vector(db, mock_gemini, monkeypatch):
+    """A vector store failure sends the job back to pending and leaves the old vector live."""
+    word = Word(word="laconic", gre_definition="Using few words")
+    db.add(word)
+    db.commit()
+    enqueue_embedding(db, word.id, "word")
+    process_embedding_jobs(db)
+    old_vector_id = word.embedding_vector_id
+    
+    word.gre_definition = "Terse"
+    db.commit()
+    enqueue_embedding(db, word.id, "word")
+    
+    store = get_vector_store()
+    add_vectors = store.add_vectors
+    
+    def fail(*args, **kwargs):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(store, "add_vectors", fail)
+    
+    assert process_embedding_jobs(db) == 1
+    pending = db.query(EmbeddingJob).filter(EmbeddingJob.status != "done").one()
+    assert pending.status == "pending"
+    assert pending.attempts == 1
+    assert "disk full" in pending.last_error
+    db.refresh(word)
+    assert word.embedding_vector_id == old_vector_id
+    assert store.search(mock_gemini.generate_embedding("x"), k=1, db=db)[0][0] == word.id
+    
+    monkeypatch.setattr(store, "add_vectors", add_vectors)
+    assert process_embedding_jobs(db) == 1
+    db.refresh(word)
+    assert word.embedding_vector_id != old_vector_id
+    assert not is_live(store, old_vector_id)
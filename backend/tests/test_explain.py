@@ -0,0 +1,67 @@
+"""Tests for explanation endpoints."""
+import json
+import pytest
+from app.services.json_stream import JSONFieldStream
+
+
+EXPLANATION = {
+    "summary": "Enervate means to weaken.",
+    "details": "Often confused with energize.",
+    "references": [{"title": "ETS", "url": "https://www.ets.org"}]
+}
+
+
+def parse_events(body: str):
+    """Split an SSE body into (event, data) pairs."""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_fields_complete_in_order():
+    """Each top-level field is emitted once its value is complete."""
+    stream = JSONFieldStream()
+    
+    assert stream.feed('```json\n{"summary": "Enervate ') == []
+    assert stream.feed('means to weaken.", "det') == [("summary", "Enervate means to weaken.")]
+    assert stream.feed('ails": "x", "score": 1') == [("details", "x")]
+    assert stream.feed('2}\n```') == [("score", 12)]
+    assert stream.closed
+
+
+def test_explain_stream(client, mock_gemini):
+    """The stream sends tokens, completed fields and the final response."""
+    mock_gemini.set_response("stream", json.dumps(EXPLANATION))
+    
+    response = client.post(
+        "/api/v1/explain/stream",
+        json={"selection_text": "enervate", "domain": "vocab"}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = parse_events(response.text)
+    
+    tokens = "".join(data["text"] for event, data in events if event == "token")
+    assert json.loads(tokens) == EXPLANATION
+    fields = [data["name"] for event, data in events if event == "field"]
+    assert fields == ["summary", "details", "references"]
+    
+    event, done = events[-1]
+    assert event == "done"
+    assert done["explanation"].startswith("Enervate means to weaken.")
+    assert done["references"][0]["title"] == "ETS"
+
+
+def test_explain_stream_reports_errors(client, mock_gemini):
+    """Unparseable output ends the stream with an error event."""
+    mock_gemini.set_response("stream", "not json")
+    
+    response = client.post(
+        "/api/v1/explain/stream",
+        json={"selection_text": "enervate", "domain": "vocab"}
+    )
+    
+    assert parse_events(response.text)[-1][0] == "error"
@@ -0,0 +1,131 @@
+"""Tests for the Gemini client wrapper."""
+import asyncio
+import threading
+import time
+import httpx
+import numpy as np
+import pytest
+from app.main import app
+from app.services import gemini_client
+from app.services.gemini_client import GeminiClient, MockGeminiClient, set_gemini_client
+
+
+def test_generate_embeddings_chunks_requests(monkeypatch):
+    """Texts are sent in API-sized batches and stacked into one matrix."""
+    calls = []
+    
+    def fake_embed_content(model, content, task_type):
+        calls.append(len(content))
+        return {"embedding": [[float(len(text))] * 4 for text in content]}
+    
+    monkeypatch.setattr(gemini_client.genai, "embed_content", fake_embed_content)
+    client = GeminiClient(api_key="test")
+    
+    texts = ["x" * (i % 7) for i in range(250)]
+    vectors = client.generate_embeddings(texts)
+    
+    assert calls == [100, 100, 50]
+    assert vectors.dtype == np.float32
+    assert vectors.shape == (250, 4)
+    assert vectors[13, 0] == len(texts[13])
+
+
+def test_mock_generate_embeddings_matches_single():
+    """Batch embeddings equal the per-text embeddings."""
+    client = MockGeminiClient()
+    
+    vectors = client.generate_embeddings(["alpha", "beta"])
+    
+    assert vectors.shape == (2, 768)
+    assert vectors[1] == pytest.approx(client.generate_embedding("beta"))
+
+
+class SlowClient(MockGeminiClient):
+    """Mock client whose async calls take a while."""
+    
+    async def agenerate_json(self, prompt, temperature=0.7):
+        await asyncio.sleep(0.2)
+        return {"summary": "Summary", "details": "Details", "references": []}
+
+
+async def test_routes_overlap_llm_waits():
+    """Concurrent requests wait on the model in parallel, not in turn."""
+    set_gemini_client(SlowClient())
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[
+                client.post("/api/v1/explain", json={"selection_text": "enervate", "domain": "vocab"})
+                for _ in range(3)
+            ])
+            elapsed = time.perf_counter() - start
+    finally:
+        set_gemini_client(None)
+    
+    assert all(r.status_code == 200 for r in responses)
+    assert elapsed < 0.5
+
+
+def test_model_handles_are_pooled():
+    """Model handles are reused per (model, tools, generation config)."""
+    client = GeminiClient(api_key="test")
+    
+    assert client.get_model(temperature=0.2) is client.get_model(temperature=0.2)
+    assert client.get_model(temperature=0.2) is not client.get_model(temperature=0.7)
+    
+    tools = [{"name": "lookup", "description": "Look up a word"}]
+    assert client.get_model(tools=tools) is client.get_model(tools=list(tools))
+
+
+def test_identical_sync_calls_are_coalesced(monkeypatch):
+    """Concurrent identical prompts share one request and its error."""
+    client = GeminiClient(api_key="test")
+    calls = []
+    
+    def slow_generate(prompt, temperature):
+        calls.append(prompt)
+        time.sleep(0.1)
+        raise RuntimeError("quota exceeded")
+    
+    monkeypatch.setattr(client, "_generate_text", slow_generate)
+    before = gemini_client.single_flight_stats()["coalesced"]
+    errors = []
+    
+    def worker():
+        try:
+            client.generate_text("same prompt")
+        except RuntimeError as e:
+            errors.append(e)
+    
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(calls) == 1
+    assert len(errors) == 4
+    assert gemini_client.single_flight_stats()["coalesced"] - before == 3
+
+
+async def test_identical_async_calls_are_coalesced(monkeypatch):
+    """Concurrent identical async prompts share one request."""
+    client = GeminiClient(api_key="test")
+    calls = []
+    
+    async def slow_generate(prompt, temperature):
+        calls.append(prompt)
+        await asyncio.sleep(0.05)
+        return f"answer to {prompt}"
+    
+    monkeypatch.setattr(client, "_agenerate_text", slow_generate)
+    
+    results = await asyncio.gather(
+        client.agenerate_text("same prompt"),
+        client.agenerate_text("same prompt"),
+        client.agenerate_text("other prompt")
+    )
+    
+    assert results == ["answer to same prompt"] * 2 + ["answer to other prompt"]
+    assert sorted(calls) == ["other prompt", "same prompt"]
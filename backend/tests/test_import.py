@@ -0,0 +1,519 @@
+"""Tests for PDF and Anki import endpoints."""
+import asyncio
+import time
+import multiprocessing
+import random
+import sqlite3
+import threading
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+import pytest
+from fastapi.testclient import TestClient
+from app.models.question import Question
+from app.models.word import Word
+from app.models.vector_mapping import VectorMapping
+from app.models.import_job import ImportJob, ImportJobUnit
+from app.models.embedding_job import EmbeddingJob
+from app.config import settings
+from app.main import app
+from app.services import import_jobs
+from app.services.gemini_client import MockGeminiClient, set_gemini_client
+from app.services.pdf_pipeline import aiter_pages, amap_ordered
+from app.services.vector_store import VectorStore
+
+
+def make_pdf(path, pages):
+    """Write a minimal PDF with one text line per entry of each page."""
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    ]
+    kids = []
+    for lines in pages:
+        text = " ".join(f"({line}) Tj 0 -14 Td" for line in lines)
+        stream = f"BT /F1 11 Tf 40 780 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+    
+    data = b"%PDF-1.4\n"
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(data)
+    data += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    data += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    data += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    path.write_bytes(data)
+    return path
+
+
+def question_pages(count):
+    """Pages that each hold one quant question."""
+    return [
+        [f"Question {i}. If x + {i} = {2 * i}, what is the value of x?", "A. 1  B. 2  C. 3"]
+        for i in range(1, count + 1)
+    ]
+
+
+def make_apkg(path, notes):
+    """Build a minimal .apkg holding ``notes`` as (fields, tags) pairs."""
+    collection = path.parent / "collection.anki2"
+    conn = sqlite3.connect(collection)
+    conn.execute("CREATE TABLE notes (flds TEXT, tags TEXT)")
+    conn.executemany(
+        "INSERT INTO notes VALUES (?, ?)",
+        [("\x1f".join(fields), tags) for fields, tags in notes]
+    )
+    conn.commit()
+    conn.close()
+    
+    with zipfile.ZipFile(path, "w") as apkg:
+        apkg.write(collection, "collection.anki2")
+    return path
+
+
+class EchoExtractionClient(MockGeminiClient):
+    """Extracts each "Question N." line of the text; fails on ``fail_on``."""
+    
+    def __init__(self, fail_on=None):
+        super().__init__()
+        self.fail_on = fail_on
+        self.prompts = []
+    
+    async def agenerate_json(self, prompt, temperature=0.7):
+        """Mock extraction that echoes the numbered questions in the prompt."""
+        await asyncio.sleep(0)
+        self.prompts.append(prompt)
+        text = prompt.split("TEXT TO ANALYZE:")[1]
+        if self.fail_on and self.fail_on in text:
+            raise RuntimeError("model error")
+        return [
+            {"question_text": line.split("?")[0].strip()}
+            for line in text.splitlines() if line.startswith("Question ")
+        ]
+
+
+def upload(client, route, path):
+    """Post a file to an import route and return the response."""
+    with open(path, "rb") as f:
+        return client.post(
+            f"/api/v1/import/{route}",
+            files={"file": (path.name, f, "application/octet-stream")}
+        )
+
+
+def wait_for_job(client, db, job_id, timeout=10):
+    """Poll the job endpoint until the job has finished."""
+    deadline = time.monotonic() + timeout
+    while True:
+        # The routes share the test session; drop its cached rows
+        db.expire_all()
+        job = client.get(f"/api/v1/import/jobs/{job_id}").json()
+        if job["status"] in ("done", "failed") or time.monotonic() > deadline:
+            return job
+        time.sleep(0.02)
+
+
+def test_import_anki_indexes_words_in_bulk(client, db, mock_gemini, tmp_path):
+    """Test that imported Anki words are embedded and indexed."""
+    apkg = make_apkg(tmp_path / "deck.apkg", [
+        (["laconic", "Using few words"], "vocab"),
+        (["garrulous", "Excessively talkative"], "vocab"),
+    ])
+    
+    response = upload(client, "anki", apkg)
+    assert response.status_code == 202
+    job = wait_for_job(client, db, response.json()["id"])
+    
+    assert job["status"] == "done"
+    assert job["stats"]["words_imported"] == 2
+    
+    words = db.query(Word).all()
+    assert all(w.embedding_vector_id is not None for w in words)
+    assert db.query(VectorMapping).filter(VectorMapping.object_type == "word").count() == 2
+
+
+def test_import_queues_embeddings_when_batch_fails(client, db, mock_gemini, tmp_path, monkeypatch):
+    """Words whose batch embedding fails are queued for the background workers."""
+    def fail(texts):
+        raise RuntimeError("quota exceeded")
+    monkeypatch.setattr(mock_gemini, "generate_embeddings", fail)
+    apkg = make_apkg(tmp_path / "deck.apkg", [
+        (["laconic", "Using few words"], "vocab"),
+        (["garrulous", "Excessively talkative"], "vocab"),
+    ])
+    
+    job = wait_for_job(client, db, upload(client, "anki", apkg).json()["id"])
+    
+    assert job["status"] == "done"
+    assert job["stats"]["words_imported"] == 2
+    word_ids = {w.id for w in db.query(Word).all()}
+    queued = db.query(EmbeddingJob).filter(EmbeddingJob.status == "pending").all()
+    assert {j.object_id for j in queued} == word_ids
+
+
+def test_import_queues_embeddings_when_indexing_fails(client, db, mock_gemini, tmp_path, monkeypatch):
+    """A batch whose vectors can't be stored keeps its words and units and queues the words."""
+    def fail(self, *args, **kwargs):
+        raise RuntimeError("disk full")
+    monkeypatch.setattr(VectorStore, "add_vectors", fail)
+    apkg = make_apkg(tmp_path / "deck.apkg", [
+        (["laconic", "Using few words"], "vocab"),
+        (["garrulous", "Excessively talkative"], "vocab"),
+    ])
+    
+    job = wait_for_job(client, db, upload(client, "anki", apkg).json()["id"])
+    
+    assert job["status"] == "done"
+    assert job["stats"]["words_imported"] == 2
+    assert job["stats"]["batches_failed"] == 0
+    units = db.query(ImportJobUnit).filter(ImportJobUnit.job_id == job["id"]).all()
+    assert [u.status for u in units] == ["done", "done"]
+    word_ids = {w.id for w in db.query(Word).all()}
+    assert len(word_ids) == 2
+    queued = db.query(EmbeddingJob).filter(EmbeddingJob.status == "pending").all()
+    assert {j.object_id for j in queued} == word_ids
+
+
+def test_import_anki_records_every_note(client, db, mock_gemini, tmp_path, monkeypatch):
+    """Existing words and malformed notes are recorded as skipped units."""
+    monkeypatch.setattr(settings, "anki_commit_batch", 2)
+    db.add(Word(word="laconic", gre_definition="Using few words"))
+    db.commit()
+    apkg = make_apkg(tmp_path / "deck.apkg", [
+        (["laconic", "Using few words"], "vocab"),
+        (["garrulous", "Excessively talkative"], "vocab"),
+        (["orphan"], ""),
+        (["garrulous", "Duplicate in the deck"], ""),
+        (["terse", "Brief"], "vocab"),
+    ])
+    
+    job = wait_for_job(client, db, upload(client, "anki", apkg).json()["id"])
+    
+    assert job["status"] == "done"
+    assert job["units_total"] == 5
+    assert job["units_completed"] == 5
+    assert job["stats"]["words_imported"] == 2
+    assert job["stats"]["notes_skipped"] == 2
+    assert job["stats"]["batches_committed"] == 3
+    units = db.query(ImportJobUnit).order_by(ImportJobUnit.position).all()
+    assert [u.status for u in units] == ["skipped", "done", "skipped", "skipped", "done"]
+
+
+def test_import_anki_rejects_wrong_extension(client):
+    """Test that non-.apkg uploads are rejected."""
+    response = client.post(
+        "/api/v1/import/anki",
+        files={"file": ("deck.txt", b"nope", "text/plain")}
+    )
+    assert response.status_code == 400
+
+
+def test_import_anki_rejects_invalid_package(client, db, isolated_data_dir):
+    """A file that isn't an Anki zip is rejected before a job is created."""
+    response = client.post(
+        "/api/v1/import/anki",
+        files={"file": ("deck.apkg", b"not a zip", "application/octet-stream")}
+    )
+    
+    assert response.status_code == 400
+    assert db.query(ImportJob).count() == 0
+    assert list((isolated_data_dir / "uploads").iterdir()) == []
+
+
+def test_import_job_not_found(client):
+    """Unknown job ids are a 404."""
+    assert client.get("/api/v1/import/jobs/missing").status_code == 404
+
+
+def test_import_pdf_streams_pages(client, db, tmp_path, isolated_data_dir):
+    """Pages are packed into a few windows and the spooled upload is removed afterwards."""
+    set_gemini_client(EchoExtractionClient())
+    pdf = make_pdf(tmp_path / "book.pdf", question_pages(20))
+    try:
+        response = upload(client, "pdf", pdf)
+        assert response.status_code == 202
+        assert response.json()["status"] == "pending"
+        job = wait_for_job(client, db, response.json()["id"])
+    finally:
+        set_gemini_client(None)
+    
+    assert job["status"] == "done"
+    assert job["stats"]["pages_total"] == job["stats"]["pages_read"] == 20
+    assert job["stats"]["chunks_processed"] < 20
+    assert job["stats"]["questions_extracted"] == 20
+    assert job["units_completed"] == job["units_total"]
+    assert db.query(Question).count() == 20
+    assert list((isolated_data_dir / "uploads").iterdir()) == []
+
+
+def test_import_pdf_skips_chunks_without_questions(client, db, tmp_path, monkeypatch):
+    """Prose pages are dropped by the pre-filter and never sent for extraction."""
+    monkeypatch.setattr(settings, "pdf_chunk_tokens", 20)
+    monkeypatch.setattr(settings, "pdf_chunk_overlap_tokens", 0)
+    fake = EchoExtractionClient()
+    prose = ["This chapter reviews the arithmetic you need for the exam.", "Read it slowly."]
+    pdf = make_pdf(tmp_path / "book.pdf", [prose] + question_pages(2))
+    set_gemini_client(fake)
+    try:
+        job = wait_for_job(client, db, upload(client, "pdf", pdf).json()["id"])
+    finally:
+        set_gemini_client(None)
+    
+    assert job["stats"]["chunks_skipped"] == 1
+    assert job["stats"]["questions_extracted"] == 2
+    assert len(fake.prompts) == 2
+    assert not any("This chapter" in prompt for prompt in fake.prompts)
+
+
+def test_import_pdf_rejects_wrong_extension(client):
+    """Test that non-.pdf uploads are rejected."""
+    response = client.post(
+        "/api/v1/import/pdf",
+        files={"file": ("book.txt", b"nope", "text/plain")}
+    )
+    assert response.status_code == 400
+
+
+def test_import_pdf_commits_batches_in_order(client, db, tmp_path, monkeypatch):
+    """A failed chunk is skipped; the rest is committed batch by batch, in order."""
+    monkeypatch.setattr(settings, "pdf_commit_batch", 4)
+    # One question per window, so each page is its own chunk
+    monkeypatch.setattr(settings, "pdf_chunk_tokens", 20)
+    monkeypatch.setattr(settings, "pdf_chunk_overlap_tokens", 0)
+    set_gemini_client(EchoExtractionClient(fail_on="Question 3."))
+    pdf = make_pdf(tmp_path / "book.pdf", question_pages(10))
+    try:
+        job = wait_for_job(client, db, upload(client, "pdf", pdf).json()["id"])
+    finally:
+        set_gemini_client(None)
+    
+    assert job["status"] == "done"
+    assert job["stats"]["chunks_failed"] == 1
+    assert job["stats"]["questions_extracted"] == 9
+    assert job["stats"]["batches_committed"] == 3
+    
+    texts = [q.question_text for q in db.query(Question).all()]
+    assert len(texts) == 9
+    assert not any(text.startswith("Question 3.") for text in texts)
+    
+    units = db.query(ImportJobUnit).order_by(ImportJobUnit.position).all()
+    assert [u.position for u in units] == list(range(10))
+    assert units[2].status == "failed" and units[2].error == "model error"
+
+
+def test_import_pdf_resumes_after_restart(db, tmp_path, isolated_data_dir, monkeypatch):
+    """A job interrupted mid-run picks up after its last recorded chunk on the next start."""
+    monkeypatch.setattr(settings, "pdf_chunk_tokens", 20)
+    monkeypatch.setattr(settings, "pdf_chunk_overlap_tokens", 0)
+    spooled = isolated_data_dir / "uploads" / "book.pdf"
+    spooled.parent.mkdir(parents=True)
+    make_pdf(spooled, question_pages(4))
+    
+    # State left behind by a run that committed the first two chunks
+    job = ImportJob(
+        kind="pdf",
+        filename="book.pdf",
+        path=str(spooled),
+        status="running",
+        units_completed=2,
+        stats={"questions_extracted": 2, "chunks_processed": 2, "batches_committed": 1}
+    )
+    db.add(job)
+    db.flush()
+    db.add_all([ImportJobUnit(job_id=job.id, position=i, status="done", items=1) for i in range(2)])
+    db.add_all([Question(question_text=f"Question {i}. Earlier", source="PDF: book.pdf") for i in (1, 2)])
+    db.commit()
+    
+    fake = EchoExtractionClient()
+    set_gemini_client(fake)
+    try:
+        with TestClient(app) as client:
+            data = wait_for_job(client, db, job.id)
+    finally:
+        set_gemini_client(None)
+    
+    assert data["status"] == "done"
+    assert data["units_completed"] == data["units_total"] == 4
+    assert data["stats"]["questions_extracted"] == 4
+    assert data["stats"]["chunks_processed"] == 4
+    assert len(fake.prompts) == 2
+    assert "Question 3." in fake.prompts[0] and "Question 4." in fake.prompts[1]
+    assert db.query(Question).count() == 4
+    assert not spooled.exists()
+
+
+def test_import_pdf_drops_only_overlap_duplicates(client, db, tmp_path, monkeypatch):
+    """A question repeated by window overlap is stored once; a later repeat is kept."""
+    monkeypatch.setattr(settings, "pdf_chunk_tokens", 30)
+    monkeypatch.setattr(settings, "pdf_chunk_overlap_tokens", 20)
+    fake = EchoExtractionClient()
+    pages = question_pages(3)
+    pdf = make_pdf(tmp_path / "book.pdf", pages + pages[:1])
+    set_gemini_client(fake)
+    try:
+        job = wait_for_job(client, db, upload(client, "pdf", pdf).json()["id"])
+    finally:
+        set_gemini_client(None)
+    
+    assert sum(prompt.count("Question 2.") for prompt in fake.prompts) == 2
+    assert job["stats"]["questions_extracted"] == 4
+    texts = sorted(q.question_text for q in db.query(Question).all())
+    assert [text[:11] for text in texts] == ["Question 1.", "Question 1.", "Question 2.", "Question 3."]
+
+
+def test_import_pdf_resume_ignores_other_imports(db, tmp_path, isolated_data_dir, monkeypatch):
+    """On resume only the recorded window's overlap is dropped, not earlier imports of the file."""
+    monkeypatch.setattr(settings, "pdf_chunk_tokens", 30)
+    monkeypatch.setattr(settings, "pdf_chunk_overlap_tokens", 20)
+    spooled = isolated_data_dir / "uploads" / "book.pdf"
+    spooled.parent.mkdir(parents=True)
+    make_pdf(spooled, question_pages(3))
+    
+    # An earlier import of the same file, and a run that committed the first window
+    db.add(Question(question_text="Question 3. If x + 3 = 6, what is the value of x", source="PDF: book.pdf"))
+    job = ImportJob(
+        kind="pdf",
+        filename="book.pdf",
+        path=str(spooled),
+        status="running",
+        units_completed=1,
+        stats={"questions_extracted": 1, "chunks_processed": 1, "batches_committed": 1}
+    )
+    db.add(job)
+    db.flush()
+    db.add(ImportJobUnit(job_id=job.id, position=0, status="done", items=1))
+    db.add(Question(question_text="Question 1. If x + 1 = 2, what is the value of x", source="PDF: book.pdf"))
+    db.commit()
+    
+    set_gemini_client(EchoExtractionClient())
+    try:
+        with TestClient(app) as client:
+            data = wait_for_job(client, db, job.id)
+    finally:
+        set_gemini_client(None)
+    
+    assert data["status"] == "done"
+    assert data["stats"]["questions_extracted"] == 3
+    texts = [q.question_text[:11] for q in db.query(Question).all()]
+    assert sorted(texts) == ["Question 1.", "Question 2.", "Question 3.", "Question 3."]
+
+
+def test_import_job_fails_without_upload(db, isolated_data_dir):
+    """A pending job whose spooled file is gone is marked failed on start."""
+    job = ImportJob(kind="pdf", filename="gone.pdf", path=str(isolated_data_dir / "gone.pdf"))
+    db.add(job)
+    db.commit()
+    
+    with TestClient(app) as client:
+        data = wait_for_job(client, db, job.id)
+    
+    assert data["status"] == "failed"
+    assert "missing" in data["error"]
+
+
+async def test_import_runner_bounds_concurrent_jobs(monkeypatch):
+    """Jobs run side by side, never more than the worker limit at once."""
+    running = 0
+    peak = 0
+    finished = []
+    
+    async def fake_job(job_id):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        finished.append(job_id)
+    
+    monkeypatch.setattr(import_jobs, "run_import_job", fake_job)
+    runner = import_jobs.ImportJobRunner(2)
+    for i in range(5):
+        runner.submit(f"job-{i}")
+    runner.submit("job-0")
+    
+    while runner.active_count:
+        await asyncio.sleep(0.01)
+    
+    assert sorted(finished) == [f"job-{i}" for i in range(5)]
+    assert peak == 2
+
+
+async def test_runner_stop_waits_for_batch_in_flight(db, mock_gemini, tmp_path, monkeypatch):
+    """Stopping mid-batch lets the batch commit before the job's session closes."""
+    started, release = threading.Event(), threading.Event()
+    batches = []
+    
+    def slow_batch(client, job, notes, stats, seen_words, db):
+        started.set()
+        release.wait(5)
+        batches.append(len(notes))
+    
+    monkeypatch.setattr(import_jobs, "_import_anki_batch", slow_batch)
+    apkg = make_apkg(tmp_path / "deck.apkg", [(["laconic", "Using few words"], "vocab")])
+    job = ImportJob(kind="anki", filename="deck.apkg", path=str(apkg))
+    db.add(job)
+    db.commit()
+    
+    runner = import_jobs.ImportJobRunner(1)
+    runner.submit(job.id)
+    assert await asyncio.to_thread(started.wait, 5)
+    stopping = asyncio.ensure_future(runner.stop())
+    await asyncio.sleep(0.05)
+    
+    assert not stopping.done()
+    release.set()
+    await stopping
+    assert batches == [1]
+    db.expire_all()
+    assert db.get(ImportJob, job.id).status == "running"
+
+
+async def test_pages_extracted_in_worker_processes(tmp_path):
+    """Pages come back in document order from the process pool."""
+    pdf = make_pdf(tmp_path / "book.pdf", question_pages(7))
+    executor = ProcessPoolExecutor(2, mp_context=multiprocessing.get_context("spawn"))
+    try:
+        pages = [page async for page in aiter_pages(pdf, executor, pages_per_task=2, max_pending=2)]
+    finally:
+        executor.shutdown()
+    
+    assert [number for number, _ in pages] == list(range(1, 8))
+    assert pages[6][1].startswith("Question 7. If x + 7 = 14")
+
+
+async def test_amap_ordered_bounds_concurrency():
+    """Results keep input order while at most ``limit`` calls run."""
+    running = 0
+    peak = 0
+    
+    async def work(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(random.uniform(0, 0.01))
+        running -= 1
+        if item == 5:
+            raise ValueError("bad chunk")
+        return item * 10
+    
+    async def items():
+        for item in range(20):
+            yield item
+    
+    results = [pair async for pair in amap_ordered(work, items(), 3)]
+    
+    assert [item for item, _ in results] == list(range(20))
+    assert isinstance(results[5][1], ValueError)
+    assert [result for item, result in results if item != 5] == [i * 10 for i in range(20) if i != 5]
+    assert peak == 3
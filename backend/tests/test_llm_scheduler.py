@@ -0,0 +1,175 @@
+"""Tests for the Gemini call scheduler."""
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from app.services.llm_scheduler import BULK, INTERACTIVE, LLMScheduler, TokenBucket, llm_priority
+
+
+class QuotaError(Exception):
+    """Stand-in for a 429 response."""
+    code = 429
+
+
+def make_scheduler(**overrides):
+    """Scheduler without rate limits or backoff delays."""
+    options = dict(
+        requests_per_minute=0,
+        tokens_per_minute=0,
+        max_concurrency=4,
+        max_retries=3,
+        retry_base_delay=0.0,
+        retry_max_delay=0.0
+    )
+    options.update(overrides)
+    return LLMScheduler(**options)
+
+
+def test_retries_retryable_errors():
+    """Quota errors are retried until the call succeeds."""
+    scheduler = make_scheduler()
+    attempts = []
+    
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise QuotaError("quota exhausted")
+        return "ok"
+    
+    assert scheduler.call(flaky) == "ok"
+    assert scheduler.stats()["retries"] == 2
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_does_not_retry_other_errors():
+    """Non-transient errors fail immediately."""
+    scheduler = make_scheduler()
+    attempts = []
+    
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad prompt")
+    
+    with pytest.raises(ValueError):
+        scheduler.call(broken)
+    assert len(attempts) == 1
+    assert scheduler.stats()["failures"] == 1
+
+
+def test_interactive_calls_overtake_bulk():
+    """Queued interactive calls are admitted before queued bulk calls."""
+    scheduler = make_scheduler(max_concurrency=1)
+    release = threading.Event()
+    order = []
+    
+    holder = threading.Thread(target=scheduler.call, args=(release.wait,))
+    holder.start()
+    time.sleep(0.05)
+    
+    def queued(priority, name):
+        with llm_priority(priority):
+            scheduler.call(order.append, name)
+    
+    bulk = threading.Thread(target=queued, args=(BULK, "bulk"))
+    bulk.start()
+    time.sleep(0.05)
+    interactive = threading.Thread(target=queued, args=(INTERACTIVE, "interactive"))
+    interactive.start()
+    time.sleep(0.05)
+    
+    assert scheduler.stats()["queue_depth"] == {"interactive": 1, "bulk": 1}
+    release.set()
+    for thread in (holder, bulk, interactive):
+        thread.join(timeout=5)
+    
+    assert order == ["interactive", "bulk"]
+    assert scheduler.stats()["wait_seconds"]["max"] > 0
+
+
+def test_token_bucket_wait_time():
+    """The bucket refills at its per-minute rate."""
+    bucket = TokenBucket(60)
+    now = bucket.updated
+    bucket.take(60)
+    
+    assert bucket.wait_time(1, now) == pytest.approx(1.0)
+    assert bucket.wait_time(1, now + 1.0) == pytest.approx(0.0)
+    assert TokenBucket(0).wait_time(10 ** 6, now) == 0.0
+
+
+async def test_async_calls_are_scheduled():
+    """Async calls share the same limits and counters."""
+    scheduler = make_scheduler()
+    attempts = []
+    
+    async def flaky():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise QuotaError("quota exhausted")
+        return "ok"
+    
+    assert await scheduler.acall(flaky) == "ok"
+    assert scheduler.stats()["calls"] == 2
+    assert scheduler.stats()["in_flight"] == 0
+
+
+async def test_async_waiters_hold_no_executor_threads():
+    """Queued async calls wait on the loop, so priority holds past the executor size."""
+    loop = asyncio.get_running_loop()
+    executor = ThreadPoolExecutor(max_workers=4)
+    loop.set_default_executor(executor)
+    scheduler = make_scheduler(max_concurrency=1)
+    order = []
+    
+    async def work(name):
+        await asyncio.sleep(0.01)
+        order.append(name)
+    
+    with llm_priority(BULK):
+        bulk = [asyncio.ensure_future(scheduler.acall(work, f"bulk-{i}")) for i in range(12)]
+    await asyncio.sleep(0)
+    await asyncio.gather(scheduler.acall(work, "interactive"), *bulk)
+    
+    assert order.index("interactive") == 1
+    assert scheduler.stats()["in_flight"] == 0
+    executor.shutdown()
+
+
+async def test_cancelled_async_waiter_leaves_queue():
+    """A cancelled waiter gives up its place without leaking a slot."""
+    scheduler = make_scheduler(max_concurrency=1)
+    release = asyncio.Event()
+    holder = asyncio.ensure_future(scheduler.acall(release.wait))
+    await asyncio.sleep(0)
+    
+    queued = asyncio.ensure_future(scheduler.acall(asyncio.sleep, 0))
+    await asyncio.sleep(0)
+    assert scheduler.stats()["queue_depth"]["interactive"] == 1
+    queued.cancel()
+    await asyncio.sleep(0)
+    
+    assert scheduler.stats()["queue_depth"]["interactive"] == 0
+    release.set()
+    await holder
+    assert await scheduler.acall(asyncio.sleep, 0, result="ok") == "ok"
+    assert scheduler.stats()["in_flight"] == 0
+
+
+async def test_async_waiter_admitted_when_budget_refills():
+    """An async call short of token budget starts once the bucket refills."""
+    scheduler = make_scheduler(tokens_per_minute=6000)
+    await scheduler.acall(asyncio.sleep, 0, tokens=6000)
+    
+    start = time.monotonic()
+    await asyncio.wait_for(scheduler.acall(asyncio.sleep, 0, tokens=50), timeout=5)
+    
+    assert time.monotonic() - start >= 0.4
+
+
+def test_stats_endpoint(client):
+    """The stats endpoint aggregates scheduler and cache metrics."""
+    response = client.get("/api/v1/llm/stats")
+    
+    assert response.status_code == 200
+    assert "response_cache" in response.json()
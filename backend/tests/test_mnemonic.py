@@ -1,6 +1,10 @@
 """Tests for mnemonic generation endpoints."""
+import json
+import re
 import pytest
-from app.services.gemini_client import get_gemini_client
+from app.models.embedding_job import EmbeddingJob
+from app.models.word import Word
+from app.services.gemini_client import MockGeminiClient, get_gemini_client, set_gemini_client
 
 
 def test_generate_mnemonic(client, mock_gemini):
@@ -79,3 +83,91 @@ def test_save_duplicate_word(client, mock_gemini):
     response2 = client.post("/api/v1/mnemonic/save", json=word_data)
     assert response2.status_code == 400
     assert "already exists" in response2.json()["detail"]
+
+
+class FumblingGeminiClient(MockGeminiClient):
+    """Drops one word and garbles another the first time they are asked for."""
+    
+    def __init__(self, dropped: str, garbled: str):
+        """Initialize with the words to fumble once."""
+        super().__init__()
+        self.fumble = {dropped: "drop", garbled: "garble"}
+        self.prompts = []
+    
+    def generate_json(self, prompt, temperature=0.7):
+        """Mock batch response with fumbled entries."""
+        self.prompts.append(re.findall(r'"word":\s*"([^"]+)"', prompt))
+        results = []
+        for item in super().generate_json(prompt, temperature):
+            action = self.fumble.pop(item["word"], None)
+            if action == "garble":
+                item["gre_definition"] = None
+            if action != "drop":
+                results.append(item)
+        return results
+
+
+def test_generate_batch_packs_words(client, mock_gemini):
+    """Words are packed into prompts and returned in request order."""
+    words = [f"word{i}" for i in range(45)]
+    response = client.post(
+        "/api/v1/mnemonic/generate-batch",
+        json={"words": words + ["word0"], "pack_size": 20}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert [m["word"] for m in data["mnemonics"]] == words
+    assert data["failed"] == []
+    assert data["saved_ids"] == []
+    
+    usage = client.get("/api/v1/llm/stats").json()["token_usage"]["routes"]
+    assert usage["/api/v1/mnemonic/generate-batch"]["calls"] == 3
+
+
+def test_generate_batch_retries_only_failed_words(client):
+    """Words missing or invalid in a response are retried on their own."""
+    fake = FumblingGeminiClient(dropped="word2", garbled="word5")
+    set_gemini_client(fake)
+    try:
+        response = client.post(
+            "/api/v1/mnemonic/generate-batch",
+            json={"words": [f"word{i}" for i in range(8)], "pack_size": 8}
+        )
+    finally:
+        set_gemini_client(None)
+    
+    assert response.status_code == 200
+    assert len(response.json()["mnemonics"]) == 8
+    assert fake.prompts[1:] == [["word2", "word5"]]
+
+
+def test_generate_batch_reports_persistent_failures(client, mock_gemini):
+    """Words that never validate are reported as failed."""
+    mock_gemini.generate_json = lambda prompt, temperature=0.7: []
+    response = client.post("/api/v1/mnemonic/generate-batch", json={"words": ["lucid"]})
+    
+    assert response.status_code == 200
+    assert response.json()["failed"] == [
+        {"word": "lucid", "error": "Missing or invalid in model response"}
+    ]
+
+
+def test_generate_batch_saves_in_bulk(client, db, mock_gemini):
+    """New words are saved and queued for embedding; existing ones are skipped."""
+    db.add(Word(word="laconic"))
+    db.commit()
+    
+    response = client.post(
+        "/api/v1/mnemonic/generate-batch",
+        json={"words": ["laconic", "lucid", "loquacious"], "save": True, "tags": ["deck"]}
+    )
+    
+    assert response.status_code == 200
+    data = response.json()
+    assert data["existing"] == ["laconic"]
+    assert len(data["saved_ids"]) == 2
+    saved = db.query(Word).filter(Word.id.in_(data["saved_ids"])).all()
+    assert sorted(word.word for word in saved) == ["loquacious", "lucid"]
+    assert all(word.tags == ["deck"] for word in saved)
+    assert db.query(EmbeddingJob).count() == 2
@@ -0,0 +1,83 @@
+"""Tests for prompt token budgets and token accounting."""
+import pytest
+from app.prompts.builder import PROMPT_BUDGETS, TRUNCATION_MARKER, split_to_tokens, truncate_to_tokens
+from app.prompts.explanation import create_awa_grading_prompt, create_explanation_prompt
+from app.prompts.extraction import create_extraction_prompt, create_extraction_prompts
+from app.services.token_usage import estimate_tokens, llm_route, record_usage, token_usage_stats
+
+
+LONG_TEXT = "\n\n".join(
+    f"Question {i}. If x + {i} = {2 * i}, what is the value of x? " * 5 for i in range(400)
+)
+
+
+def test_estimate_tokens():
+    """ASCII runs about four characters per token; other characters one each."""
+    assert estimate_tokens("") == 1
+    assert estimate_tokens("a" * 400) == 101
+    assert estimate_tokens("日本語") == 4
+
+
+def test_truncate_to_tokens():
+    """Text over budget is cut at a boundary and marked."""
+    assert truncate_to_tokens("short text", 100) == "short text"
+    
+    truncated = truncate_to_tokens(LONG_TEXT, 500)
+    assert estimate_tokens(truncated) <= 500
+    assert truncated.endswith(TRUNCATION_MARKER)
+    assert LONG_TEXT.startswith(truncated[:-len(TRUNCATION_MARKER)])
+
+
+def test_split_to_tokens_covers_text():
+    """Every part fits the budget and no words are lost."""
+    parts = split_to_tokens(LONG_TEXT, 500)
+    assert len(parts) > 1
+    assert all(estimate_tokens(part) <= 500 for part in parts)
+    assert " ".join(parts).split() == LONG_TEXT.split()
+    assert split_to_tokens("", 10) == [""]
+
+
+@pytest.mark.parametrize("endpoint, build", [
+    ("extraction", create_extraction_prompt),
+    ("explain", lambda text: create_explanation_prompt(text, "quant")),
+    ("awa", lambda text: create_awa_grading_prompt(text, "issue")),
+])
+def test_prompts_stay_within_budget(endpoint, build):
+    """Unbounded user text is truncated to the endpoint budget."""
+    assert estimate_tokens(build(LONG_TEXT)) <= PROMPT_BUDGETS[endpoint]
+    assert token_usage_stats()["budgets"][endpoint]["truncated"] == 1
+    assert "If x + 1 = 2" in build("If x + 1 = 2")
+
+
+def test_extraction_prompts_split():
+    """Long extraction text becomes several prompts within budget."""
+    prompts = create_extraction_prompts(LONG_TEXT)
+    assert len(prompts) > 1
+    assert all(estimate_tokens(prompt) <= PROMPT_BUDGETS["extraction"] for prompt in prompts)
+    assert token_usage_stats()["budgets"]["extraction"]["split"] == 1
+    assert len(create_extraction_prompts("one question")) == 1
+
+
+def test_usage_recorded_per_route():
+    """Calls are attributed to the enclosing route; API counts win over estimates."""
+    with llm_route("/api/v1/explain"):
+        record_usage("a" * 400, "b" * 40)
+        record_usage("prompt", "completion", prompt_tokens=7, completion_tokens=3)
+    record_usage("elsewhere")
+    
+    routes = token_usage_stats()["routes"]
+    assert routes["/api/v1/explain"]["calls"] == 2
+    assert routes["/api/v1/explain"]["prompt_tokens"] == 101 + 7
+    assert routes["/api/v1/explain"]["completion_tokens"] == 11 + 3
+    assert routes["other"]["completion_tokens"] == 0
+
+
+def test_llm_stats_reports_route_usage(client, mock_gemini):
+    """Requests count their Gemini tokens against the request path."""
+    response = client.post("/api/v1/explain", json={"selection_text": "enervate", "domain": "vocab"})
+    assert response.status_code == 200
+    
+    usage = client.get("/api/v1/llm/stats").json()["token_usage"]["routes"]["/api/v1/explain"]
+    assert usage["calls"] == 1
+    assert usage["prompt_tokens"] > 0
+    assert usage["completion_tokens"] > 0
@@ -0,0 +1,130 @@
+"""Tests for the record/replay Gemini stand-in."""
+import asyncio
+import threading
+import time
+import google.generativeai as genai
+import pytest
+from app.config import settings
+from app.services import llm_scheduler
+from app.services.gemini_client import GeminiClient, MockGeminiClient
+from app.services.llm_scheduler import LLMScheduler
+from app.services.replay_client import (
+    EMBEDDING, TEXT, Cassette, FaultInjector, LatencyModel, RecordingGeminiClient,
+    ReplayError, ReplayGeminiClient
+)
+from benchmarks.gemini_standin import make_server
+
+
+@pytest.fixture(autouse=True)
+def fast_scheduler(monkeypatch):
+    """Shared scheduler that retries without backoff delays."""
+    scheduler = LLMScheduler(0, 0, 8, 5, 0.0, 0.0)
+    monkeypatch.setattr(llm_scheduler, "_scheduler", scheduler)
+    return scheduler
+
+
+def test_cassette_round_trip(tmp_path):
+    """Recorded responses are saved and replayed by prompt."""
+    cassette = Cassette(tmp_path / "cassette.json")
+    recorder = RecordingGeminiClient(MockGeminiClient(), cassette)
+    result = recorder.generate_json('{"word": "laconic"} mnemonic generator')
+    embedding = recorder.generate_embedding("laconic")
+    cassette.save()
+    
+    replay = ReplayGeminiClient(Cassette(tmp_path / "cassette.json"))
+    assert replay.generate_json('{"word": "laconic"} mnemonic generator') == result
+    assert replay.generate_embedding("laconic") == pytest.approx(embedding)
+
+
+def test_cassette_match_and_fallback():
+    """Hand-written entries match on substrings; unknown embeddings are deterministic."""
+    cassette = Cassette(data={
+        "interactions": [{"kind": TEXT, "match": "classify", "response": '{"type": "word"}'}],
+        "fallback": {TEXT: "{}"},
+        "embedding_dimension": 8
+    })
+    assert cassette.lookup(TEXT, "Please classify this clip") == '{"type": "word"}'
+    assert cassette.lookup(TEXT, "anything else") == "{}"
+    assert cassette.lookup(EMBEDDING, "x") == cassette.lookup(EMBEDDING, "x")
+    assert len(cassette.lookup(EMBEDDING, "x")) == 8
+    
+    with pytest.raises(KeyError):
+        Cassette().lookup(TEXT, "unrecorded")
+
+
+def test_latency_models():
+    """Latency specs sample within their distribution."""
+    assert LatencyModel("fixed:250").sample() == 0.25
+    samples = [LatencyModel("uniform:100:200", seed=1).sample() for _ in range(50)]
+    assert all(0.1 <= s <= 0.2 for s in samples)
+    lognormal = LatencyModel("lognormal:800:0.5", seed=1)
+    median = sorted(lognormal.sample() for _ in range(501))[250]
+    assert 0.6 < median < 1.1
+    
+    with pytest.raises(ValueError):
+        LatencyModel("gamma:1")
+
+
+def test_fault_injector_bursts():
+    """429 bursts cover the last calls of every period."""
+    faults = FaultInjector(burst_every=5, burst_length=2)
+    codes = [faults.next_fault() for _ in range(10)]
+    assert codes == [None, None, None, 429, 429] * 2
+    assert faults.injected == {429: 4}
+
+
+def test_replay_retries_injected_429s(fast_scheduler):
+    """Injected quota errors go through the scheduler's retries."""
+    replay = ReplayGeminiClient(
+        Cassette(data={"fallback": {TEXT: "ok"}}),
+        faults=FaultInjector(burst_every=3, burst_length=2)
+    )
+    assert [replay.generate_text(f"p{i}") for i in range(2)] == ["ok", "ok"]
+    assert fast_scheduler.stats()["retries"] == 2
+    
+    with pytest.raises(ReplayError):
+        ReplayGeminiClient(
+            Cassette(data={"fallback": {TEXT: "ok"}}),
+            faults=FaultInjector(error_rate=1.0)
+        ).generate_text("always fails")
+
+
+async def test_async_replay_overlaps_latency():
+    """Async calls sleep without blocking each other."""
+    replay = ReplayGeminiClient(
+        Cassette(data={"fallback": {TEXT: '{"explanation": "because"}'}}),
+        latency=LatencyModel("fixed:200")
+    )
+    start = time.perf_counter()
+    results = await asyncio.gather(*(replay.agenerate_json(f"p{i}") for i in range(5)))
+    assert time.perf_counter() - start < 0.6
+    assert results == [{"explanation": "because"}] * 5
+    
+    chunks = [chunk async for chunk in replay.astream_text("p")]
+    assert "".join(chunks) == '{"explanation": "because"}'
+
+
+def test_gemini_client_against_standin(monkeypatch):
+    """The real client talks to the HTTP stand-in, retrying its 429s."""
+    cassette = Cassette(data={
+        "interactions": [{"kind": TEXT, "match": "hello", "response": "hi there"}],
+        "embedding_dimension": 4
+    })
+    server = make_server(cassette, port=0, burst_every=2, burst_length=1)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        monkeypatch.setattr(
+            settings, "gemini_api_endpoint", f"http://127.0.0.1:{server.server_port}"
+        )
+        client = GeminiClient(api_key="test")
+        assert client.generate_text("hello stand-in") == "hi there"
+        embeddings = client.generate_embeddings(["a", "b", "c"])
+        assert embeddings.shape == (3, 4)
+        assert embeddings[0].tolist() == pytest.approx(cassette.lookup(EMBEDDING, "a"))
+        assert server.faults.injected[429] >= 1
+        assert llm_scheduler._scheduler.stats()["retries"] >= 1
+    finally:
+        server.shutdown()
+        server.server_close()
+        genai.configure(api_key="test")
@@ -0,0 +1,90 @@
+"""Tests for the generate_json response cache."""
+import time
+import pytest
+from app.services.gemini_client import MockGeminiClient
+from app.services.response_cache import ResponseCache, cached_generate_json
+
+
+class CountingClient(MockGeminiClient):
+    """Mock client that counts generate_json calls."""
+    
+    def __init__(self):
+        super().__init__()
+        self.json_calls = 0
+    
+    def generate_json(self, prompt, temperature=0.7):
+        self.json_calls += 1
+        return super().generate_json(prompt, temperature)
+    
+    async def agenerate_json(self, prompt, temperature=0.7):
+        return self.generate_json(prompt, temperature)
+
+
+@pytest.fixture
+def counting_gemini(mock_gemini, monkeypatch):
+    """Install a counting mock client."""
+    client = CountingClient()
+    monkeypatch.setattr("app.routers.mnemonic.get_gemini_client", lambda: client)
+    return client
+
+
+def test_temperature_zero_is_cached(client, counting_gemini):
+    """Identical temperature-0 mnemonic requests hit the model once."""
+    request = {"word": "laconic", "temperature": 0}
+    
+    first = client.post("/api/v1/mnemonic/generate", json=request)
+    second = client.post("/api/v1/mnemonic/generate", json=request)
+    
+    assert first.json() == second.json()
+    assert counting_gemini.json_calls == 1
+
+
+def test_sampling_is_not_cached_unless_requested(client, counting_gemini):
+    """Non-zero temperatures bypass the cache unless the caller opts in."""
+    client.post("/api/v1/mnemonic/generate", json={"word": "laconic"})
+    client.post("/api/v1/mnemonic/generate", json={"word": "laconic"})
+    assert counting_gemini.json_calls == 2
+    
+    client.post("/api/v1/mnemonic/generate", json={"word": "laconic", "cache": True})
+    client.post("/api/v1/mnemonic/generate", json={"word": "laconic", "cache": True})
+    assert counting_gemini.json_calls == 3
+
+
+def test_cached_responses_are_copies():
+    """Mutating a returned response does not change the cached one."""
+    client = CountingClient()
+    
+    result = cached_generate_json(client, "prompt", temperature=0)
+    result["mock"] = "changed"
+    
+    assert cached_generate_json(client, "prompt", temperature=0) == {"mock": "data"}
+    assert client.json_calls == 1
+
+
+def test_ttl_and_size_limits(monkeypatch):
+    """Entries expire after the TTL and the least recently used is evicted."""
+    now = [100.0]
+    monkeypatch.setattr("app.services.response_cache.time.monotonic", lambda: now[0])
+    cache = ResponseCache(ttl=10, max_entries=2)
+    
+    cache.put(("a",), 1)
+    cache.put(("b",), 2)
+    cache.get(("a",))
+    cache.put(("c",), 3)
+    assert cache.get(("b",)) is None
+    assert cache.get(("a",)) == 1
+    
+    now[0] += 11
+    assert cache.get(("a",)) is None
+
+
+def test_hit_latency():
+    """Cache hits are served well under a millisecond."""
+    client = CountingClient()
+    cached_generate_json(client, "mnemonic generator prompt", temperature=0)
+    
+    start = time.perf_counter()
+    for _ in range(100):
+        cached_generate_json(client, "mnemonic generator prompt", temperature=0)
+    
+    assert (time.perf_counter() - start) / 100 < 0.001
@@ -15,7 +15,7 @@ def test_add_vector(db):
     vector_id = store.add_vector(vector, "test-object-1", "word", db)
     
     assert vector_id >= 0
-    assert store.index.ntotal == 1
+    assert store.ntotal == 1
     
     # Check mapping was created
     mapping = db.query(VectorMapping).filter(
@@ -83,3 +83,334 @@ def test_delete_vector(db):
     ).first()
     
     assert mapping is None
+
+
+def test_search_objects_hydrates_in_rank_order(db):
+    """Test that search_objects returns ORM rows in FAISS rank order."""
+    from sqlalchemy import event
+    from app.models.word import Word
+    
+    store = VectorStore(dimension=768)
+    
+    words = []
+    for i, value in enumerate([0.1, 0.5, 0.9]):
+        word = Word(word=f"ranked_{i}")
+        db.add(word)
+        db.commit()
+        store.add_vector([value] * 768, word.id, "word", db)
+        words.append(word)
+    
+    # Count SELECTs issued while resolving the hits
+    statements = []
+    
+    def count_selects(conn, cursor, statement, *args):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append(statement)
+    
+    event.listen(db.get_bind(), "before_cursor_execute", count_selects)
+    try:
+        results = store.search_objects([0.85] * 768, k=3, db=db, object_type="word")
+    finally:
+        event.remove(db.get_bind(), "before_cursor_execute", count_selects)
+    
+    assert [obj.word for obj, _ in results] == ["ranked_2", "ranked_1", "ranked_0"]
+    assert all(isinstance(obj, Word) for obj, _ in results)
+    # One query for the mappings and one for the words
+    assert len(statements) == 2
+
+
+def test_search_objects_forwards_search_knobs(db, monkeypatch):
+    """Test that nprobe and ef_search reach the underlying search."""
+    store = VectorStore(dimension=768)
+    calls = []
+    monkeypatch.setattr(store, "search", lambda *args, **kwargs: calls.append(kwargs) or [])
+    
+    store.search_objects([0.1] * 768, k=5, db=db, object_type="word", nprobe=8, ef_search=64)
+    
+    assert calls[0]["nprobe"] == 8
+    assert calls[0]["ef_search"] == 64
+
+
+def test_rebuild_index_restores_vectors(db):
+    """Test that rebuild_index restores vectors from the embedding store."""
+    store = VectorStore(dimension=768)
+    
+    store.add_vector([0.1] * 768, "obj1", "word", db)
+    store.add_vector([0.9] * 768, "obj2", "word", db)
+    
+    store.rebuild_index(db)
+    
+    assert store.ntotal == 2
+    results = store.search([0.88] * 768, k=1, db=db)
+    assert results[0][0] == "obj2"
+
+
+def test_unsaved_vectors_recovered_on_load(db):
+    """Test that vectors missing from the saved index are re-added on load."""
+    store = VectorStore(dimension=768)
+    store.add_vector([0.1] * 768, "obj1", "word", db)
+    store.save_index()
+    store.add_vector([0.9] * 768, "obj2", "word", db)
+    
+    reloaded = VectorStore(dimension=768)
+    
+    assert reloaded.ntotal == 2
+    results = reloaded.search([0.88] * 768, k=1, db=db)
+    assert results[0][0] == "obj2"
+
+
+def test_deleted_vectors_do_not_take_result_slots(db):
+    """Test that search still returns k live results after deletions."""
+    store = VectorStore(dimension=768)
+    
+    close_ids = [store.add_vector([0.1] * 768, f"close{i}", "word", db) for i in range(3)]
+    store.add_vector([0.5] * 768, "far1", "word", db)
+    store.add_vector([0.6] * 768, "far2", "word", db)
+    
+    for vector_id in close_ids:
+        store.delete_vector(vector_id, db)
+    
+    results = store.search([0.1] * 768, k=2, db=db)
+    
+    assert [r[0] for r in results] == ["far1", "far2"]
+
+
+def test_compact_drops_tombstoned_vectors(db):
+    """Test that compaction removes deleted vectors from index and store."""
+    store = VectorStore(dimension=768)
+    
+    keep_id = store.add_vector([0.1] * 768, "keep", "word", db)
+    drop_id = store.add_vector([0.9] * 768, "drop", "word", db)
+    store.delete_vector(drop_id, db)
+    
+    store.compact()
+    
+    assert store.ntotal == 1
+    assert store.partitions["word"].tombstones == set()
+    assert list(store.partitions["word"].embeddings.ids()) == [keep_id]
+    # Vector IDs stay stable across compaction
+    assert store.search([0.1] * 768, k=1, db=db)[0][0] == "keep"
+    assert store.add_vector([0.5] * 768, "new", "word", db) == drop_id + 1
+
+
+def test_tombstones_persist_across_reload(db, monkeypatch):
+    """Test that tombstones survive a restart."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "vector_compaction_ratio", 1.1)
+    
+    store = VectorStore(dimension=768)
+    store.add_vector([0.1] * 768, "keep", "word", db)
+    drop_id = store.add_vector([0.9] * 768, "drop", "word", db)
+    store.delete_vector(drop_id, db)
+    
+    reloaded = VectorStore(dimension=768)
+    
+    assert reloaded.partitions["word"].tombstones == {drop_id}
+    assert reloaded.next_id == drop_id + 1
+
+
+def test_compaction_runs_in_background_past_threshold(db, monkeypatch):
+    """Test that deleting past the tombstone ratio triggers compaction."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "vector_compaction_ratio", 0.5)
+    
+    store = VectorStore(dimension=768)
+    ids = [store.add_vector([0.1 * i] * 768, f"obj{i}", "word", db) for i in range(4)]
+    
+    store.delete_vector(ids[0], db)
+    assert store.partitions["word"]._maintenance_thread is None
+    
+    store.delete_vector(ids[1], db)
+    store.partitions["word"]._maintenance_thread.join(timeout=10)
+    
+    assert store.ntotal == 2
+    assert store.partitions["word"].tombstones == set()
+
+
+@pytest.mark.parametrize("factory, knobs", [
+    ("IVF4,Flat", {"nprobe": 4}),
+    ("HNSW16", {"ef_search": 32}),
+])
+def test_index_promoted_past_threshold(db, monkeypatch, factory, knobs):
+    """Test that the store swaps in the configured ANN index when it grows."""
+    import numpy as np
+    from app.config import settings
+    monkeypatch.setattr(settings, "vector_index_factory", factory)
+    monkeypatch.setattr(settings, "vector_index_promote_threshold", 200)
+    
+    store = VectorStore(dimension=8)
+    vectors = np.random.default_rng(0).random((200, 8), dtype=np.float32)
+    for i, vector in enumerate(vectors[:199]):
+        store.add_vector(vector.tolist(), f"obj{i}", "word", db)
+    assert store.partitions["word"].index_factory == "Flat"
+    
+    store.add_vector(vectors[199].tolist(), "obj199", "word", db)
+    store.partitions["word"]._maintenance_thread.join(timeout=30)
+    
+    assert store.partitions["word"].index_factory == factory
+    assert store.ntotal == 200
+    results = store.search(vectors[5].tolist(), k=5, db=db, **knobs)
+    assert results[0][0] == "obj5"
+    
+    # The promoted index type survives a restart
+    store.save_index()
+    assert VectorStore(dimension=8).partitions["word"].index_factory == factory
+
+
+def test_untrainable_index_falls_back_to_flat(db, monkeypatch):
+    """Test that a failed training run keeps an exact index."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "vector_index_factory", "IVF64,Flat")
+    monkeypatch.setattr(settings, "vector_index_promote_threshold", 4)
+    
+    store = VectorStore(dimension=8)
+    for i in range(4):
+        store.add_vector([0.1 * i] * 8, f"obj{i}", "word", db)
+    store.partitions["word"]._maintenance_thread.join(timeout=30)
+    
+    assert store.partitions["word"].index_factory == "Flat"
+    assert store.ntotal == 4
+    
+    # No retraining until the corpus has grown substantially
+    store.add_vector([0.5] * 8, "obj4", "word", db)
+    assert not store.partitions["word"]._needs_maintenance()
+
+
+def test_filtered_search_returns_full_k_when_other_types_dominate(db):
+    """Test that a word search is not crowded out by nearer questions."""
+    store = VectorStore(dimension=768)
+    
+    for i in range(20):
+        store.add_vector([0.1] * 768, f"question{i}", "question", db)
+    for i in range(3):
+        store.add_vector([0.9 + 0.01 * i] * 768, f"word{i}", "word", db)
+    
+    results = store.search([0.1] * 768, k=3, db=db, object_type="word")
+    
+    assert [r[0] for r in results] == ["word0", "word1", "word2"]
+    # Unfiltered search merges partitions by distance
+    unfiltered = store.search([0.1] * 768, k=3, db=db)
+    assert all(r[1] == "question" for r in unfiltered)
+
+
+def test_unpartitioned_index_is_migrated(db):
+    """Test that a single mixed index is split into partitions on load."""
+    import faiss
+    import numpy as np
+    from app.config import settings
+    
+    # Positional index as written by earlier versions
+    index_path = settings.expanded_data_dir / "faiss_index"
+    index_path.mkdir(parents=True)
+    legacy = faiss.IndexFlatL2(768)
+    legacy.add(np.array([[0.1] * 768, [0.5] * 768, [0.9] * 768], dtype=np.float32))
+    faiss.write_index(legacy, str(index_path / "index.faiss"))
+    db.add_all([
+        VectorMapping(vector_id=0, object_id="w1", object_type="word"),
+        VectorMapping(vector_id=1, object_id="q1", object_type="question"),
+        # vector 2 has no mapping: it was deleted
+    ])
+    db.commit()
+    
+    store = VectorStore(dimension=768)
+    
+    assert set(store.partitions) == {"word", "question"}
+    assert store.ntotal == 2
+    assert not (index_path / "index.faiss").exists()
+    assert store.search([0.5] * 768, k=1, db=db, object_type="question")[0][0] == "q1"
+    assert store.next_id == 3
+
+
+def test_logged_changes_survive_crash(db, monkeypatch):
+    """Test that adds and deletes since the last snapshot are replayed."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "vector_compaction_ratio", 1.1)
+    
+    store = VectorStore(dimension=768)
+    keep_id = store.add_vector([0.1] * 768, "keep", "word", db)
+    store.save_index()
+    drop_id = store.add_vector([0.9] * 768, "drop", "word", db)
+    store.add_vector([0.5] * 768, "late", "word", db)
+    store.partitions["word"].delete(drop_id)
+    
+    # Simulate a crash: no snapshot, and the store's unflushed tail is lost
+    store.partitions["word"].embeddings.truncate(1)
+    
+    recovered = VectorStore(dimension=768)
+    partition = recovered.partitions["word"]
+    
+    assert recovered.ntotal == 3
+    assert partition.tombstones == {drop_id}
+    assert [r[0] for r in recovered.search([0.5] * 768, k=2, db=db)] == ["late", "keep"]
+
+
+def test_snapshot_rotates_log_atomically(db):
+    """Test that a snapshot leaves no temp files and starts a fresh log."""
+    store = VectorStore(dimension=768)
+    store.add_vector([0.1] * 768, "obj1", "word", db)
+    partition = store.partitions["word"]
+    old_log = partition._log_file(partition.log_generation)
+    assert old_log.stat().st_size > 0
+    
+    store.save_index()
+    
+    assert not old_log.exists()
+    assert partition._log_file(partition.log_generation).stat().st_size == 0
+    assert not list(partition.path.glob("*.tmp"))
+
+
+def test_snapshot_interval(db, monkeypatch):
+    """Test that a full snapshot is only written every N vectors."""
+    from app.config import settings
+    monkeypatch.setattr(settings, "vector_snapshot_interval", 3)
+    
+    store = VectorStore(dimension=768)
+    for i in range(2):
+        store.add_vector([0.1 * i] * 768, f"obj{i}", "word", db)
+    partition = store.partitions["word"]
+    assert not partition.index_file.exists()
+    
+    store.add_vector([0.5] * 768, "obj2", "word", db)
+    
+    assert partition.index_file.exists()
+    assert partition._unsnapshotted == 0
+
+
+def test_torn_log_record_is_discarded(tmp_path):
+    """Test that a partially written log record is cut off on replay."""
+    import numpy as np
+    from app.services.vector_log import VectorLog
+    
+    log = VectorLog(tmp_path / "vectors-0.log", dimension=4)
+    log.append_adds(np.ones((2, 4)), [7, 8])
+    log.append_deletes([7])
+    log.close()
+    full_size = (tmp_path / "vectors-0.log").stat().st_size
+    with open(tmp_path / "vectors-0.log", "ab") as f:
+        f.write(b"\x01\x09\x00")
+    
+    records = list(VectorLog.replay(tmp_path / "vectors-0.log", dimension=4))
+    
+    assert [(op, vid) for op, vid, _ in records] == [(1, 7), (1, 8), (2, 7)]
+    assert (tmp_path / "vectors-0.log").stat().st_size == full_size
+
+
+def test_add_vectors_bulk(db):
+    """Test adding a mixed block of vectors in one call."""
+    import numpy as np
+    from sqlalchemy import event
+    
+    store = VectorStore(dimension=768)
+    vectors = np.array([[0.1] * 768, [0.5] * 768, [0.9] * 768], dtype=np.float32)
+    
+    commits = []
+    event.listen(db, "after_commit", lambda session: commits.append(session))
+    vector_ids = store.add_vectors(vectors, ["w1", "q1", "w2"], ["word", "question", "word"], db)
+    
+    assert len(commits) == 1
+    assert vector_ids == sorted(vector_ids)
+    assert store.partitions["word"].index.ntotal == 2
+    assert store.partitions["question"].index.ntotal == 1
+    mappings = store.resolve_mappings(vector_ids, db)
+    assert [mappings[v].object_id for v in vector_ids] == ["w1", "q1", "w2"]
+    assert store.search([0.9] * 768, k=1, db=db, object_type="word")[0][0] == "w2"
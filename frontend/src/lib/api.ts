@@ -58,6 +58,23 @@ export interface MnemonicRequest {
   temperature?: number
 }
 
+export interface MnemonicBatchRequest {
+  words: string[]
+  style?: 'prude' | 'compact' | 'story'
+  temperature?: number
+  pack_size?: number
+  save?: boolean
+  tags?: string[]
+  source?: string
+}
+
+export interface MnemonicBatchResponse {
+  mnemonics: Partial<Word>[]
+  failed: { word: string; error: string }[]
+  saved_ids: string[]
+  existing: string[]
+}
+
 export interface ClipRequest {
   text: string
   url: string
@@ -84,6 +101,9 @@ export const mnemonicAPI = {
   generate: (data: MnemonicRequest) =>
     api.post('/api/v1/mnemonic/generate', data),
   
+  generateBatch: (data: MnemonicBatchRequest) =>
+    api.post<MnemonicBatchResponse>('/api/v1/mnemonic/generate-batch', data),
+  
   save: (word: Partial<Word>) =>
     api.post('/api/v1/mnemonic/save', word),
 }
@@ -107,9 +127,65 @@ export const clipAPI = {
     api.post('/api/v1/ingest/clip', data),
 }
 
+export interface ExplainResponse {
+  explanation: string
+  references: { title: string; url: string }[]
+  saved_id?: string
+}
+
+export interface ExplainStreamHandlers {
+  onToken?: (text: string) => void
+  onField?: (name: string, value: unknown) => void
+  onDone?: (response: ExplainResponse) => void
+  onError?: (detail: string) => void
+}
+
 export const explainAPI = {
   explain: (data: ExplainRequest) =>
     api.post('/api/v1/explain', data),
+  
+  // Server-Sent Events over fetch (EventSource cannot POST)
+  stream: async (data: ExplainRequest, handlers: ExplainStreamHandlers, signal?: AbortSignal) => {
+    const response = await fetch(`${API_BASE_URL}/api/v1/explain/stream`, {
+      method: 'POST',
+      headers: { 'Content-Type': 'application/json' },
+      body: JSON.stringify(data),
+      signal,
+    })
+    if (!response.ok || !response.body) {
+      handlers.onError?.(`Request failed with status ${response.status}`)
+      return
+    }
+    
+    const reader = response.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+    
+    while (true) {
+      const { done, value } = await reader.read()
+      if (done) break
+      buffer += decoder.decode(value, { stream: true })
+      
+      let boundary
+      while ((boundary = buffer.indexOf('\n\n')) >= 0) {
+        const block = buffer.slice(0, boundary)
+        buffer = buffer.slice(boundary + 2)
+        
+        let event = 'message'
+        let payload = ''
+        for (const line of block.split('\n')) {
+          if (line.startsWith('event: ')) event = line.slice(7)
+          else if (line.startsWith('data: ')) payload += line.slice(6)
+        }
+        const parsed = JSON.parse(payload)
+        
+        if (event === 'token') handlers.onToken?.(parsed.text)
+        else if (event === 'field') handlers.onField?.(parsed.name, parsed.value)
+        else if (event === 'done') handlers.onDone?.(parsed)
+        else if (event === 'error') handlers.onError?.(parsed.detail)
+      }
+    }
+  },
 }
 
 export const sessionAPI = {
@@ -138,11 +214,25 @@ export const awaAPI = {
     api.post('/api/v1/awa/grade', data),
 }
 
+export interface ImportJob {
+  id: string
+  kind: 'pdf' | 'anki'
+  filename: string
+  status: 'pending' | 'running' | 'done' | 'failed'
+  units_total?: number
+  units_completed: number
+  stats: Record<string, number>
+  error?: string
+  created_at: string
+  updated_at: string
+  finished_at?: string
+}
+
 export const importAPI = {
   pdf: (file: File) => {
     const formData = new FormData()
     formData.append('file', file)
-    return api.post('/api/v1/import/pdf', formData, {
+    return api.post<ImportJob>('/api/v1/import/pdf', formData, {
       headers: { 'Content-Type': 'multipart/form-data' },
     })
   },
@@ -150,8 +240,21 @@ export const importAPI = {
   anki: (file: File) => {
     const formData = new FormData()
     formData.append('file', file)
-    return api.post('/api/v1/import/anki', formData, {
+    return api.post<ImportJob>('/api/v1/import/anki', formData, {
       headers: { 'Content-Type': 'multipart/form-data' },
     })
   },
+  
+  job: (jobId: string) =>
+    api.get<ImportJob>(`/api/v1/import/jobs/${jobId}`),
+  
+  // Poll a job until it finishes; onProgress sees every update
+  waitForJob: async (jobId: string, onProgress?: (job: ImportJob) => void, intervalMs = 1000) => {
+    while (true) {
+      const { data } = await importAPI.job(jobId)
+      onProgress?.(data)
+      if (data.status === 'done' || data.status === 'failed') return data
+      await new Promise((resolve) => setTimeout(resolve, intervalMs))
+    }
+  },
 }
@@ -1,6 +1,6 @@
 import { useState } from 'react'
 import { useMutation } from '@tanstack/react-query'
-import { importAPI, mnemonicAPI } from '@/lib/api'
+import { importAPI, mnemonicAPI, ImportJob } from '@/lib/api'
 import { Card, CardContent, CardHeader, CardTitle, CardDescription } from '@/components/ui/card'
 import { Button } from '@/components/ui/button'
 import { Input } from '@/components/ui/input'
@@ -10,23 +10,46 @@ export function ImportPage() {
   const [pdfFile, setPdfFile] = useState<File | null>(null)
   const [ankiFile, setAnkiFile] = useState<File | null>(null)
   const [manualWord, setManualWord] = useState('')
+  const [pdfJob, setPdfJob] = useState<ImportJob | null>(null)
+  const [ankiJob, setAnkiJob] = useState<ImportJob | null>(null)
 
   const pdfMutation = useMutation({
-    mutationFn: (file: File) => importAPI.pdf(file),
-    onSuccess: (response) => {
-      alert(`Successfully imported ${response.data.questions_extracted} questions`)
+    mutationFn: async (file: File) => {
+      const response = await importAPI.pdf(file)
+      return importAPI.waitForJob(response.data.id, setPdfJob)
+    },
+    onSuccess: (job) => {
+      if (job.status === 'failed') {
+        alert(`PDF import failed: ${job.error}`)
+      } else {
+        alert(`Successfully imported ${job.stats.questions_extracted} questions`)
+      }
       setPdfFile(null)
+      setPdfJob(null)
     },
   })
 
   const ankiMutation = useMutation({
-    mutationFn: (file: File) => importAPI.anki(file),
-    onSuccess: (response) => {
-      alert(`Successfully imported ${response.data.words_imported} words`)
+    mutationFn: async (file: File) => {
+      const response = await importAPI.anki(file)
+      return importAPI.waitForJob(response.data.id, setAnkiJob)
+    },
+    onSuccess: (job) => {
+      if (job.status === 'failed') {
+        alert(`Anki import failed: ${job.error}`)
+      } else {
+        alert(`Successfully imported ${job.stats.words_imported} words`)
+      }
       setAnkiFile(null)
+      setAnkiJob(null)
     },
   })
 
+  const progress = (job: ImportJob | null) =>
+    job?.units_total
+      ? `Importing... ${job.units_completed}/${job.units_total}`
+      : `Importing... ${job?.units_completed ?? 0} done`
+
   const generateMutation = useMutation({
     mutationFn: (word: string) => mnemonicAPI.generate({ word }),
     onSuccess: async (response) => {
@@ -92,7 +115,7 @@ export function ImportPage() {
               disabled={!pdfFile || pdfMutation.isPending}
             >
               <Upload className="mr-2 h-4 w-4" />
-              {pdfMutation.isPending ? 'Importing...' : 'Import PDF'}
+              {pdfMutation.isPending ? progress(pdfJob) : 'Import PDF'}
             </Button>
           </div>
         </CardContent>
@@ -122,7 +145,7 @@ export function ImportPage() {
               disabled={!ankiFile || ankiMutation.isPending}
             >
               <Upload className="mr-2 h-4 w-4" />
-              {ankiMutation.isPending ? 'Importing...' : 'Import Anki Deck'}
+              {ankiMutation.isPending ? progress(ankiJob) : 'Import Anki Deck'}
             </Button>
           </div>
         </CardContent>